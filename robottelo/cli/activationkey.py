@@ -37,63 +37,61 @@ class ActivationKey(Base):
     @classmethod
     def add_host_collection(cls, options=None):
         """Associate a resource"""
-        cls.command_sub = 'add-host-collection'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(
+            options, command_sub='add-host-collection'))
 
     @classmethod
     def add_subscription(cls, options=None):
         """Add subscription"""
-        cls.command_sub = 'add-subscription'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(
+            options, command_sub='add-subscription'))
 
     @classmethod
     def content_override(cls, options=None):
         """Override product content defaults"""
-        cls.command_sub = 'content-override'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(
+            options, command_sub='content-override'))
 
     @classmethod
     def copy(cls, options=None):
         """Copy an activation key"""
-        cls.command_sub = 'copy'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(options, command_sub='copy'))
 
     @classmethod
     def host_collection(cls, options=None):
         """List associated host collections"""
-        cls.command_sub = 'host-collections'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(
+            options, command_sub='host-collections'))
 
     @classmethod
     def product_content(cls, options=None):
         """List associated products"""
-        cls.command_sub = 'product-content'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, command_sub='product-content'),
             output_format='csv'
         )
 
     @classmethod
     def remove_host_collection(cls, options=None):
         """Remove the associated resource"""
-        cls.command_sub = 'remove-host-collection'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(
+            options, command_sub='remove-host-collection'))
 
     @classmethod
     def remove_repository(cls, options=None):
         """Disassociate a resource"""
-        cls.command_sub = 'remove-repository'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(
+            options, command_sub='remove-repository'))
 
     @classmethod
     def remove_subscription(cls, options=None):
         """Remove subscription"""
-        cls.command_sub = 'remove-subscription'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(
+            options, command_sub='remove-subscription'))
 
     @classmethod
     def subscriptions(cls, options=None, output_format=None):
         """List associated subscriptions"""
-        cls.command_sub = 'subscriptions'
         return cls.execute(
-            cls._construct_command(options), output_format=output_format)
+            cls._construct_command(options, command_sub='subscriptions'),
+            output_format=output_format)
@@ -19,17 +19,17 @@ class Ansible(Base):
     @classmethod
     def roles_import(cls, options=None):
         """Import ansible roles"""
-        cls.command_sub = 'roles import'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(
+            options, command_sub='roles import'))
 
     @classmethod
     def variables_import(cls, options=None):
         """Import ansible variables"""
-        cls.command_sub = 'variables import'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(
+            options, command_sub='variables import'))
 
     @classmethod
     def roles_list(cls, options=None):
         """List ansible roles"""
-        cls.command_sub = 'roles list'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(
+            options, command_sub='roles list'))
@@ -2,9 +2,14 @@
 """Generic base class for cli hammer commands."""
 import logging
 import re
+import time
 
+from concurrent.futures import ThreadPoolExecutor
 from robottelo import ssh
-from robottelo.cli import hammer
+from robottelo.cli import command_tree, hammer, hammer_shell
+from robottelo.cli.cache import response_cache
+from robottelo.cli.factory_profiler import factory_profiler
+from robottelo.cli.hammer_timing import hammer_timings, split_timing
 from robottelo.config import settings
 
 
@@ -61,6 +66,23 @@ class CLIDataBaseError(CLIBaseError):
     """
 
 
+# Print the first row "Id" column of the CSV output stored in a shell variable
+_CSV_ID_COMMAND = (
+    u'$(printf "%s\\n" "{0}" | awk -F, '
+    u'\'NR == 1 {{for (i = 1; i <= NF; i++) '
+    u'if (tolower($i) == "id") c = i}} '
+    u'NR == 2 && c {{gsub(/"/, "", $c); print $c}}\')'
+)
+
+# Run a command keeping its output in a shell variable, for
+# _CSV_ID_COMMAND, and print it, the command exit code being kept in
+# another variable
+_KEEP_OUTPUT_COMMAND = (
+    u'__robottelo_out=$({0}); __robottelo_rc=$?; '
+    u'printf "%s\\n" "$__robottelo_out"; '
+)
+
+
 class Base(object):
     """
     @param command_base: base command of hammer.
@@ -133,7 +155,7 @@ class Base(object):
     )
 
     @classmethod
-    def _handle_response(cls, response, ignore_stderr=None):
+    def _handle_response(cls, response, ignore_stderr=None, command=None):
         """Verify ``return_code`` of the CLI command.
 
         Check for a non-zero return code or any stderr contents.
@@ -142,16 +164,22 @@ class Base(object):
             :mod:`robottelo.ssh.command`.
         :param ignore_stderr: indicates whether to throw a warning in logs if
             ``stderr`` is not empty.
+        :param command: the executed command, its part before the options is
+            used to name the command in the error message.
         :returns: contents of ``stdout``.
         :raises robottelo.cli.base.CLIReturnCodeError: If return code is
             different from zero.
         """
         if response.return_code != 0:
+            if command is None:
+                command_name = u'{0} {1}'.format(
+                    cls.command_base, cls.command_sub)
+            else:
+                command_name = command.split(u' --', 1)[0].strip()
             full_msg = (
-                u'Command "{0} {1}" finished with return_code {2}\n'
-                'stderr contains following message:\n{3}'.format(
-                    cls.command_base,
-                    cls.command_sub,
+                u'Command "{0}" finished with return_code {1}\n'
+                'stderr contains following message:\n{2}'.format(
+                    command_name,
                     response.return_code,
                     response.stderr
                 )
@@ -174,9 +202,8 @@ class Base(object):
         Adds OS to record.
         """
 
-        cls.command_sub = 'add-operatingsystem'
-
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(cls._construct_command(
+            options, command_sub='add-operatingsystem'))
 
         return result
 
@@ -186,13 +213,15 @@ class Base(object):
         Creates a new record using the arguments passed via dictionary.
         """
 
-        cls.command_sub = 'create'
-
         if options is None:
             options = {}
 
+        if cls._single_round_trip_create(options):
+            return cls._create_with_info(options)
+
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='create'),
+            output_format='csv')
 
         # Extract new object ID if it was successfully created
         if len(result) > 0 and 'id' in result[0]:
@@ -214,12 +243,81 @@ class Base(object):
 
         return result
 
+    @classmethod
+    def _single_round_trip_create(cls, options):
+        """Whether ``create`` can fetch the created entity in the same ssh
+        exec, see :meth:`_create_with_info`.
+        """
+        return (
+            bool(settings.hammer.single_round_trip_create) and
+            not settings.hammer.shell_session and
+            # entities overriding info need their own info command
+            cls.info.__func__ is Base.info.__func__ and
+            not (cls.command_requires_org and
+                 'organization-id' not in options)
+        )
+
+    @classmethod
+    def _create_with_info(cls, options):
+        """Create an entity and read it with a single ssh exec.
+
+        The ``create`` and ``info`` hammer commands are run one after the
+        other in the same remote shell script, ``info`` receiving the id
+        parsed from the ``create`` CSV output through a shell variable. The
+        result is the same as :meth:`create` running both commands in turn.
+        """
+        user, password = cls._get_username_password()
+        time_hammer = False
+        if settings.performance:
+            time_hammer = settings.performance.time_hammer
+        create_command = cls._construct_command(options, command_sub='create')
+        info_options = {u'id': u'$__robottelo_id'}
+        if cls.command_requires_org:
+            info_options[u'organization-id'] = options[u'organization-id']
+        info_command = cls._construct_command(info_options, command_sub='info')
+        cmds = [
+            # keep the create exit code for the batch
+            _KEEP_OUTPUT_COMMAND.format(cls._hammer_command(
+                create_command, user, password, 'csv', time_hammer)) +
+            u'(exit $__robottelo_rc)',
+            # fetch the entity only when an id column was found
+            u'__robottelo_id={0}; '
+            u'if [ -n "$__robottelo_id" ]; then {1}; fi'.format(
+                _CSV_ID_COMMAND.format(u'$__robottelo_out'),
+                cls._hammer_command(
+                    info_command, user, password, None, time_hammer)),
+        ]
+        start = time.time()
+        results = ssh.command_batch(cmds, stop_on_error=True)
+        ssh_time = time.time() - start
+        timings = []
+        if time_hammer:
+            timings = [
+                cls._record_timing(response, command)
+                for response, command in zip(
+                    results, [create_command, info_command])
+            ]
+        factory_profiler.record(
+            [create_command, info_command][:len(results)], results, ssh_time,
+            timings)
+        cls._invalidate_responses([create_command])
+        create_response = results[0]
+        if create_response.return_code == 0 and create_response.stdout:
+            create_response.stdout = hammer.parse_csv(create_response.stdout)
+        result = cls._handle_response(create_response, command=create_command)
+        if len(results) > 1:
+            new_obj = hammer.parse_info(
+                cls._handle_response(results[1], command=info_command))
+            # stdout should be a dictionary containing the object
+            if len(new_obj) > 0:
+                result = new_obj
+        return result
+
     @classmethod
     def delete(cls, options=None):
         """Deletes existing record."""
-        cls.command_sub = 'delete'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, command_sub='delete'),
             ignore_stderr=True,
         )
 
@@ -229,9 +327,8 @@ class Base(object):
         Deletes parameter from record.
         """
 
-        cls.command_sub = 'delete-parameter'
-
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(cls._construct_command(
+            options, command_sub='delete-parameter'))
 
         return result
 
@@ -241,9 +338,8 @@ class Base(object):
         Displays the content for existing partition table.
         """
 
-        cls.command_sub = 'dump'
-
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(cls._construct_command(
+            options, command_sub='dump'))
 
         return result
 
@@ -283,8 +379,192 @@ class Base(object):
         if settings.performance:
             time_hammer = settings.performance.time_hammer
 
+        cache_key = None
+        if settings.hammer.response_cache:
+            resource = response_cache.resource(command)
+            if response_cache.is_read_only(command):
+                cache_key = (
+                    settings.server.hostname, user, password, output_format,
+                    command
+                )
+                generation = response_cache.generation(resource)
+                response = response_cache.get(resource, cache_key)
+                if response is not None:
+                    return cls._execute_response(
+                        response, command, ignore_stderr,
+                        return_raw_response)
+
+        start = time.time()
+        timing = None
+        response = None
+        if (settings.hammer.shell_session and not time_hammer and
+                u'\n' not in command and
+                response_cache.is_read_only(command) and
+                not ssh.is_local_host(settings.server.hostname)):
+            # reuse a running hammer shell instead of starting hammer again
+            response = hammer_shell.execute(
+                command,
+                user=user,
+                password=password,
+                output_format=output_format,
+                timeout=timeout,
+                connection_timeout=connection_timeout,
+            )
+            if response.return_code != 0:
+                # the shell does not report the exit status of its commands,
+                # run the read-only command again to get the real one
+                response = None
+        if response is None:
+            cmd = cls._hammer_command(
+                command, user, password, output_format, time_hammer)
+            response = ssh.command(
+                cmd.encode('utf-8'),
+                output_format=output_format,
+                timeout=timeout,
+                connection_timeout=connection_timeout,
+            )
+            if time_hammer:
+                timing = cls._record_timing(response, command)
+        factory_profiler.record(
+            [command], [response], time.time() - start, [timing])
+        cls._invalidate_responses([command])
+        if cache_key is not None and response.return_code == 0:
+            response_cache.set(resource, cache_key, response, generation)
+        return cls._execute_response(
+            response, command, ignore_stderr, return_raw_response)
+
+    @classmethod
+    def _execute_response(cls, response, command, ignore_stderr=None,
+                          return_raw_response=None):
+        """Return the response of an executed command as :meth:`execute`
+        does.
+        """
+        if return_raw_response:
+            return response
+        else:
+            return cls._handle_response(
+                response,
+                ignore_stderr=ignore_stderr,
+                command=command,
+            )
+
+    @staticmethod
+    def batch_id(index):
+        """Reference the id returned by the command at ``index`` of an
+        :meth:`execute_batch` batch, to be used as an option value.
+        """
+        return u'$__robottelo_id_{0}'.format(index)
+
+    @classmethod
+    def execute_batch(cls, commands, user=None, password=None,
+                      output_format='csv', timeout=None, ignore_stderr=None,
+                      connection_timeout=None):
+        """Execute several hammer commands, in order, in a single ssh exec.
+
+        A command can use the id returned by a previous one in its options
+        with :meth:`batch_id`, the id being read from the ``Id`` column of the
+        first CSV row the previous command printed::
+
+            results = Base.execute_batch([
+                Org._construct_command(
+                    {'name': 'org'}, command_sub='create'),
+                Product._construct_command({
+                    'name': 'product',
+                    'organization-id': Base.batch_id(0),
+                }, command_sub='create'),
+            ])
+
+        The batch stops at the first failing command.
+
+        :param commands: The hammer commands, as built by
+            :meth:`_construct_command`.
+        :param output_format: Output format of all the commands. Must be
+            ``csv`` when ids are referenced.
+        :param timeout: Time to wait for the whole batch to finish.
+        :return: A list with the parsed output of each command.
+        :raises robottelo.cli.base.CLIReturnCodeError: If a command failed,
+            with its return code and stderr.
+        """
+        commands = list(commands)
+        user, password = cls._get_username_password(user, password)
+        time_hammer = False
+        if settings.performance:
+            time_hammer = settings.performance.time_hammer
+        cmds = []
+        for index, command in enumerate(commands):
+            hammer_command = cls._hammer_command(
+                command, user, password, output_format, time_hammer)
+            # $__robottelo_id_1 must not match $__robottelo_id_10
+            id_regex = re.compile(re.escape(cls.batch_id(index)) + r'\b')
+            if not any(id_regex.search(later)
+                       for later in commands[index + 1:]):
+                cmds.append(hammer_command)
+                continue
+            if output_format != 'csv':
+                raise CLIError(
+                    'ids can only be read from the csv output of {0}'.format(
+                        command))
+            cmds.append(
+                # keep the command exit code for the batch
+                _KEEP_OUTPUT_COMMAND.format(hammer_command) +
+                u'__robottelo_id_{0}={1}; (exit $__robottelo_rc)'.format(
+                    index, _CSV_ID_COMMAND.format(u'$__robottelo_out'))
+            )
+        start = time.time()
+        responses = ssh.command_batch(
+            cmds, output_format=output_format, stop_on_error=True,
+            timeout=timeout, connection_timeout=connection_timeout)
+        ssh_time = time.time() - start
+        timings = []
+        if time_hammer:
+            timings = [
+                cls._record_timing(response, command)
+                for command, response in zip(commands, responses)
+            ]
+        factory_profiler.record(
+            commands[:len(responses)], responses, ssh_time, timings)
+        cls._invalidate_responses(commands[:len(responses)])
+        results = []
+        for command, response in zip(commands, responses):
+            results.append(cls._handle_response(
+                response, ignore_stderr=ignore_stderr, command=command))
+        return results
+
+    @staticmethod
+    def _invalidate_responses(commands):
+        """Drop the cached responses of the resources changed by the hammer
+        ``commands`` which were run, see :mod:`robottelo.cli.cache`.
+        """
+        if not settings.hammer.response_cache:
+            return
+        for command in commands:
+            if not response_cache.is_read_only(command):
+                response_cache.invalidate(response_cache.resource(command))
+
+    @classmethod
+    def _record_timing(cls, response, command):
+        """Move the ``time -p`` output of a hammer ``command`` from the
+        ``stderr`` of its ``response`` to the hammer timing statistics.
+
+        :return: The timing of the command, ``None`` if none was found.
+        """
+        response.stderr, timing = split_timing(response.stderr)
+        if timing is None:
+            return None
+        words = command.split(u' --', 1)[0].split()
+        base_words = (cls.command_base or u'').split()
+        if not base_words or words[:len(base_words)] != base_words:
+            base_words = words[:1]
+        hammer_timings.record(
+            u' '.join(base_words), u' '.join(words[len(base_words):]), timing)
+        return timing
+
+    @classmethod
+    def _hammer_command(cls, command, user=None, password=None,
+                        output_format=None, time_hammer=False):
+        """Build the shell command line running hammer ``command``."""
         # add time to measure hammer performance
-        cmd = u'LANG={0} {1} hammer -v {2} {3} {4} {5}'.format(
+        return u'LANG={0} {1} hammer -v {2} {3} {4} {5}'.format(
             settings.locale,
             u'time -p' if time_hammer else '',
             u'-u {0}'.format(user) if user is not None
@@ -293,19 +573,6 @@ class Base(object):
             u'--output={0}'.format(output_format) if output_format else u'',
             command,
         )
-        response = ssh.command(
-            cmd.encode('utf-8'),
-            output_format=output_format,
-            timeout=timeout,
-            connection_timeout=connection_timeout,
-        )
-        if return_raw_response:
-            return response
-        else:
-            return cls._handle_response(
-                response,
-                ignore_stderr=ignore_stderr,
-            )
 
     @classmethod
     def exists(cls, options=None, search=None):
@@ -336,8 +603,6 @@ class Base(object):
     @classmethod
     def info(cls, options=None, output_format=None, return_raw_response=None):
         """Reads the entity information."""
-        cls.command_sub = 'info'
-
         if options is None:
             options = {}
 
@@ -349,7 +614,7 @@ class Base(object):
             )
 
         result = cls.execute(
-            command=cls._construct_command(options),
+            command=cls._construct_command(options, command_sub='info'),
             output_format=output_format,
             return_raw_response=return_raw_response,
         )
@@ -364,8 +629,6 @@ class Base(object):
         @param options: ID (sometimes name works as well) to retrieve info.
         """
 
-        cls.command_sub = 'list'
-
         if options is None:
             options = {}
 
@@ -380,20 +643,88 @@ class Base(object):
             )
 
         result = cls.execute(
-            cls._construct_command(options), output_format=output_format)
+            cls._construct_command(options, command_sub='list'),
+            output_format=output_format)
 
         return result
 
+    @classmethod
+    def iter_list(cls, options=None, page_size=1000, output_format='csv',
+                  prefetch=False):
+        """Iterate over the ``list`` results, one page at a time.
+
+        Pages are only fetched when the previous one has been consumed, so
+        the caller can stop early, for example once the wanted entity was
+        found, without listing everything::
+
+            for package in Package.iter_list({'repository-id': 1}):
+                if package['filename'] == filename:
+                    break
+
+        :param options: Options of the ``list`` command. The ``page`` option
+            sets the first page to fetch, ``per-page`` is replaced by
+            ``page_size``.
+        :param page_size: Number of entries requested per page.
+        :param output_format: Output format of the ``list`` command.
+        :param prefetch: Fetch the next page in a background thread while the
+            current one is consumed.
+        :return: A generator of the parsed entries.
+        """
+        options = dict(options or {})
+        options.pop(u'per-page', None)
+        page = int(options.pop(u'page', 1))
+
+        if cls.command_requires_org and 'organization-id' not in options:
+            raise CLIError(
+                'organization-id option is required for {0}.list'.format(
+                    cls.__name__
+                )
+            )
+
+        def fetch(page):
+            page_options = dict(options)
+            page_options[u'page'] = page
+            page_options[u'per-page'] = page_size
+            return cls.execute(
+                cls._construct_command(page_options, command_sub='list'),
+                output_format=output_format)
+
+        if not prefetch:
+            while True:
+                result = fetch(page)
+                for entry in result:
+                    yield entry
+                if len(result) < page_size:
+                    return
+                page += 1
+
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            result = fetch(page)
+            while True:
+                next_page = None
+                if len(result) >= page_size:
+                    page += 1
+                    next_page = executor.submit(fetch, page)
+                for entry in result:
+                    yield entry
+                if next_page is None:
+                    return
+                result = next_page.result()
+        finally:
+            # a page still being fetched when the caller stopped iterating
+            # is left to finish in the background
+            executor.shutdown(wait=False)
+
     @classmethod
     def puppetclasses(cls, options=None):
         """
         Lists all puppet classes.
         """
 
-        cls.command_sub = 'puppet-classes'
-
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='puppet-classes'),
+            output_format='csv')
 
         return result
 
@@ -403,9 +734,8 @@ class Base(object):
         Removes OS from record.
         """
 
-        cls.command_sub = 'remove-operatingsystem'
-
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(cls._construct_command(
+            options, command_sub='remove-operatingsystem'))
 
         return result
 
@@ -415,10 +745,9 @@ class Base(object):
         Lists all smart class parameters.
         """
 
-        cls.command_sub = 'sc-params'
-
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='sc-params'),
+            output_format='csv')
 
         return result
 
@@ -428,9 +757,8 @@ class Base(object):
         Creates or updates parameter for a record.
         """
 
-        cls.command_sub = 'set-parameter'
-
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(cls._construct_command(
+            options, command_sub='set-parameter'))
 
         return result
 
@@ -440,10 +768,8 @@ class Base(object):
         Updates existing record.
         """
 
-        cls.command_sub = 'update'
-
         result = cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, command_sub='update'),
             output_format='csv',
             return_raw_response=return_raw_response,
         )
@@ -465,13 +791,33 @@ class Base(object):
         return Wrapper
 
     @classmethod
-    def _construct_command(cls, options=None):
-        """Build a hammer cli command based on the options passed"""
+    def _construct_command(cls, options=None, command_sub=None):
+        """Build a hammer cli command based on the options passed
+
+        :param options: the command options.
+        :param command_sub: the subcommand, like ``create`` or ``info``.
+            Defaults to ``cls.command_sub``. Passing it keeps the class
+            untouched, so concurrent calls on the same class can not swap
+            their subcommands.
+        """
+        if command_sub is None:
+            command_sub = cls.command_sub
         tail = u''
 
         if options is None:
             options = {}
 
+        if settings.hammer.validate_options:
+            command = u'{0} {1}'.format(cls.command_base, command_sub)
+            unknown = command_tree.get_index().unknown_options(
+                command,
+                [key for key, val in options.items()
+                 if val is not None and val is not False]
+            )
+            if unknown:
+                raise CLIError(u'Unknown options for "{0}": {1}'.format(
+                    command, u', '.join(unknown)))
+
         for key, val in options.items():
             if val is None:
                 continue
@@ -483,7 +829,7 @@ class Base(object):
                 tail += u' --{0}="{1}"'.format(key, val)
         cmd = u'{0} {1} {2}'.format(
             cls.command_base,
-            cls.command_sub,
+            command_sub,
             tail.strip()
         )
 
@@ -0,0 +1,112 @@
+# -*- encoding: utf-8 -*-
+"""Cache of the responses of read only hammer commands.
+
+When ``[hammer] response_cache`` is enabled
+:meth:`robottelo.cli.base.Base.execute` keeps the successful responses of the
+``info`` and ``list`` commands, like ``organization info`` or ``content-view
+version list``, and returns a copy of them when the same command is run again
+with the same credentials. The version info of a content view, read by
+:meth:`robottelo.cli.contentview.ContentView.version_info`, is the ``info``
+command ``content-view version info``, hammer has no ``version-info``
+command.
+
+Any other command is considered as changing data and invalidates the cached
+responses of the same hammer resource: ``content-view publish`` or
+``content-view filter create`` drop every cached ``content-view ...``
+response. Changes made by other processes, by the API or UI or as a side
+effect of commands of other resources, like ``product info`` showing the
+sync state changed by ``repository synchronize``, are not tracked, use
+:meth:`ResponseCache.clear` when needed.
+"""
+import copy
+import threading
+
+
+class ResponseCache(object):
+    """Per process cache of hammer command responses.
+
+    Each hammer resource has a generation incremented on invalidation, a
+    response is only stored if no invalidation happened while its command
+    was running.
+    """
+
+    read_only_subcommands = ('info', 'list')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._responses = {}
+        self._generations = {}
+        self._epoch = 0  # incremented by clear
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _command_words(command):
+        """Return the words of ``command`` before its options."""
+        return command.split(u' --', 1)[0].split()
+
+    def is_read_only(self, command):
+        """Whether the response of ``command`` can be cached."""
+        words = self._command_words(command)
+        return len(words) > 1 and words[-1] in self.read_only_subcommands
+
+    def resource(self, command):
+        """Return the hammer resource ``command`` acts on."""
+        words = self._command_words(command)
+        return words[0] if words else u''
+
+    def generation(self, resource):
+        """Return the current generation of ``resource``."""
+        with self._lock:
+            return self._epoch, self._generations.get(resource, 0)
+
+    def get(self, resource, key):
+        """Return a copy of the response cached for ``key`` or ``None``."""
+        with self._lock:
+            response = self._responses.get((resource, key))
+            if response is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return copy.deepcopy(response)
+
+    def set(self, resource, key, response, generation):
+        """Cache a copy of ``response`` if ``resource`` was not invalidated
+        since ``generation``.
+        """
+        response = copy.deepcopy(response)
+        with self._lock:
+            if (self._epoch, self._generations.get(resource, 0)) == generation:
+                self._responses[(resource, key)] = response
+
+    def invalidate(self, resource):
+        """Drop the cached responses of ``resource``."""
+        with self._lock:
+            self._generations[resource] = (
+                self._generations.get(resource, 0) + 1)
+            for cached in [
+                    cached for cached in self._responses
+                    if cached[0] == resource]:
+                del self._responses[cached]
+            self.invalidations += 1
+
+    def clear(self):
+        """Drop all the cached responses and reset the counters."""
+        with self._lock:
+            self._epoch += 1
+            self._responses.clear()
+            self.hits = self.misses = self.invalidations = 0
+
+    def stats(self):
+        """Return the cache counters and size, to tune its usage."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'size': len(self._responses),
+            }
+
+
+response_cache = ResponseCache()
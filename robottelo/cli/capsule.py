@@ -35,10 +35,10 @@ class Capsule(Base):
     def content_add_lifecycle_environment(cls, options):
         """Add lifecycle environments to the capsule."""
 
-        cls.command_sub = 'content add-lifecycle-environment'
-
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(
+                options, command_sub='content add-lifecycle-environment'),
+            output_format='csv')
 
         return result
 
@@ -46,10 +46,12 @@ class Capsule(Base):
     def content_available_lifecycle_environments(cls, options):
         """List the lifecycle environments not attached to the capsule."""
 
-        cls.command_sub = 'content available-lifecycle-environments'
-
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(
+                options,
+                command_sub='content available-lifecycle-environments'
+            ),
+            output_format='csv')
 
         return result
 
@@ -57,10 +59,9 @@ class Capsule(Base):
     def content_info(cls, options):
         """Get current capsule synchronization status."""
 
-        cls.command_sub = 'content info'
-
         result = cls.execute(
-            cls._construct_command(options), output_format='json')
+            cls._construct_command(options, command_sub='content info'),
+            output_format='json')
 
         return result
 
@@ -68,10 +69,10 @@ class Capsule(Base):
     def content_lifecycle_environments(cls, options):
         """List the lifecycle environments attached to the capsule."""
 
-        cls.command_sub = 'content lifecycle-environments'
-
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(
+                options, command_sub='content lifecycle-environments'),
+            output_format='csv')
 
         return result
 
@@ -79,10 +80,10 @@ class Capsule(Base):
     def content_remove_lifecycle_environment(cls, options):
         """Remove lifecycle environments from the capsule."""
 
-        cls.command_sub = 'content remove-lifecycle-environment'
-
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(
+                options, command_sub='content remove-lifecycle-environment'),
+            output_format='csv')
 
         return result
 
@@ -90,10 +91,10 @@ class Capsule(Base):
     def content_synchronization_status(cls, options):
         """Get current capsule synchronization status."""
 
-        cls.command_sub = 'content synchronization-status'
-
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(
+                options, command_sub='content synchronization-status'),
+            output_format='csv')
 
         return result
 
@@ -101,10 +102,9 @@ class Capsule(Base):
     def content_synchronize(cls, options):
         """Synchronize the content to the capsule."""
 
-        cls.command_sub = 'content synchronize'
-
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='content synchronize'),
+            output_format='csv')
 
         return result
 
@@ -112,10 +112,9 @@ class Capsule(Base):
     def import_classes(cls, options):
         """Import puppet classes from puppet Capsule."""
 
-        cls.command_sub = 'import-classes'
-
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='import-classes'),
+            output_format='csv')
 
         return result
 
@@ -123,9 +122,8 @@ class Capsule(Base):
     def refresh_features(cls, options):
         """Refresh capsule features."""
 
-        cls.command_sub = 'refresh-features'
-
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='refresh-features'),
+            output_format='csv')
 
         return result
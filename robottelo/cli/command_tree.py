@@ -0,0 +1,177 @@
+# -*- encoding: utf-8 -*-
+"""Tree of the hammer commands and the options they accept.
+
+The tree is built from the ``--help`` output of every hammer command, it has
+the same structure as ``tests/foreman/data/hammer_commands.json``. A full
+Satellite has hundreds of hammer commands, so the help of the subcommands is
+fetched concurrently over the pooled ssh connections, and the tree is saved
+in ``[hammer] command_tree_dir`` for each Satellite version to be generated
+only once.
+
+When ``[hammer] validate_options`` is enabled
+:meth:`robottelo.cli.base.Base._construct_command` looks the options up in the
+:class:`CommandIndex` of the tree and rejects the unknown ones before running
+hammer on the server.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from robottelo import ssh
+from robottelo.cli import hammer
+from robottelo.config import settings
+
+logger = logging.getLogger(__name__)
+
+GENERATE_MAX_WORKERS = 10
+
+
+def _fetch_help(command, hostname=None):
+    """Run ``command --help`` and parse its output."""
+    result = ssh.command(u'{0} --help'.format(command), hostname=hostname)
+    return hammer.parse_help(result.stdout)
+
+
+def generate_command_tree(command=u'hammer', max_workers=None, hostname=None):
+    """Walk through the hammer commands and subcommands and fetch their help.
+
+    The help of a command is requested as soon as its parent help listed it,
+    up to ``max_workers`` at the same time.
+
+    :param command: The command at the root of the tree.
+    :param max_workers: The maximum number of help commands running at the
+        same time. Defaults to ``GENERATE_MAX_WORKERS``.
+    :param hostname: The host to run the commands on. Defaults to the server
+        hostname from configuration.
+    :return: A dictionary with the ``options`` and ``subcommands`` of
+        ``command``, each subcommand having its own ``name``,
+        ``description``, ``options`` and ``subcommands``.
+    """
+    if max_workers is None:
+        max_workers = GENERATE_MAX_WORKERS
+    tree = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {
+            executor.submit(_fetch_help, command, hostname): (tree, command)}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                node, node_command = pending.pop(future)
+                node.update(future.result())
+                for subcommand in node['subcommands']:
+                    subcommand_command = u'{0} {1}'.format(
+                        node_command, subcommand['name'])
+                    future = executor.submit(
+                        _fetch_help, subcommand_command, hostname)
+                    pending[future] = (subcommand, subcommand_command)
+    return tree
+
+
+def command_tree_path(version):
+    """Return the path of the saved command tree of a Satellite version."""
+    directory = settings.hammer.command_tree_dir or tempfile.gettempdir()
+    return os.path.join(
+        directory, u'hammer_commands_{0}.json'.format(version))
+
+
+def save_command_tree(tree, path):
+    """Write the command ``tree`` to ``path`` as JSON.
+
+    The file is replaced at once, so concurrent processes never read a
+    partially written tree.
+    """
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    fd, temp_path = tempfile.mkstemp(dir=directory or None, suffix='.json')
+    with os.fdopen(fd, 'w') as tree_file:
+        json.dump(tree, tree_file, indent=2, sort_keys=True)
+    os.rename(temp_path, path)
+
+
+def load_command_tree(version=None):
+    """Return the command tree of a Satellite version, generating and saving
+    it if it was not saved yet.
+
+    :param version: The Satellite version. Defaults to the version of the
+        configured server.
+    """
+    if version is None:
+        # robottelo.host_info imports robottelo.cli.base
+        from robottelo.host_info import get_host_sat_version
+        version = get_host_sat_version()
+    path = command_tree_path(version)
+    if os.path.isfile(path):
+        with open(path) as tree_file:
+            return json.load(tree_file)
+    logger.info('Generating the hammer command tree for %s', version)
+    tree = generate_command_tree()
+    if version != 'Not Available':
+        save_command_tree(tree, path)
+    return tree
+
+
+class CommandIndex(object):
+    """Options accepted by each command of a hammer command tree.
+
+    :param tree: A command tree as returned by :func:`generate_command_tree`.
+    """
+
+    def __init__(self, tree):
+        # hammer options are accepted by all the commands
+        self.global_options = self._option_names(tree)
+        self._options = {}
+        nodes = [((), tree)]
+        while nodes:
+            words, node = nodes.pop()
+            self._options[words] = self._option_names(node)
+            for subcommand in node.get('subcommands', ()):
+                nodes.append((words + (subcommand['name'],), subcommand))
+
+    @staticmethod
+    def _option_names(node):
+        """Return the names of the options of a command tree ``node``,
+        including the deprecated names still accepted by hammer.
+        """
+        names = set()
+        for option in node.get('options', ()):
+            names.add(option['name'])
+            if option.get('deprecation_name'):
+                names.add(option['deprecation_name'])
+        return frozenset(names)
+
+    def options(self, command):
+        """Return the options accepted by ``command``, like ``organization
+        create``, or ``None`` if the command is not in the tree.
+        """
+        return self._options.get(tuple(command.split()))
+
+    def unknown_options(self, command, options):
+        """Return the sorted names in ``options`` which ``command`` does not
+        accept. Commands missing from the tree are not validated.
+        """
+        accepted = self.options(command)
+        if accepted is None:
+            return []
+        return sorted(
+            name for name in options
+            if name not in accepted and name not in self.global_options
+        )
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """Return the :class:`CommandIndex` of the configured server, loading
+    its command tree on first use.
+    """
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = CommandIndex(load_command_tree())
+        return _index
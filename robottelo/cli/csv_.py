@@ -11,9 +11,12 @@ Subcommands:
  activation-keys               import or export activation keys
  content-hosts                 import or export content hosts
  export                        export into directory
+ hosts                         import or export hosts
  import                        import by directory
  settings                      import or export settings
+ subnets                       import or export subnets
  subscriptions                 import or export subscriptions
+ users                         import or export users
 
 Options:
  -h, --help                    print help
@@ -53,8 +56,8 @@ class CSV_(Base):
             -h, --help                    print help
             -v, --verbose                 be verbose
         """
-        cls.command_sub = 'activation-keys'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(
+            options, command_sub='activation-keys'))
 
     @classmethod
     def content_hosts(cls, options=None):
@@ -128,8 +131,54 @@ class CSV_(Base):
             Subscription End        - Subscription end date (only applicable
                                     for --itemized-subscriptions)
         """
-        cls.command_sub = 'content-hosts'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(
+            options, command_sub='content-hosts'))
+
+    @classmethod
+    def hosts(cls, options=None):
+        """Import or export hosts
+
+        Usage::
+
+            hammer csv hosts [OPTIONS]
+
+        Options::
+
+            --continue-on-error           Continue processing even if
+                                          individual resource error
+            --export                      Export current data instead of
+                                          importing
+            --file FILE_NAME              CSV file (default to /dev/stdout with
+                                          --export, otherwise required)
+            --organization ORGANIZATION   Only process organization matching
+                                          this name
+            --search SEARCH               Only export search results
+        """
+        return cls.execute(cls._construct_command(
+            options, command_sub='hosts'))
+
+    @classmethod
+    def subnets(cls, options=None):
+        """Import or export subnets
+
+        Usage::
+
+            hammer csv subnets [OPTIONS]
+
+        Options::
+
+            --continue-on-error           Continue processing even if
+                                          individual resource error
+            --export                      Export current data instead of
+                                          importing
+            --file FILE_NAME              CSV file (default to /dev/stdout with
+                                          --export, otherwise required)
+            --organization ORGANIZATION   Only process organization matching
+                                          this name
+            --search SEARCH               Only export search results
+        """
+        return cls.execute(cls._construct_command(
+            options, command_sub='subnets'))
 
     @classmethod
     def subscriptions(cls, options=None):
@@ -151,5 +200,28 @@ class CSV_(Base):
                                           this name
             --search SEARCH               Only export search results
         """
-        cls.command_sub = 'subscriptions'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(
+            options, command_sub='subscriptions'))
+
+    @classmethod
+    def users(cls, options=None):
+        """Import or export users
+
+        Usage::
+
+            hammer csv users [OPTIONS]
+
+        Options::
+
+            --continue-on-error           Continue processing even if
+                                          individual resource error
+            --export                      Export current data instead of
+                                          importing
+            --file FILE_NAME              CSV file (default to /dev/stdout with
+                                          --export, otherwise required)
+            --organization ORGANIZATION   Only process organization matching
+                                          this name
+            --search SEARCH               Only export search results
+        """
+        return cls.execute(cls._construct_command(
+            options, command_sub='users'))
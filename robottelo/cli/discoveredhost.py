@@ -33,11 +33,11 @@ class DiscoveredHost(Base):
     @classmethod
     def provision(cls, options=None):
         """Manually provision discovered host"""
-        cls.command_sub = 'provision'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(
+            options, command_sub='provision'))
 
     @classmethod
     def facts(cls, options=None):
         """Get all the facts associated with discovered host"""
-        cls.command_sub = 'facts'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(
+            options, command_sub='facts'))
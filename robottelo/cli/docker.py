@@ -156,8 +156,7 @@ class DockerContainer(Base):
                                                       Default: 100
 
         """
-        cls.command_sub = 'logs'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(options, command_sub='logs'))
 
     @classmethod
     def start(cls, options=None):
@@ -175,8 +174,8 @@ class DockerContainer(Base):
             --name NAME                               Name to search by
 
         """
-        cls.command_sub = 'start'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(
+            options, command_sub='start'))
 
     @classmethod
     def status(cls, options=None):
@@ -194,8 +193,8 @@ class DockerContainer(Base):
             --name NAME                               Name to search by
 
         """
-        cls.command_sub = 'status'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(
+            options, command_sub='status'))
 
     @classmethod
     def stop(cls, options=None):
@@ -213,8 +212,7 @@ class DockerContainer(Base):
             --name NAME                               Name to search by
 
         """
-        cls.command_sub = 'stop'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(options, command_sub='stop'))
 
 
 class DockerManifest(Base):
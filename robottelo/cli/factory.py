@@ -3,11 +3,16 @@
 Factory object creation for all CLI methods
 """
 
+import csv
 import datetime
+import inspect
+import io
 import json
 import logging
 import os
 import random
+import six
+import threading
 import time
 
 from fauxfactory import (
@@ -31,9 +36,11 @@ from robottelo.cli.contentview import (
     ContentViewFilter,
     ContentViewFilterRule,
 )
+from robottelo.cli.csv_ import CSV_
 from robottelo.cli.discoveryrule import DiscoveryRule
 from robottelo.cli.docker import DockerContainer, DockerRegistry
 from robottelo.cli.domain import Domain
+from robottelo.cli.factory_profiler import factory_profiler
 from robottelo.cli.environment import Environment
 from robottelo.cli.filter import Filter
 from robottelo.cli.gpgkey import GPGKey
@@ -62,6 +69,7 @@ from robottelo.cli.subscription import Subscription
 from robottelo.cli.syncplan import SyncPlan
 from robottelo.cli.scap_policy import Scappolicy
 from robottelo.cli.scap_tailoring_files import TailoringFiles
+from robottelo.cli.task import Task
 from robottelo.cli.template import Template
 from robottelo.cli.user import User
 from robottelo.cli.usergroup import UserGroup, UserGroupExternal
@@ -94,6 +102,7 @@ from robottelo.decorators import bz_bug_is_open, cacheable
 from robottelo.helpers import (
     update_dictionary, default_url_on_new_port, get_available_capsule_port
 )
+from robottelo.pipeline import Pipeline
 from robottelo.ssh import download_file, upload_file
 from tempfile import mkstemp
 from time import sleep
@@ -104,6 +113,17 @@ ORG_KEYS = ['organization', 'organization-id', 'organization-label']
 CONTENT_VIEW_KEYS = ['content-view', 'content-view-id']
 LIFECYCLE_KEYS = ['lifecycle-environment', 'lifecycle-environment-id']
 
+# Columns of the ``hammer csv`` imports of the bulk factories, each with the
+# factory option it is filled from
+ACTIVATION_KEY_CSV_COLUMNS = [
+    (u'Name', u'name'),
+    (u'Organization', u'organization'),
+    (u'Description', u'description'),
+    (u'Limit', u'max-hosts'),
+    (u'Environment', u'lifecycle-environment'),
+    (u'Content View', u'content-view'),
+]
+
 
 class CLIFactoryError(Exception):
     """Indicates an error occurred while creating an entity using hammer"""
@@ -151,6 +171,184 @@ def create_object(cli_object, options, values):
     return result
 
 
+def _csv_value(value):
+    """Return the ``hammer csv`` column value of a factory option."""
+    if value is None:
+        return u''
+    if isinstance(value, bool):
+        return u'true' if value else u'false'
+    if isinstance(value, (list, tuple)):
+        return u','.join(six.text_type(item) for item in value)
+    return six.text_type(value)
+
+
+def create_objects_bulk(cli_object, csv_import, columns, rows, list_options):
+    """Create many <object> with a single ``hammer csv`` import.
+
+    The CSV file is generated locally, uploaded once and imported by a single
+    hammer command, the created objects are then read by a single ``list``
+    command.
+
+    :param cli_object: The CLI object listing the created objects.
+    :param csv_import: The :class:`robottelo.cli.csv_.CSV_` method importing
+        the objects, for example ``CSV_.users``.
+    :param list columns: The ``(column, option)`` pairs of the CSV file.
+    :param list rows: The options of each object to create.
+    :param dict list_options: The options of the ``list`` command returning
+        exactly the created objects.
+    :raise robottelo.cli.factory.CLIFactoryError: Raise an exception if the
+        objects cannot be created.
+    :rtype: list
+    :return: The created objects as listed by hammer, ordered by id.
+    """
+    if not rows:
+        return []
+    output = six.StringIO()
+    writer = csv.writer(output)
+    writer.writerow([column for column, _ in columns])
+    for row in rows:
+        writer.writerow([_csv_value(row.get(option)) for _, option in columns])
+    remote_file = u'/tmp/{0}_{1}.csv'.format(
+        cli_object.command_base, gen_alphanumeric(10))
+    start = time.time()
+    upload_file(io.BytesIO(output.getvalue().encode('utf-8')), remote_file)
+    try:
+        csv_import({u'file': remote_file})
+    except CLIReturnCodeError as err:
+        raise CLIFactoryError(
+            u'Failed to import {0} {1} with data:\n{2}\n{3}'.format(
+                len(rows),
+                cli_object.__name__,
+                output.getvalue(),
+                err.msg,
+            )
+        )
+    finally:
+        ssh.command(u'rm -f {0}'.format(remote_file))
+    result = cli_object.list(list_options)
+    if len(result) != len(rows):
+        raise CLIFactoryError(
+            u'Imported {0} {1} but {2} were found with {3}'.format(
+                len(rows), cli_object.__name__, len(result), list_options)
+        )
+    logger.debug(
+        u'%d %s created by hammer csv in %.2fs', len(rows),
+        cli_object.__name__, time.time() - start
+    )
+    return sorted(result, key=lambda entity: int(entity['id']))
+
+
+def _bulk_rows(count, name_key, options, defaults):
+    """Return the options of ``count`` objects named after a common prefix.
+
+    The prefix is ``options[name_key]`` or a generated one, so the created
+    objects can be searched with ``<name> ~ <prefix>-``.
+
+    :param callable defaults: A function returning the default options of a
+        row from its name.
+    :return: A tuple ``(prefix, rows)``.
+    """
+    options = dict(options or {})
+    prefix = options.pop(name_key, None) or gen_alphanumeric(8).lower()
+    rows = []
+    for index in range(count):
+        name = u'{0}-{1}'.format(prefix, index + 1)
+        row = defaults(name)
+        row.update(options)
+        row[name_key] = name
+        rows.append(row)
+    return prefix, rows
+
+
+def wait_for_condition(condition, timeout=60, delay=0.5, max_delay=10,
+                       backoff=2, jitter=0.25, wake_up=None, message=None):
+    """Call ``condition`` until it returns a true value.
+
+    The first wait lasts ``delay`` seconds and each following one is
+    ``backoff`` times longer, up to ``max_delay``, so a fast server is not
+    made to wait for a fixed multi-second sleep. Each wait is randomly
+    lengthened or shortened by up to ``jitter`` of its duration so parallel
+    workers do not query the server all at once::
+
+        product = wait_for_condition(
+            lambda: Product.list({'search': 'name={0}'.format(name)}),
+            timeout=30
+        )
+
+    :param condition: A callable returning a true value once the wait is
+        over. Its exceptions are not caught.
+    :param timeout: The deadline in seconds, ``condition`` is called one last
+        time when it is reached.
+    :param wake_up: A ``threading.Event`` ending the current wait when set,
+        for example by :func:`task_completion_event`, ``condition`` being
+        then called right away. It only wakes up the waiter once.
+    :param message: The message of the error raised when the deadline is
+        reached.
+    :raise robottelo.cli.factory.CLIFactoryError: If ``condition`` did not
+        return a true value before the deadline.
+    :return: The true value returned by ``condition``.
+    """
+    deadline = time.time() + timeout
+    while True:
+        result = condition()
+        if result:
+            return result
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            raise CLIFactoryError(message or u'Timed out after {0}s waiting '
+                                  u'for {1}'.format(timeout, condition))
+        wait = min(remaining, delay * random.uniform(1 - jitter, 1 + jitter))
+        if wake_up is None:
+            sleep(wait)
+        elif wake_up.wait(wait):
+            logger.debug(u'Woken up while waiting for %s', condition)
+            wake_up = None
+        delay = min(delay * backoff, max_delay)
+
+
+def task_completion_event(search, timeout=600, stop=None):
+    """Return a ``threading.Event`` set once the foreman tasks matching
+    ``search`` are finished, to wake up :func:`wait_for_condition` early.
+
+    A background thread waits for the tasks to be found, then follows them
+    with ``hammer task progress`` until they are finished. The event is also
+    set when the tasks cannot be followed, the waiter then checking its
+    condition as usual.
+
+    :param search: The search query of the tasks.
+    :param timeout: The time in seconds to wait for the tasks to be found.
+    :param stop: A ``threading.Event`` the caller sets once its wait is over,
+        usually in a ``finally`` clause, so the thread stops following the
+        tasks.
+    """
+    event = threading.Event()
+    if stop is None:
+        stop = threading.Event()
+
+    def tasks_found():
+        # the wait ends with no task once the caller stopped waiting too
+        return [{}] if stop.is_set() else Task.list({u'search': search})
+
+    def follow_tasks():
+        try:
+            tasks = wait_for_condition(
+                tasks_found, timeout=timeout, wake_up=stop)
+            for task in tasks:
+                # the caller may be done waiting between two polls
+                if stop.is_set():
+                    break
+                Task.progress({u'id': task['id']})
+        except (CLIFactoryError, CLIReturnCodeError) as err:
+            logger.debug(u'Failed to follow the tasks %s: %s', search, err)
+        finally:
+            event.set()
+
+    thread = threading.Thread(target=follow_tasks)
+    thread.daemon = True
+    thread.start()
+    return event
+
+
 def _entity_with_credentials(credentials, cli_entity_cls):
     """Create entity class using credentials. If credentials is None will
     return cli_entity_cls itself
@@ -213,6 +411,31 @@ def make_activation_key(options=None):
     return create_object(ActivationKey, args, options)
 
 
+def make_activation_key_bulk(count, options=None):
+    """Create ``count`` activation keys with a single ``hammer csv
+    activation-keys`` import, see :func:`create_objects_bulk`.
+
+    The organization, lifecycle environment and content view options are
+    names. The keys are named ``<name>-1`` to ``<name>-<count>``, ``name``
+    being generated if not given.
+
+    :return: The created activation keys as listed by hammer.
+    """
+    if not options or not options.get('organization'):
+        raise CLIFactoryError('Please provide a valid Organization name.')
+    prefix, rows = _bulk_rows(count, u'name', options, lambda name: {
+        u'description': None,
+        u'max-hosts': u'Unlimited',
+        u'lifecycle-environment': u'Library',
+        u'content-view': u'Default Organization View',
+    })
+    return create_objects_bulk(
+        ActivationKey, CSV_.activation_keys, ACTIVATION_KEY_CSV_COLUMNS, rows,
+        {u'organization': options['organization'],
+         u'search': u'name ~ {0}-'.format(prefix)}
+    )
+
+
 @cacheable
 def make_architecture(options=None):
     """
@@ -852,9 +1075,9 @@ def make_product_wait(options=None, wait_for=5):
     This is a temporary workaround for BZ#1332650: Sometimes cli product
     create errors for no reason when there are multiple product creation
     requests at the sametime although the product entities are created.  This
-    workaround will attempt to wait for 5 seconds and query the
-    product again to make sure it is actually created.  If it is not found,
-    it will fail and stop.
+    workaround will query the product again, for up to ``wait_for`` seconds,
+    to make sure it is actually created.  If it is not found, it will fail
+    and stop.
 
     Note: This wrapper method is created instead of patching make_product
     because this issue does not happen for all entities and this workaround
@@ -869,15 +1092,19 @@ def make_product_wait(options=None, wait_for=5):
     except CLIFactoryError as err:
         if not bz_bug_is_open(1332650):
             raise err
-        sleep(wait_for)
+
+        def product_info():
+            try:
+                return Product.info({
+                    'name': options.get('name'),
+                    'organization-id': options.get('organization-id'),
+                })
+            except CLIReturnCodeError:
+                return None
+
         try:
-            product = Product.info({
-                'name': options.get('name'),
-                'organization-id': options.get('organization-id'),
-            })
-        except CLIReturnCodeError:
-            raise err
-        if not product:
+            product = wait_for_condition(product_info, timeout=wait_for)
+        except CLIFactoryError:
             raise err
     return product
 
@@ -3012,100 +3239,203 @@ def setup_org_for_a_custom_repo(options=None):
             not options or
             not options.get('url')):
         raise CLIFactoryError('Please provide valid custom repo URL.')
+    pipeline = Pipeline()
     # Create new organization and lifecycle environment if needed
     if options.get('organization-id') is None:
-        org_id = make_org()['id']
+        pipeline.add(u'organization-id', lambda: make_org()['id'])
     else:
-        org_id = options['organization-id']
+        pipeline.add_value(u'organization-id', options['organization-id'])
     if options.get('lifecycle-environment-id') is None:
-        env_id = make_lifecycle_environment({u'organization-id': org_id})['id']
+        pipeline.add(
+            u'lifecycle-environment-id',
+            lambda org_id: make_lifecycle_environment(
+                {u'organization-id': org_id})['id'],
+            requires=[u'organization-id']
+        )
     else:
-        env_id = options['lifecycle-environment-id']
+        pipeline.add_value(
+            u'lifecycle-environment-id', options['lifecycle-environment-id'])
     # Create custom product and repository
-    custom_product = make_product({u'organization-id': org_id})
-    custom_repo = make_repository({
-        u'content-type': 'yum',
-        u'product-id': custom_product['id'],
-        u'url': options.get('url'),
-    })
+    pipeline.add(
+        u'product',
+        lambda org_id: make_product({u'organization-id': org_id}),
+        requires=[u'organization-id']
+    )
+    pipeline.add(
+        u'repository',
+        lambda product: make_repository({
+            u'content-type': 'yum',
+            u'product-id': product['id'],
+            u'url': options.get('url'),
+        }),
+        requires=[u'product']
+    )
     # Synchronize custom repository
+    pipeline.add(
+        u'synchronize',
+        lambda repo: _pipeline_step(
+            u'Failed to synchronize repository',
+            Repository.synchronize, {'id': repo['id']}
+        ),
+        requires=[u'repository']
+    )
+    # Create CV if needed and associate repo with it
+    _add_content_view_steps(pipeline, options, u'repository')
+    # Create activation key if needed and associate content view with it
+    _add_activation_key_steps(pipeline, options)
+    # Add subscription to activation-key
+    pipeline.add(
+        u'subscription',
+        lambda org_id, activationkey_id, updated, product: (
+            activationkey_add_subscription_to_repo({
+                u'activationkey-id': activationkey_id,
+                u'organization-id': org_id,
+                u'subscription': product['name'],
+            })
+        ),
+        requires=[
+            u'organization-id', u'activationkey-id', u'activationkey-update',
+            u'product',
+        ]
+    )
+    results = pipeline.run()
+    return {
+        u'activationkey-id': results[u'activationkey-id'],
+        u'content-view-id': results[u'content-view-id'],
+        u'lifecycle-environment-id': results[u'lifecycle-environment-id'],
+        u'organization-id': results[u'organization-id'],
+        u'product-id': results[u'product']['id'],
+        u'repository-id': results[u'repository']['id'],
+    }
+
+
+def _pipeline_step(error_message, function, options):
+    """Call ``function`` with ``options`` raising ``CLIFactoryError`` with
+    ``error_message`` if the hammer command fails.
+    """
     try:
-        Repository.synchronize({'id': custom_repo['id']})
+        return function(options)
     except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to synchronize repository\n{0}'.format(err.msg))
-    # Create CV if needed and associate repo with it
+        raise CLIFactoryError(u'{0}\n{1}'.format(error_message, err.msg))
+
+
+def _add_content_view_steps(pipeline, options, repository_step):
+    """Add the steps creating the content view if needed, adding the
+    repository to it, publishing it and promoting the new version to the
+    lifecycle environment.
+
+    The content view is created while the repository is synchronized, it is
+    published once the synchronization step is done.
+
+    :param pipeline: The :class:`robottelo.pipeline.Pipeline` of the setup,
+        with ``organization-id``, ``lifecycle-environment-id`` and
+        ``synchronize`` steps.
+    :param options: The setup options.
+    :param repository_step: The name of the step returning the repository.
+    """
     if options.get('content-view-id') is None:
-        cv_id = make_content_view({u'organization-id': org_id})['id']
+        pipeline.add(
+            u'content-view-id',
+            lambda org_id: make_content_view(
+                {u'organization-id': org_id})['id'],
+            requires=[u'organization-id']
+        )
     else:
-        cv_id = options['content-view-id']
-    try:
-        ContentView.add_repository({
-            u'id': cv_id,
-            u'organization-id': org_id,
-            u'repository-id': custom_repo['id'],
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to add repository to content view\n{0}'.format(err.msg))
+        pipeline.add_value(u'content-view-id', options['content-view-id'])
+    pipeline.add(
+        u'content-view-repository',
+        lambda org_id, cv_id, repo: _pipeline_step(
+            u'Failed to add repository to content view',
+            ContentView.add_repository, {
+                u'id': cv_id,
+                u'organization-id': org_id,
+                u'repository-id': repo['id'],
+            }
+        ),
+        requires=[u'organization-id', u'content-view-id', repository_step]
+    )
     # Publish a new version of CV
-    try:
-        ContentView.publish({u'id': cv_id})
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to publish new version of content view\n{0}'
-            .format(err.msg)
+    pipeline.add(
+        u'content-view-publish',
+        lambda cv_id, added, synchronized: _pipeline_step(
+            u'Failed to publish new version of content view',
+            ContentView.publish, {u'id': cv_id}
+        ),
+        requires=[
+            u'content-view-id', u'content-view-repository', u'synchronize']
+    )
+
+    def promote(org_id, env_id, cv_id, published):
+        # Get the version id
+        cvv = _pipeline_step(
+            u'Failed to fetch content view info',
+            ContentView.info, {u'id': cv_id}
+        )['versions'][-1]
+        # Promote version to next env
+        _pipeline_step(
+            u'Failed to promote version to next environment',
+            ContentView.version_promote, {
+                u'id': cvv['id'],
+                u'organization-id': org_id,
+                u'to-lifecycle-environment-id': env_id,
+            }
         )
-    # Get the version id
-    cvv = ContentView.info({u'id': cv_id})['versions'][-1]
-    # Promote version to next env
-    try:
-        ContentView.version_promote({
-            u'id': cvv['id'],
-            u'organization-id': org_id,
-            u'to-lifecycle-environment-id': env_id,
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to promote version to next environment\n{0}'
-            .format(err.msg)
+
+    pipeline.add(
+        u'content-view-promote', promote,
+        requires=[
+            u'organization-id', u'lifecycle-environment-id',
+            u'content-view-id', u'content-view-publish',
+        ]
+    )
+
+
+def _add_activation_key_steps(pipeline, options):
+    """Add the steps creating the activation key if needed and associating
+    the promoted content view with it.
+
+    A new activation key is created while the content is prepared and is
+    associated with the content view and lifecycle environment once the
+    content view is promoted.
+
+    :param pipeline: The :class:`robottelo.pipeline.Pipeline` of the setup,
+        with ``organization-id``, ``lifecycle-environment-id``,
+        ``content-view-id`` and ``content-view-promote`` steps.
+    :param options: The setup options.
+    """
+    new_activation_key = options.get('activationkey-id') is None
+    if new_activation_key:
+        pipeline.add(
+            u'activationkey-id',
+            lambda org_id: make_activation_key(
+                {u'organization-id': org_id})['id'],
+            requires=[u'organization-id']
         )
-    # Create activation key if needed and associate content view with it
-    if options.get('activationkey-id') is None:
-        activationkey_id = make_activation_key({
-            u'content-view-id': cv_id,
-            u'lifecycle-environment-id': env_id,
-            u'organization-id': org_id,
-        })['id']
     else:
-        activationkey_id = options['activationkey-id']
+        pipeline.add_value(u'activationkey-id', options['activationkey-id'])
+
+    def update(org_id, env_id, cv_id, activationkey_id, promoted):
         # Given activation key may have no (or different) CV associated.
         # Associate activation key with CV just to be sure
-        try:
-            ActivationKey.update({
-                u'content-view-id': cv_id,
-                u'id': activationkey_id,
-                u'organization-id': org_id,
-            })
-        except CLIReturnCodeError as err:
-            raise CLIFactoryError(
-                u'Failed to associate activation-key with CV\n{0}'
-                .format(err.msg)
-            )
-    # Add subscription to activation-key
-    activationkey_add_subscription_to_repo({
-        u'activationkey-id': activationkey_id,
-        u'organization-id': org_id,
-        u'subscription': custom_product['name'],
-    })
-    return {
-        u'activationkey-id': activationkey_id,
-        u'content-view-id': cv_id,
-        u'lifecycle-environment-id': env_id,
-        u'organization-id': org_id,
-        u'product-id': custom_product['id'],
-        u'repository-id': custom_repo['id'],
-    }
+        ak_options = {
+            u'content-view-id': cv_id,
+            u'id': activationkey_id,
+            u'organization-id': org_id,
+        }
+        if new_activation_key:
+            ak_options[u'lifecycle-environment-id'] = env_id
+        _pipeline_step(
+            u'Failed to associate activation-key with CV',
+            ActivationKey.update, ak_options
+        )
+
+    pipeline.add(
+        u'activationkey-update', update,
+        requires=[
+            u'organization-id', u'lifecycle-environment-id',
+            u'content-view-id', u'activationkey-id', u'content-view-promote',
+        ]
+    )
 
 
 def _setup_org_for_a_rh_repo(options=None):
@@ -3155,133 +3485,102 @@ def _setup_org_for_a_rh_repo(options=None):
             not options.get('repository')):
         raise CLIFactoryError(
             'Please provide valid product, repository-set and repo.')
+    pipeline = Pipeline()
     # Create new organization and lifecycle environment if needed
     if options.get('organization-id') is None:
-        org_id = make_org()['id']
+        pipeline.add(u'organization-id', lambda: make_org()['id'])
     else:
-        org_id = options['organization-id']
+        pipeline.add_value(u'organization-id', options['organization-id'])
     if options.get('lifecycle-environment-id') is None:
-        env_id = make_lifecycle_environment({u'organization-id': org_id})['id']
-    else:
-        env_id = options['lifecycle-environment-id']
-    # Clone manifest and upload it
-    with manifests.clone() as manifest:
-        upload_file(manifest.content, manifest.filename)
-    try:
-        Subscription.upload({
-            u'file': manifest.filename,
-            u'organization-id': org_id,
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to upload manifest\n{0}'.format(err.msg))
-    # Enable repo from Repository Set
-    try:
-        RepositorySet.enable({
-            u'basearch': 'x86_64',
-            u'name': options['repository-set'],
-            u'organization-id': org_id,
-            u'product': options['product'],
-            u'releasever': options.get('releasever'),
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to enable repository set\n{0}'.format(err.msg))
-    # Fetch repository info
-    try:
-        rhel_repo = Repository.info({
-            u'name': options['repository'],
-            u'organization-id': org_id,
-            u'product': options['product'],
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to fetch repository info\n{0}'.format(err.msg))
-    # Synchronize the RH repository
-    try:
-        Repository.synchronize({
-            u'name': options['repository'],
-            u'organization-id': org_id,
-            u'product': options['product'],
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to synchronize repository\n{0}'.format(err.msg))
-    # Create CV if needed and associate repo with it
-    if options.get('content-view-id') is None:
-        cv_id = make_content_view({u'organization-id': org_id})['id']
+        pipeline.add(
+            u'lifecycle-environment-id',
+            lambda org_id: make_lifecycle_environment(
+                {u'organization-id': org_id})['id'],
+            requires=[u'organization-id']
+        )
     else:
-        cv_id = options['content-view-id']
-    try:
-        ContentView.add_repository({
-            u'id': cv_id,
-            u'organization-id': org_id,
-            u'repository-id': rhel_repo['id'],
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to add repository to content view\n{0}'.format(err.msg))
-    # Publish a new version of CV
-    try:
-        ContentView.publish({u'id': cv_id})
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to publish new version of content view\n{0}'
-            .format(err.msg)
+        pipeline.add_value(
+            u'lifecycle-environment-id', options['lifecycle-environment-id'])
+
+    def upload_manifest(org_id):
+        # Clone manifest and upload it
+        with manifests.clone() as manifest:
+            upload_file(manifest.content, manifest.filename)
+        _pipeline_step(
+            u'Failed to upload manifest',
+            Subscription.upload, {
+                u'file': manifest.filename,
+                u'organization-id': org_id,
+            }
         )
-    # Get the version id
-    try:
-        cvv = ContentView.info({u'id': cv_id})['versions'][-1]
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to fetch content view info\n{0}'.format(err.msg))
-    # Promote version1 to next env
-    try:
-        ContentView.version_promote({
-            u'id': cvv['id'],
-            u'organization-id': org_id,
-            u'to-lifecycle-environment-id': env_id,
-        })
-    except CLIReturnCodeError as err:
-        raise CLIFactoryError(
-            u'Failed to promote version to next environment\n{0}'
-            .format(err.msg)
+
+    pipeline.add(
+        u'manifest', upload_manifest, requires=[u'organization-id'])
+
+    def enable_repository(org_id, manifest):
+        # Enable repo from Repository Set
+        _pipeline_step(
+            u'Failed to enable repository set',
+            RepositorySet.enable, {
+                u'basearch': 'x86_64',
+                u'name': options['repository-set'],
+                u'organization-id': org_id,
+                u'product': options['product'],
+                u'releasever': options.get('releasever'),
+            }
+        )
+        # Fetch repository info
+        return _pipeline_step(
+            u'Failed to fetch repository info',
+            Repository.info, {
+                u'name': options['repository'],
+                u'organization-id': org_id,
+                u'product': options['product'],
+            }
         )
+
+    pipeline.add(
+        u'repository', enable_repository,
+        requires=[u'organization-id', u'manifest']
+    )
+    # Synchronize the RH repository
+    pipeline.add(
+        u'synchronize',
+        lambda org_id, repo: _pipeline_step(
+            u'Failed to synchronize repository',
+            Repository.synchronize, {
+                u'name': options['repository'],
+                u'organization-id': org_id,
+                u'product': options['product'],
+            }
+        ),
+        requires=[u'organization-id', u'repository']
+    )
+    # Create CV if needed and associate repo with it
+    _add_content_view_steps(pipeline, options, u'repository')
     # Create activation key if needed and associate content view with it
-    if options.get('activationkey-id') is None:
-        activationkey_id = make_activation_key({
-            u'content-view-id': cv_id,
-            u'lifecycle-environment-id': env_id,
-            u'organization-id': org_id,
-        })['id']
-    else:
-        activationkey_id = options['activationkey-id']
-        # Given activation key may have no (or different) CV associated.
-        # Associate activation key with CV just to be sure
-        try:
-            ActivationKey.update({
-                u'id': activationkey_id,
+    _add_activation_key_steps(pipeline, options)
+    # Add subscription to activation-key
+    pipeline.add(
+        u'subscription',
+        lambda org_id, activationkey_id, updated: (
+            activationkey_add_subscription_to_repo({
                 u'organization-id': org_id,
-                u'content-view-id': cv_id,
+                u'activationkey-id': activationkey_id,
+                u'subscription': options.get(
+                    u'subscription', DEFAULT_SUBSCRIPTION_NAME),
             })
-        except CLIReturnCodeError as err:
-            raise CLIFactoryError(
-                u'Failed to associate activation-key with CV\n{0}'
-                .format(err.msg)
-            )
-    # Add subscription to activation-key
-    activationkey_add_subscription_to_repo({
-        u'organization-id': org_id,
-        u'activationkey-id': activationkey_id,
-        u'subscription': options.get(
-            u'subscription', DEFAULT_SUBSCRIPTION_NAME),
-    })
+        ),
+        requires=[
+            u'organization-id', u'activationkey-id', u'activationkey-update']
+    )
+    results = pipeline.run()
     return {
-        u'activationkey-id': activationkey_id,
-        u'content-view-id': cv_id,
-        u'lifecycle-environment-id': env_id,
-        u'organization-id': org_id,
-        u'repository-id': rhel_repo['id'],
+        u'activationkey-id': results[u'activationkey-id'],
+        u'content-view-id': results[u'content-view-id'],
+        u'lifecycle-environment-id': results[u'lifecycle-environment-id'],
+        u'organization-id': results[u'organization-id'],
+        u'repository-id': results[u'repository']['id'],
     }
 
 
@@ -3810,96 +4109,144 @@ def setup_cdn_and_custom_repos_content(
     if rh_subscriptions is None:
         rh_subscriptions = []
 
-    if upload_manifest:
-        # Upload the organization manifest
-        try:
-            manifests.upload_manifest_locked(org_id, manifests.clone(),
-                                             interface=manifests.INTERFACE_CLI)
-        except CLIReturnCodeError as err:
-            raise CLIFactoryError(
-                u'Failed to upload manifest\n{0}'.format(err.msg))
+    pipeline = Pipeline()
+
+    def upload_organization_manifest():
+        if upload_manifest:
+            # Upload the organization manifest
+            try:
+                manifests.upload_manifest_locked(
+                    org_id, manifests.clone(),
+                    interface=manifests.INTERFACE_CLI
+                )
+            except CLIReturnCodeError as err:
+                raise CLIFactoryError(
+                    u'Failed to upload manifest\n{0}'.format(err.msg))
 
-    custom_product, repos_info = setup_cdn_and_custom_repositories(
-        org_id=org_id,
-        repos=repos,
-        download_policy=download_policy
+    pipeline.add(u'manifest', upload_organization_manifest)
+    pipeline.add(
+        u'repositories',
+        lambda manifest: setup_cdn_and_custom_repositories(
+            org_id=org_id,
+            repos=repos,
+            download_policy=download_policy
+        ),
+        requires=[u'manifest']
     )
     if default_cv:
-        activation_key = make_activation_key({
-            u'organization-id': org_id,
-            u'lifecycle-environment': 'Library',
-        })
-        content_view = ContentView.info({
-            u'organization-id': org_id,
-            u'name': u'Default Organization View'
-        })
+        pipeline.add(
+            u'activation-key',
+            lambda: make_activation_key({
+                u'organization-id': org_id,
+                u'lifecycle-environment': 'Library',
+            })
+        )
+        pipeline.add(
+            u'content-view',
+            lambda: ContentView.info({
+                u'organization-id': org_id,
+                u'name': u'Default Organization View'
+            })
+        )
     else:
-        # Create a content view
-        content_view = make_content_view({u'organization-id': org_id})
-        # Add repositories to content view
-        for repo_info in repos_info:
-            ContentView.add_repository({
-                u'id': content_view['id'],
+        # Create a content view while the repositories are set up
+        pipeline.add(
+            u'new-content-view',
+            lambda: make_content_view({u'organization-id': org_id})
+        )
+
+        def publish_content_view(content_view, repositories):
+            _, repos_info = repositories
+            # Add repositories to content view
+            for repo_info in repos_info:
+                ContentView.add_repository({
+                    u'id': content_view['id'],
+                    u'organization-id': org_id,
+                    u'repository-id': repo_info['id'],
+                })
+            # Publish the content view
+            ContentView.publish({u'id': content_view['id']})
+            # Get the latest content view version id
+            content_view_version = ContentView.info({
+                u'id': content_view['id']
+            })['versions'][-1]
+            # Promote content view version to lifecycle environment
+            ContentView.version_promote({
+                u'id': content_view_version['id'],
                 u'organization-id': org_id,
-                u'repository-id': repo_info['id'],
+                u'to-lifecycle-environment-id': lce_id,
             })
-        # Publish the content view
-        ContentView.publish({u'id': content_view['id']})
-        # Get the latest content view version id
-        content_view_version = ContentView.info({
-            u'id': content_view['id']
-         })['versions'][-1]
-        # Promote content view version to lifecycle environment
-        ContentView.version_promote({
-            u'id': content_view_version['id'],
-            u'organization-id': org_id,
-            u'to-lifecycle-environment-id': lce_id,
-        })
-        content_view = ContentView.info({u'id': content_view['id']})
-        activation_key = make_activation_key({
-            u'organization-id': org_id,
-            u'lifecycle-environment-id': lce_id,
-            u'content-view-id': content_view['id'],
-        })
-    # Get organization subscriptions
-    subscriptions = Subscription.list({
-        u'organization-id': org_id},
-        per_page=False
+            return ContentView.info({u'id': content_view['id']})
+
+        pipeline.add(
+            u'content-view', publish_content_view,
+            requires=[u'new-content-view', u'repositories']
+        )
+        pipeline.add(
+            u'activation-key',
+            lambda content_view: make_activation_key({
+                u'organization-id': org_id,
+                u'lifecycle-environment-id': lce_id,
+                u'content-view-id': content_view['id'],
+            }),
+            requires=[u'content-view']
+        )
+
+    def add_subscriptions(activation_key, repositories):
+        custom_product, _ = repositories
+        # Get organization subscriptions
+        subscriptions = Subscription.list({
+            u'organization-id': org_id},
+            per_page=False
+        )
+        # Add subscriptions to activation-key
+        needed_subscription_names = list(rh_subscriptions)
+        if custom_product:
+            needed_subscription_names.append(custom_product['name'])
+        added_subscription_names = []
+        for subscription in subscriptions:
+            if (subscription['name'] in needed_subscription_names
+                    and subscription['name'] not in added_subscription_names):
+                ActivationKey.add_subscription({
+                    u'id': activation_key['id'],
+                    u'subscription-id': subscription['id'],
+                    u'quantity': 1,
+                })
+                added_subscription_names.append(subscription['name'])
+                if (len(added_subscription_names)
+                        == len(needed_subscription_names)):
+                    break
+        missing_subscription_names = set(
+            needed_subscription_names).difference(
+                set(added_subscription_names))
+        if missing_subscription_names:
+            raise CLIFactoryError(
+                u'Missing subscriptions: {0}'
+                .format(missing_subscription_names)
+            )
+
+    pipeline.add(
+        u'subscriptions', add_subscriptions,
+        requires=[u'activation-key', u'repositories']
     )
-    # Add subscriptions to activation-key
-    needed_subscription_names = list(rh_subscriptions)
-    if custom_product:
-        needed_subscription_names.append(custom_product['name'])
-    added_subscription_names = []
-    for subscription in subscriptions:
-        if (subscription['name'] in needed_subscription_names
-                and subscription['name'] not in added_subscription_names):
-            ActivationKey.add_subscription({
-                u'id': activation_key['id'],
-                u'subscription-id': subscription['id'],
-                u'quantity': 1,
+    if lce_id:
+        pipeline.add(
+            u'lce',
+            lambda: LifecycleEnvironment.info({
+                'id': lce_id,
+                'organization-id': org_id,
             })
-            added_subscription_names.append(subscription['name'])
-            if (len(added_subscription_names)
-                    == len(needed_subscription_names)):
-                break
-    missing_subscription_names = set(
-        needed_subscription_names).difference(set(added_subscription_names))
-    if missing_subscription_names:
-        raise CLIFactoryError(
-            u'Missing subscriptions: {0}'.format(missing_subscription_names))
+        )
+    results = pipeline.run()
+    custom_product, repos_info = results[u'repositories']
     data = dict(
-        activation_key=activation_key,
-        content_view=content_view,
+        activation_key=results[u'activation-key'],
+        content_view=results[u'content-view'],
         product=custom_product,
         repos=repos_info,
     )
     if lce_id:
-        lce = LifecycleEnvironment.info({
-            'id': lce_id,
-            'organization-id': org_id,
-        })
-        data['lce'] = lce
+        data['lce'] = results[u'lce']
 
     return data
 
@@ -4127,16 +4474,28 @@ def virt_who_hypervisor_config(
     if not org_hosts and not exec_one_shot:
         # we have to wait until the first report was sent.
         # the report is generated after the virt-who service startup, but some
-        # small delay can occur.
-        max_time = time.time() + 60
-        while time.time() <= max_time:
-            time.sleep(5)
-            org_hosts = Host.list({
-                'organization-id': org['id'],
-                'search': 'name={0}'.format(virt_who_hypervisor_hostname)
-            })
-            if org_hosts:
-                break
+        # small delay can occur, the hypervisor host is created by the task
+        # handling the report.
+        stop_following = threading.Event()
+        report_task = task_completion_event(
+            'label=Actions::Katello::Host::Hypervisors and '
+            'user=virt_who_reporter_{0}'.format(config_id),
+            timeout=60,
+            stop=stop_following,
+        )
+        try:
+            org_hosts = wait_for_condition(
+                lambda: Host.list({
+                    'organization-id': org['id'],
+                    'search': 'name={0}'.format(virt_who_hypervisor_hostname)
+                }),
+                timeout=60,
+                wake_up=report_task,
+            )
+        except CLIFactoryError:
+            org_hosts = []
+        finally:
+            stop_following.set()
 
     if len(org_hosts) == 0:
         raise CLIFactoryError(
@@ -4165,3 +4524,19 @@ def virt_who_hypervisor_config(
         'lifecycle_environment_id': lce['id'],
         'virt_who_hypervisor_host': virt_who_hypervisor_host,
     }
+
+
+def _profile_factories():
+    """Record the hammer round trips of the ``make_*`` and ``setup_*``
+    factories with the factory profiler, see
+    :mod:`robottelo.cli.factory_profiler`.
+    """
+    module_globals = globals()
+    for name, function in list(module_globals.items()):
+        if (inspect.isfunction(function) and
+                function.__module__ == __name__ and
+                name.startswith(('make_', 'setup_'))):
+            module_globals[name] = factory_profiler.profile(function)
+
+
+_profile_factories()
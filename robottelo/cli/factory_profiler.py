@@ -0,0 +1,231 @@
+# -*- encoding: utf-8 -*-
+"""Profile the hammer round trips of the CLI factories.
+
+Each :mod:`robottelo.cli.factory` factory hides a variable number of hammer
+commands, ``create`` followed by ``info``, an extra ``update`` or some
+``add-*`` commands. When ``[performance] profile_factories`` is enabled each
+factory call records, while it is running:
+
+* the number of hammer round trips done by
+  :class:`robottelo.cli.base.Base`, a batch of commands run in a single ssh
+  exec counting as one;
+* the bytes of the hammer commands and of their decoded output;
+* the time spent waiting for the commands over ssh;
+* the time hammer itself reported, only when ``time_hammer`` is enabled too.
+
+The nested factory calls are included in the values of their caller. The
+calls are attributed to the running test and a report is written at the end
+of the test session, as JSON or, when the report file name ends with
+``.folded``, as folded stacks of the ssh time in milliseconds which
+``flamegraph.pl`` turns into a flame graph.
+"""
+import functools
+import json
+import threading
+import time
+
+import six
+
+METRICS = ('executes', 'bytes', 'ssh_time', 'hammer_time')
+
+
+def _size(value):
+    """Return the approximate size in bytes of a command or of its output,
+    either text, lines or parsed CSV or JSON.
+    """
+    if value is None:
+        return 0
+    if isinstance(value, six.binary_type):
+        return len(value)
+    if isinstance(value, six.text_type):
+        return len(value.encode('utf-8'))
+    if isinstance(value, dict):
+        return sum(_size(key) + _size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(_size(item) + 1 for item in value)
+    return len(six.text_type(value))
+
+
+class _FactoryCall(object):
+    """A running factory call."""
+
+    def __init__(self, factory, parent):
+        self.factory = factory
+        self.stack = (parent.stack if parent else ()) + (factory,)
+        self.total = dict.fromkeys(METRICS, 0)
+        # the values not included in a nested factory call
+        self.own = dict.fromkeys(METRICS, 0)
+
+
+class FactoryProfiler(object):
+    """Hammer round trips of the factory calls made in this process."""
+
+    def __init__(self):
+        self.enabled = False
+        self.current_test = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._calls = []
+
+    def _stack(self):
+        """Return the factory calls running in the current thread."""
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def profile(self, function):
+        """Decorate a factory to record its calls when the profiler is
+        enabled.
+        """
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return function(*args, **kwargs)
+            stack = self._stack()
+            call = _FactoryCall(
+                function.__name__, stack[-1] if stack else None)
+            stack.append(call)
+            start = time.time()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                stack.pop()
+                record = {
+                    'test': self.current_test,
+                    'factory': call.factory,
+                    'stack': list(call.stack),
+                    'time': time.time() - start,
+                    'own': call.own,
+                }
+                record.update(call.total)
+                with self._lock:
+                    self._calls.append(record)
+        return wrapper
+
+    def propagate(self, function):
+        """Return a callable running ``function`` as part of the factory
+        calls running in the current thread, for ``function`` to be run in
+        another thread, like the steps of a
+        :class:`robottelo.pipeline.Pipeline`.
+        """
+        if not self.enabled:
+            return function
+        stack = list(self._stack())
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            previous = self._stack()
+            self._local.stack = list(stack)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self._local.stack = previous
+        return wrapper
+
+    def record(self, commands, responses, ssh_time, timings=()):
+        """Record a hammer round trip in the factory calls running in the
+        current thread.
+
+        :param commands: The hammer commands run in the round trip.
+        :param responses: Their ``SSHCommandResult``.
+        :param float ssh_time: The time spent waiting for the commands.
+        :param timings: The ``time -p`` timings of the commands, if any.
+        """
+        stack = self._stack()
+        if not stack:
+            return
+        values = {
+            'executes': 1,
+            'bytes': sum(_size(command) for command in commands) + sum(
+                _size(response.stdout) + _size(response.stderr)
+                for response in responses
+            ),
+            'ssh_time': ssh_time,
+            'hammer_time': sum(
+                timing['real'] for timing in timings if timing),
+        }
+        # the calls are shared with the threads they were propagated to
+        with self._lock:
+            for call in stack:
+                for name, value in values.items():
+                    call.total[name] += value
+            for name, value in values.items():
+                stack[-1].own[name] += value
+
+    def clear(self):
+        """Forget all the recorded factory calls."""
+        with self._lock:
+            del self._calls[:]
+
+    def report(self):
+        """Summarize the recorded factory calls.
+
+        :return: A dict with, under ``factories``, the ``calls``, ``time``
+            and round trip values of each factory, the factories with the
+            largest ssh time first, and under ``tests`` the same values of the
+            factories called by each test.
+        """
+        with self._lock:
+            calls = list(self._calls)
+        factories = {}
+        tests = {}
+        for call in calls:
+            for summary in (
+                    factories.setdefault(call['factory'], {}),
+                    tests.setdefault(call['test'] or u'', {}).setdefault(
+                        call['factory'], {})):
+                summary['calls'] = summary.get('calls', 0) + 1
+                for name in METRICS + ('time',):
+                    summary[name] = summary.get(name, 0) + call[name]
+
+        def summaries(by_factory):
+            result = []
+            for factory, summary in by_factory.items():
+                summary = dict(summary, factory=factory)
+                for name in ('ssh_time', 'hammer_time', 'time'):
+                    summary[name] = round(summary[name], 3)
+                result.append(summary)
+            result.sort(key=lambda summary: summary['ssh_time'], reverse=True)
+            return result
+
+        return {
+            'factories': summaries(factories),
+            'tests': {
+                test: summaries(by_factory)
+                for test, by_factory in tests.items()
+            },
+        }
+
+    def folded_stacks(self):
+        """Return the ssh time in milliseconds spent by each stack of test
+        and factory calls, as ``flamegraph.pl`` folded stack lines.
+        """
+        with self._lock:
+            calls = list(self._calls)
+        stacks = {}
+        for call in calls:
+            frames = [call['test'] or u'unknown'] + call['stack']
+            key = u';'.join(frame.replace(u';', u'_') for frame in frames)
+            stacks[key] = stacks.get(key, 0) + call['own']['ssh_time']
+        return [
+            u'{0} {1}'.format(key, int(round(ssh_time * 1000)))
+            for key, ssh_time in sorted(stacks.items())
+        ]
+
+    def write_report(self, path):
+        """Write :meth:`report` to ``path`` as JSON, or
+        :meth:`folded_stacks` when ``path`` ends with ``.folded``.
+        """
+        with open(path, 'w') as report_file:
+            if path.endswith('.folded'):
+                for line in self.folded_stacks():
+                    report_file.write(line + u'\n')
+            else:
+                json.dump(self.report(), report_file, indent=2, sort_keys=True)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._calls)
+
+
+factory_profiler = FactoryProfiler()
@@ -1,13 +1,20 @@
 """Helpers to interact with hammer command line utility."""
 import csv
+import functools
 import json
 
 import re
 import six
 from six import text_type
 from six.moves import cStringIO as StringIO
+from six.moves import intern
 from six.moves import zip
 
+try:
+    from collections.abc import Mapping, Sequence
+except ImportError:  # pragma: no cover
+    from collections import Mapping, Sequence
+
 
 def _csv_reader(output):
     """An unicode CSV reader which processes unicode strings and return unicode
@@ -28,15 +35,15 @@ def _csv_reader(output):
     :return: generator that will yield a list of unicode string values.
 
     """
-    data = '\n'.join(output)
     if six.PY2:
-        data = data.encode('utf8')
-    handler = StringIO(data)
-
-    for row in csv.reader(handler):  # pragma: no cover
-        if six.PY2:
+        handler = StringIO('\n'.join(output).encode('utf8'))
+        for row in csv.reader(handler):  # pragma: no cover
             yield [value.decode('utf8') for value in row]
-        else:
+    else:
+        # Lines are consumed one by one, so streamed output is never fully
+        # held in memory. The line breaks are restored to keep the ones of
+        # quoted multiline values.
+        for row in csv.reader(line + '\n' for line in output):
             yield row
 
 
@@ -46,35 +53,135 @@ def _normalize(header):
     return header.replace(' ', '-').lower()
 
 
-def parse_json(stdout):
+# Bound of the normalized keys cache, hammer outputs mostly use a small set
+# of keys but facts and parameter names vary with the hosts
+NORMALIZED_KEYS_CACHE_SIZE = 1024
+
+
+@functools.lru_cache(maxsize=NORMALIZED_KEYS_CACHE_SIZE)
+def _normalize_key(key):
+    """Return the cached :func:`_normalize` translation of a key."""
+    normalized = _normalize(key)
+    if six.PY3:
+        normalized = intern(normalized)
+    return normalized
+
+
+def _normalized_dict(pairs):
+    """Build a JSON object with normalized keys."""
+    return {_normalize_key(key): value for key, value in pairs}
+
+
+def parse_json(stdout, coerce_ints=True):
     """Parse JSON output from Hammer CLI and convert it to python dictionary
     while normalizing keys.
+
+    Keys are normalized and integers converted while the JSON is decoded,
+    instead of rebuilding the parsed objects afterwards.
+
+    :param stdout: The JSON output.
+    :param coerce_ints: Return integers as strings, like :func:`parse_csv`
+        does.
+    """
+    return json.loads(
+        stdout,
+        object_pairs_hook=_normalized_dict,
+        parse_int=text_type if coerce_ints else None,
+    )
+
+
+class CSVRow(Mapping):
+    """Read only view of a :class:`CSVTable` row mapping the header keys to
+    the row values, comparing equal to the dict :func:`parse_csv` returns for
+    that row.
     """
-    parsed = json.loads(stdout)
-    return _normalize_obj(parsed)
+    __slots__ = ('_index', '_values')
+
+    def __init__(self, index, values):
+        self._index = index
+        self._values = values
+
+    def __getitem__(self, key):
+        position = self._index[key]
+        if position >= len(self._values):
+            raise KeyError(key)
+        return self._values[position]
+
+    def __iter__(self):
+        size = len(self._values)
+        return (
+            key for key, position in self._index.items() if position < size)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return repr(dict(self))
 
 
-def _normalize_obj(obj):
-    """Normalize all dict's keys replacing empty spaces with "-" and lowering
-    chars
+class CSVTable(Sequence):
+    """Compact output of :func:`parse_csv`.
+
+    The rows are kept as tuples of values sharing the header keys, a
+    :class:`CSVRow` view is only built when a row is accessed.
+
+    :param keys: the normalized header keys.
+    :param rows: a list of tuples of values.
+    """
+
+    def __init__(self, keys, rows):
+        self.keys = keys
+        self.rows = rows
+        # a duplicated header maps to its last value, as in the dicts
+        self._index = {key: position for position, key in enumerate(keys)}
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return CSVTable(self.keys, self.rows[index])
+        return CSVRow(self._index, self.rows[index])
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __eq__(self, other):
+        if isinstance(other, CSVTable):
+            return self.keys == other.keys and self.rows == other.rows
+        if isinstance(other, Sequence):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def to_dicts(self):
+        """Return the rows as the list of dicts :func:`parse_csv` returns by
+        default.
+        """
+        return [dict(zip(self.keys, values)) for values in self.rows]
+
+
+def parse_csv(output, compact=False):
+    """Parse CSV output from Hammer CLI and convert it to python dictionary.
+
+    :param output: an iterable of lines, consumed as it is parsed.
+    :param compact: return a :class:`CSVTable` keeping the rows as tuples
+        instead of a list of dicts, which is faster to build and uses less
+        memory for large outputs.
     """
-    if isinstance(obj, dict):
-        return {_normalize(k): _normalize_obj(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [_normalize_obj(v) for v in obj]
-    # doing this to conform to csv parser
-    elif isinstance(obj, int) and not isinstance(obj, bool):
-        return text_type(obj)
-    return obj
-
-
-def parse_csv(output):
-    """Parse CSV output from Hammer CLI and convert it to python dictionary."""
     reader = _csv_reader(output)
     # Generate the key names, spaces will be converted to dashes "-"
-    keys = [_normalize(header) for header in next(reader)]
+    keys = [_normalize(header) for header in next(reader, [])]
+    if six.PY3:
+        # share the key objects between the outputs of all the commands
+        keys = [intern(key) for key in keys]
+    if compact:
+        return CSVTable(keys, [tuple(values) for values in reader if values])
     # For each entry, create a dict mapping each key with each value
-    return [dict(zip(keys, values)) for values in reader if len(values) > 0]
+    return [dict(zip(keys, values)) for values in reader if values]
 
 
 def parse_help(output):
@@ -133,6 +240,7 @@ def parse_help(output):
             else:
                 contents['options'].append({
                     u'name': match.group('name'),
+                    u'deprecation_name': match.group('deprecation_name'),
                     u'shortname': match.group('shortname'),
                     u'value': match.group('value'),
                     u'help': match.group('help'),
@@ -185,8 +293,32 @@ def get_line_indentation_level(line, tab_spaces=4, indentation_spaces=4):
         line, tab_spaces=tab_spaces)//indentation_spaces
 
 
+# numbered item of a single value collection, like " 1) template1"
+_INFO_NUMBERED_VALUE_REGEX = re.compile(r'\d+\)\s+(.+)$')
+# number prefixing the first key of a numbered item, like " 1) Name: foo"
+_INFO_ITEM_NUMBER_REGEX = re.compile(r'(\d+)\)')
+
+
+def _info_indentation_level(line, stripped):
+    """Return the :func:`get_line_indentation_level` of ``line`` knowing its
+    left stripped version.
+    """
+    if len(line) < 4:
+        return 0
+    indentation = line[:len(line) - len(stripped)]
+    if indentation.strip(' \t'):
+        # other whitespace chars end the indentation
+        return get_line_indentation_level(line)
+    return (len(indentation) + 3 * indentation.count('\t')) // 4
+
+
 def parse_info(output):
-    """Parse the info output and returns a dict mapping the values."""
+    """Parse the info output and returns a dict mapping the values.
+
+    Lines are read once: each of them is left stripped and its indentation
+    level computed a single time, and the patterns are compiled once for all
+    the calls.
+    """
     # info dictionary
     contents = {}
     sub_prop = None  # stores name of the last group of sub-properties
@@ -197,96 +329,86 @@ def parse_info(output):
         # skip empty lines
         if line == '':
             continue
-        current_indent_level = get_line_indentation_level(line)
+        stripped = line.lstrip()
+        current_indent_level = _info_indentation_level(line, stripped)
         if current_indent_level <= 1:
             # we are entering or leaving a second level from lower/upper levels
             # clear the second level key
             second_level_key = None
-        if line.startswith(' '):  # sub-properties are indented
-            # values are separated by ':' or '=>', but not by '::' which can be
-            # entity name like 'test::params::keys'
-            if line.find(':') != -1 and not line.find('::') != -1:
-                key, value = line.lstrip().split(":", 1)
-            elif line.find('=>') != -1 and len(
-                    line.lstrip().split(" =>", 1)) == 2:
-                key, value = line.lstrip().split(" =>", 1)
-            else:
-                key = value = None
-
-            if key is None and value is None:
-                # Parse single attribute collection properties
-                # Template
-                #  1) template1
-                #  2) template2
-                #
-                # or
-                # Template
-                #  template1
-                #  template2
-                match = re.match(r'\d+\)\s+(.+)$', line.lstrip())
-
-                if match is None:
-                    match = re.match(r'(.*)$', line.lstrip())
-
-                value = match.group(1)
-
-                if isinstance(contents[sub_prop], dict):
-                    contents[sub_prop] = []
-
-                contents[sub_prop].append(value)
-            else:
-                # some properties have many numbered values
-                # Example:
-                # Content:
-                #  1) Repo Name: repo1
-                #     URL:       /custom/4f84fc90-9ffa-...
-                #  2) Repo Name: puppet1
-                #     URL:       /custom/4f84fc90-9ffa-...
-                starts_with_number = re.match(r'(\d+)\)', key)
-                if starts_with_number:
-                    sub_num = int(starts_with_number.group(1))
-                    # no. 1) we need to change dict() to list()
-                    if sub_num == 1:
-                        contents[sub_prop] = []
-                    # remove number from key
-                    key = re.sub(r'\d+\)', '', key)
-                    # append empty dict to array
-                    contents[sub_prop].append({})
-
-                key = key.lstrip().replace(' ', '-').lower()
-                value = value.lstrip()
-                # add value to dictionary
-                if sub_num is not None:
-                    contents[sub_prop][-1][key] = value
-                else:
-                    # a third level is always represented as a dictionary and
-                    # we need to detect if we are at third level
-                    # example:
-                    # Content Information:
-                    #     Content View:
-                    #         ID:   10
-                    #         Name: Default Organization View
-                    # the "ID" and "Name" are located at third indent level
-                    # "content view" is located at second indent level
-                    if current_indent_level == 2 and second_level_key:
-                        # we are at third level indentation
-                        if not contents[sub_prop][second_level_key]:
-                            contents[sub_prop][second_level_key] = {}
-                        contents[sub_prop][second_level_key][key] = value
-                    else:
-                        contents[sub_prop][key] = value
-                    if current_indent_level == 1 and not value:
-                        # always set the last possible second level key
-                        # that can form a third level
-                        second_level_key = key
-        else:
+        if line[0] != ' ':
             sub_num = None  # new property implies no sub property
-            key, value = line.lstrip().split(":", 1)
-            key = key.lstrip().replace(' ', '-').lower()
-            if value.lstrip() == '':  # 'key:' no value, new sub-property
+            key, value = stripped.split(':', 1)
+            key = key.replace(' ', '-').lower()
+            value = value.lstrip()
+            if value == '':  # 'key:' no value, new sub-property
                 sub_prop = key
                 contents[sub_prop] = {}
             else:  # 'key: value' line
-                contents[key] = value.lstrip()
+                contents[key] = value
+            continue
+        # sub-properties are indented, values are separated by ':' or '=>',
+        # but not by '::' which can be entity name like 'test::params::keys'
+        if ':' in stripped and '::' not in stripped:
+            key, value = stripped.split(':', 1)
+        elif ' =>' in stripped:
+            key, value = stripped.split(' =>', 1)
+        else:
+            # Parse single attribute collection properties
+            # Template
+            #  1) template1
+            #  2) template2
+            #
+            # or
+            # Template
+            #  template1
+            #  template2
+            match = _INFO_NUMBERED_VALUE_REGEX.match(stripped)
+            value = stripped if match is None else match.group(1)
+            if isinstance(contents[sub_prop], dict):
+                contents[sub_prop] = []
+            contents[sub_prop].append(value)
+            continue
+        # some properties have many numbered values
+        # Example:
+        # Content:
+        #  1) Repo Name: repo1
+        #     URL:       /custom/4f84fc90-9ffa-...
+        #  2) Repo Name: puppet1
+        #     URL:       /custom/4f84fc90-9ffa-...
+        if key[:1].isdigit():
+            starts_with_number = _INFO_ITEM_NUMBER_REGEX.match(key)
+            if starts_with_number:
+                sub_num = int(starts_with_number.group(1))
+                # no. 1) we need to change dict() to list()
+                if sub_num == 1:
+                    contents[sub_prop] = []
+                # remove number from key
+                key = _INFO_ITEM_NUMBER_REGEX.sub('', key).lstrip()
+                # append empty dict to array
+                contents[sub_prop].append({})
+        key = key.replace(' ', '-').lower()
+        value = value.lstrip()
+        # add value to dictionary
+        if sub_num is not None:
+            contents[sub_prop][-1][key] = value
+        elif current_indent_level == 2 and second_level_key:
+            # a third level is always represented as a dictionary and we need
+            # to detect if we are at third level
+            # example:
+            # Content Information:
+            #     Content View:
+            #         ID:   10
+            #         Name: Default Organization View
+            # the "ID" and "Name" are located at third indent level
+            # "content view" is located at second indent level
+            if not contents[sub_prop][second_level_key]:
+                contents[sub_prop][second_level_key] = {}
+            contents[sub_prop][second_level_key][key] = value
+        else:
+            contents[sub_prop][key] = value
+            if current_indent_level == 1 and not value:
+                # always set the last possible second level key
+                # that can form a third level
+                second_level_key = key
 
     return contents
@@ -0,0 +1,243 @@
+# -*- encoding: utf-8 -*-
+"""Long-lived ``hammer shell`` sessions.
+
+Every hammer invocation loads Ruby, all the hammer plugins and the API
+documentation cache before doing anything, which often takes longer than the
+command itself. When ``[hammer] shell_session`` is enabled
+:meth:`robottelo.cli.base.Base.execute` sends its commands to a ``hammer
+shell`` kept open for each server and user instead, so the start up cost is
+paid once per session.
+
+``hammer shell`` reads one command per line and prints its prompt again when
+the command is done, the output of a command is everything printed before
+the next prompt. The shell does not report the exit status of the commands it
+runs: a command which printed anything but warnings to ``stderr`` is given the
+return code ``1``, otherwise ``0``. As that guess can not tell the real exit
+status, only the read-only ``info`` and ``list`` commands are sent to the
+shell and the ones guessed failed are run again without it, see
+:meth:`robottelo.cli.base.Base.execute`. The sessions are started over ssh,
+the commands for a local host, see :func:`robottelo.ssh.is_local_host`, are
+always run without the shell.
+"""
+import atexit
+import codecs
+import logging
+import select
+import threading
+import time
+
+from robottelo import ssh
+from robottelo.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROMPT = u'hammer> '
+
+
+class HammerShellError(Exception):
+    """Raised when a hammer shell session can not be used anymore."""
+
+
+def _guess_return_code(stderr):
+    """Infer the return code of a command run in ``hammer shell`` from its
+    ``stderr``, as the shell does not expose it.
+    """
+    for line in (stderr or u'').splitlines():
+        line = line.strip()
+        if line and not line.lower().startswith(u'warning'):
+            return 1
+    return 0
+
+
+class HammerShellSession(object):
+    """A ``hammer shell`` process running on a remote host.
+
+    Commands are run one at a time, concurrent callers wait for the session
+    lock.
+
+    :param client: A connected SSH client, closed together with the session.
+    :param cmd: The command starting the hammer shell.
+    :param timeout: Time to wait for the first prompt.
+    """
+
+    chunk_size = 32768
+    # stdout and stderr are read from different pipes by sshd, stderr
+    # written before the prompt may still arrive right after it
+    stderr_grace = 0.05
+
+    def __init__(self, client, cmd, timeout=None):
+        if timeout is None:
+            timeout = settings.ssh_client.command_timeout
+        self.lock = threading.Lock()
+        self._client = client
+        self._stdout = u''
+        self._stderr = u''
+        self._stdout_decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        self._stderr_decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        self._channel = client.get_transport().open_session()
+        logger.info('>>> %s', cmd)
+        self._channel.exec_command(cmd)
+        try:
+            self._read_until_prompt(time.time() + timeout)
+        except Exception:
+            self.close()
+            raise
+        if self._stderr:
+            logger.info('<<< stderr\n%s', self._stderr)
+
+    @property
+    def closed(self):
+        """Whether the shell exited or the session was closed."""
+        return self._channel.closed or self._channel.eof_received
+
+    def close(self):
+        """Close the hammer shell and its SSH connection."""
+        self._channel.close()
+        self._client.close()
+
+    def _receive(self, deadline):
+        """Wait until ``deadline`` for output and append it to the buffers."""
+        channel = self._channel
+        if not (channel.recv_ready() or channel.recv_stderr_ready()):
+            if channel.eof_received or channel.closed:
+                raise HammerShellError(
+                    u'hammer shell exited:\n{0}'.format(self._stderr))
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise ssh.SSHCommandTimeoutError(
+                    'hammer shell did not respond in the predefined time')
+            select.select([channel], [], [], remaining)
+        while channel.recv_stderr_ready():
+            self._stderr += self._stderr_decoder.decode(
+                channel.recv_stderr(self.chunk_size))
+        if channel.recv_ready():
+            self._stdout += self._stdout_decoder.decode(
+                channel.recv(self.chunk_size))
+
+    def _read_until_prompt(self, deadline):
+        """Read the output until the shell prompts for the next command."""
+        channel = self._channel
+        while not (self._stdout.endswith(PROMPT) and not (
+                channel.recv_ready() or channel.recv_stderr_ready())):
+            self._receive(deadline)
+        grace_deadline = time.time() + self.stderr_grace
+        while select.select(
+                [channel], [], [], max(grace_deadline - time.time(), 0))[0]:
+            if channel.recv_ready():
+                # the prompt was part of the command output
+                return self._read_until_prompt(deadline)
+            if not channel.recv_stderr_ready():
+                # the shell exited
+                break
+            self._receive(deadline)
+        stdout = self._stdout[:-len(PROMPT)]
+        stderr = self._stderr
+        self._stdout = self._stderr = u''
+        return stdout, stderr
+
+    def run(self, command, output_format=None, timeout=None):
+        """Run a hammer ``command`` in the shell.
+
+        :param command: The hammer command, without the ``hammer`` prefix and
+            global options.
+        :param output_format: Value for the hammer ``--output`` option.
+        :param timeout: Time to wait for the command to finish. The session
+            is closed when it expires.
+        :return: SSHCommandResult
+        """
+        if timeout is None:
+            timeout = settings.ssh_client.command_timeout
+        line = u'{0}{1}'.format(
+            u'--output={0} '.format(output_format) if output_format else u'',
+            command,
+        ).strip()
+        with self.lock:
+            if self.closed:
+                raise HammerShellError(u'hammer shell session is closed')
+            logger.info('>>> [hammer shell] %s', line)
+            self._channel.sendall((line + u'\n').encode('utf-8'))
+            try:
+                stdout, stderr = self._read_until_prompt(
+                    time.time() + timeout)
+            except ssh.SSHCommandTimeoutError:
+                logger.error('hammer shell command did not respond in the '
+                             'predefined time (timeout=%s) and will be '
+                             'interrupted', timeout)
+                self.close()
+                raise ssh.SSHCommandTimeoutError(
+                    'hammer shell command: {0} \n did not respond in the '
+                    'predefined time (timeout={1})'.format(line, timeout)
+                )
+            except HammerShellError:
+                self.close()
+                raise
+        # Shells reading from a pipe may echo the command line back
+        first_line, _, rest = stdout.partition(u'\n')
+        if first_line.strip() == line:
+            stdout = rest
+        return ssh.make_result(
+            stdout, stderr, _guess_return_code(stderr), output_format)
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def _shell_command(user=None, password=None):
+    """Build the command starting a hammer shell for the given user."""
+    return u'LANG={0} hammer -v {1} {2} shell'.format(
+        settings.locale,
+        u'-u {0}'.format(user) if user is not None else u'--interactive no',
+        u'-p {0}'.format(password) if password is not None else u'',
+    )
+
+
+def get_session(user=None, password=None, hostname=None, timeout=None,
+                connection_timeout=None):
+    """Return the hammer shell session for ``hostname`` and ``user``,
+    starting a new one if there is none or the previous one exited.
+
+    :raises robottelo.cli.hammer_shell.HammerShellError: If ``hostname`` is a
+        local host, see :func:`robottelo.ssh.is_local_host`, whose commands
+        are not run over ssh.
+    """
+    if hostname is None:
+        hostname = settings.server.hostname
+    if ssh.is_local_host(hostname):
+        raise HammerShellError(
+            u'no hammer shell session for the local host {0}'.format(
+                hostname))
+    key = (hostname, user, password)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None or session.closed:
+            client = ssh.get_client(
+                hostname=hostname, timeout=connection_timeout)
+            session = HammerShellSession(
+                client, _shell_command(user, password).encode('utf-8'),
+                timeout=timeout,
+            )
+            _sessions[key] = session
+    return session
+
+
+def execute(command, user=None, password=None, output_format=None,
+            timeout=None, connection_timeout=None, hostname=None):
+    """Run a hammer ``command`` in the shell session of ``user``.
+
+    :return: SSHCommandResult
+    """
+    session = get_session(
+        user, password, hostname, timeout, connection_timeout)
+    return session.run(command, output_format=output_format, timeout=timeout)
+
+
+def close_sessions():
+    """Close all the hammer shell sessions."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+atexit.register(close_sessions)
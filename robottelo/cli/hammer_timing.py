@@ -0,0 +1,107 @@
+# -*- encoding: utf-8 -*-
+"""Statistics of the hammer commands timed with ``time -p``.
+
+When ``[performance] time_hammer`` is enabled
+:meth:`robottelo.cli.base.Base.execute` runs hammer under ``time -p``, which
+appends the ``real``, ``user`` and ``sys`` times to ``stderr``. Those lines
+are removed from the command result and recorded in :data:`hammer_timings`,
+grouped by hammer command, so a report of the commands taking most of the
+time can be written at the end of the test session.
+"""
+import json
+import re
+import threading
+
+_TIMING_REGEX = re.compile(
+    r'(?:^|\n)real\s+(\d+(?:[.,]\d+)?)\s*\n'
+    r'user\s+(\d+(?:[.,]\d+)?)\s*\n'
+    r'sys\s+(\d+(?:[.,]\d+)?)\s*\Z'
+)
+
+TIMES = ('real', 'user', 'sys')
+
+
+def split_timing(stderr):
+    """Separate the output of ``time -p`` from the rest of ``stderr``.
+
+    :param stderr: The ``stderr`` of a command run with ``time -p``.
+    :return: A tuple with ``stderr`` without the timing lines and a dict with
+        the ``real``, ``user`` and ``sys`` times in seconds, or ``None`` when
+        no timing was found.
+    """
+    match = _TIMING_REGEX.search(stderr or u'')
+    if match is None:
+        return stderr, None
+    timing = {
+        name: float(value.replace(u',', u'.'))
+        for name, value in zip(TIMES, match.groups())
+    }
+    return stderr[:match.start()], timing
+
+
+def _percentile(values, percent):
+    """Return the nearest-rank ``percent`` percentile of sorted ``values``.
+    """
+    index = max(int(round(percent / 100.0 * len(values))) - 1, 0)
+    return values[min(index, len(values) - 1)]
+
+
+class HammerTimings(object):
+    """Timings of the hammer commands run in this process, by command."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timings = {}
+
+    def record(self, command_base, command_sub, timing):
+        """Record the ``timing`` of a ``command_base command_sub`` run."""
+        with self._lock:
+            self._timings.setdefault(
+                (command_base, command_sub), []).append(timing)
+
+    def clear(self):
+        """Forget all the recorded timings."""
+        with self._lock:
+            self._timings.clear()
+
+    def report(self):
+        """Summarize the recorded timings.
+
+        :return: A list of dicts, one for each hammer command, with its
+            ``count`` and the ``total``, ``p50``, ``p95`` and ``max`` of each
+            of the ``real``, ``user`` and ``sys`` times. The commands with the
+            largest total ``real`` time come first.
+        """
+        with self._lock:
+            timings = {
+                key: list(values) for key, values in self._timings.items()}
+        report = []
+        for (command_base, command_sub), values in timings.items():
+            entry = {
+                'command_base': command_base,
+                'command_sub': command_sub,
+                'count': len(values),
+            }
+            for name in TIMES:
+                times = sorted(timing[name] for timing in values)
+                entry[name] = {
+                    'total': round(sum(times), 3),
+                    'p50': _percentile(times, 50),
+                    'p95': _percentile(times, 95),
+                    'max': times[-1],
+                }
+            report.append(entry)
+        report.sort(key=lambda entry: entry['real']['total'], reverse=True)
+        return report
+
+    def write_report(self, path):
+        """Write :meth:`report` to ``path`` as JSON."""
+        with open(path, 'w') as report_file:
+            json.dump(self.report(), report_file, indent=2, sort_keys=True)
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(values) for values in self._timings.values())
+
+
+hammer_timings = HammerTimings()
@@ -36,14 +36,14 @@ class HostCollection(Base):
     @classmethod
     def add_host(cls, options=None):
         """Add host to the host collection"""
-        cls.command_sub = 'add-host'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(
+            options, command_sub='add-host'))
 
     @classmethod
     def remove_host(cls, options=None):
         """Remove hosts from the host collection"""
-        cls.command_sub = 'remove-host'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(
+            options, command_sub='remove-host'))
 
     @classmethod
     def hosts(cls, options=None):
@@ -76,27 +76,27 @@ class HostCollection(Base):
              --search SEARCH                         filter results
              -h, --help                              print help
         """
-        cls.command_sub = 'hosts'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='hosts'),
+            output_format='csv')
 
     @classmethod
     def erratum_install(cls, options):
         """Schedule errata for installation"""
-        cls.command_sub = 'erratum install'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='erratum install'),
+            output_format='csv')
 
     @classmethod
     def package_install(cls, options):
         """Schedule package for installation"""
-        cls.command_sub = 'package install'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='package install'),
+            output_format='csv')
 
     @classmethod
     def copy(cls, options):
         """Clone existing host collection"""
-        cls.command_sub = 'copy'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='copy'),
+            output_format='csv')
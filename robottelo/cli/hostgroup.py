@@ -49,9 +49,9 @@ class HostGroup(Base):
             --per-page PER_PAGE               number of entries per request
             --search SEARCH                   filter results
         """
-        cls.command_sub = 'sc-params'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='sc-params'),
+            output_format='csv')
 
     @classmethod
     def smart_variables(cls, options=None):
@@ -71,6 +71,6 @@ class HostGroup(Base):
             --per-page PER_PAGE               number of entries per request
             --search SEARCH                   filter results
         """
-        cls.command_sub = 'smart-variables'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='smart-variables'),
+            output_format='csv')
@@ -28,6 +28,5 @@ class JobInvocation(Base):
     @classmethod
     def get_output(cls, options):
         """Get output of the job invocation"""
-        cls.command_sub = 'output'
         return cls.execute(
-            cls._construct_command(options))
+            cls._construct_command(options, command_sub='output'))
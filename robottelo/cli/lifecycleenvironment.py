@@ -38,5 +38,5 @@ class LifecycleEnvironment(Base):
 
     @classmethod
     def paths(cls, options=None):
-        cls.command_sub = 'paths'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(
+            options, command_sub='paths'))
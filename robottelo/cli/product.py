@@ -38,9 +38,8 @@ class Product(Base):
         Delete assignment sync plan and product.
         """
 
-        cls.command_sub = 'remove-sync-plan'
-
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(cls._construct_command(
+            options, command_sub='remove-sync-plan'))
 
         return result
 
@@ -50,17 +49,15 @@ class Product(Base):
         Assign sync plan to product.
         """
 
-        cls.command_sub = 'set-sync-plan'
-
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(cls._construct_command(
+            options, command_sub='set-sync-plan'))
 
         return result
 
     @classmethod
     def synchronize(cls, options=None):
         """Synchronize a product."""
-        cls.command_sub = 'synchronize'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, command_sub='synchronize'),
             ignore_stderr=True,
         )
@@ -30,6 +30,6 @@ class TailoringFiles(Base):
     @classmethod
     def download_tailoring_file(cls, options):
         """Downloads the tailoring file from satellite"""
-        cls.command_sub = 'download'
         return cls.execute(
-            cls._construct_command(options), output_format='table')
+            cls._construct_command(options, command_sub='download'),
+            output_format='table')
@@ -56,9 +56,9 @@ class SmartVariable(Base):
                                                                 yes/no, 1/0.
             --value VALUE                                       Override value
         """
-        cls.command_sub = 'add-override-value'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='add-override-value'),
+            output_format='csv')
 
     @classmethod
     def remove_override_value(cls, options=None):
@@ -75,6 +75,7 @@ class SmartVariable(Base):
                                                                 name
             --smart-variable-id SMART_VARIABLE_ID
         """
-        cls.command_sub = 'remove-override-value'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(
+                options, command_sub='remove-override-value'),
+            output_format='csv')
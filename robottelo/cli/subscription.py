@@ -34,11 +34,10 @@ class Subscription(Base):
     @classmethod
     def upload(cls, options=None, timeout=None):
         """Upload a subscription manifest."""
-        cls.command_sub = 'upload'
         if bz_bug_is_open(1669186) and (timeout is None or timeout < 1500):
             timeout = 1500
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, command_sub='upload'),
             ignore_stderr=True,
             timeout=timeout,
         )
@@ -46,11 +45,10 @@ class Subscription(Base):
     @classmethod
     def delete_manifest(cls, options=None, timeout=None):
         """Deletes a subscription manifest."""
-        cls.command_sub = 'delete-manifest'
         if bz_bug_is_open(1669186) and (timeout is None or timeout < 1500):
             timeout = 1500
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, command_sub='delete-manifest'),
             ignore_stderr=True,
             timeout=timeout,
         )
@@ -58,11 +56,10 @@ class Subscription(Base):
     @classmethod
     def refresh_manifest(cls, options=None, timeout=None):
         """Refreshes a subscription manifest."""
-        cls.command_sub = 'refresh-manifest'
         if bz_bug_is_open(1669186) and (timeout is None or timeout < 1500):
             timeout = 1500
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, command_sub='refresh-manifest'),
             ignore_stderr=True,
             timeout=timeout,
         )
@@ -70,5 +67,5 @@ class Subscription(Base):
     @classmethod
     def manifest_history(cls, options=None):
         """Provided history for subscription manifest"""
-        cls.command_sub = 'manifest-history'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(
+            options, command_sub='manifest-history'))
@@ -42,9 +42,9 @@ class UserGroup(Base):
             --role ROLE_NAME              User role name
             --role-id ROLE_ID
         """
-        cls.command_sub = 'add-role'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='add-role'),
+            output_format='csv')
 
     @classmethod
     def add_user(cls, options=None):
@@ -59,9 +59,9 @@ class UserGroup(Base):
             --user USER_LOGIN             User's login to search by
             --user-id USER_ID
         """
-        cls.command_sub = 'add-user'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='add-user'),
+            output_format='csv')
 
     @classmethod
     def add_user_group(cls, options=None):
@@ -76,9 +76,9 @@ class UserGroup(Base):
             --user-group USER_GROUP_NAME                  Name to search by
             --user-group-id USER_GROUP_ID
         """
-        cls.command_sub = 'add-user-group'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='add-user-group'),
+            output_format='csv')
 
     @classmethod
     def remove_role(cls, options=None):
@@ -93,9 +93,9 @@ class UserGroup(Base):
             --role ROLE_NAME              User role name
             --role-id ROLE_ID
         """
-        cls.command_sub = 'remove-role'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='remove-role'),
+            output_format='csv')
 
     @classmethod
     def remove_user(cls, options=None):
@@ -110,9 +110,9 @@ class UserGroup(Base):
             --user USER_LOGIN             User's login to search by
             --user-id USER_ID
         """
-        cls.command_sub = 'remove-user'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='remove-user'),
+            output_format='csv')
 
     @classmethod
     def remove_user_group(cls, options=None):
@@ -127,9 +127,9 @@ class UserGroup(Base):
             --user-group USER_GROUP_NAME                  Name to search by
             --user-group-id USER_GROUP_ID
         """
-        cls.command_sub = 'remove-user-group'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='remove-user-group'),
+            output_format='csv')
 
 
 class UserGroupExternal(Base):
@@ -150,16 +150,16 @@ class UserGroupExternal(Base):
 
     @classmethod
     def refresh(cls, options=None):
-        cls.command_sub = 'refresh'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='refresh'),
+            output_format='csv')
 
     @classmethod
     def create(cls, options=None):
         """Create external user group"""
-        cls.command_sub = 'create'
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, command_sub='create'),
+            output_format='csv')
         # External user group can only be fetched by specifying both id and
         # user group id it is linked to
         if len(result) > 0 and 'id' in result[0]:
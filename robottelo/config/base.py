@@ -514,6 +514,33 @@ class FakeManifestSettings(FeatureSettings):
         return validation_errors
 
 
+class HammerSettings(FeatureSettings):
+    """Hammer CLI settings definitions."""
+    def __init__(self, *args, **kwargs):
+        super(HammerSettings, self).__init__(*args, **kwargs)
+        self.shell_session = False
+        self.single_round_trip_create = False
+        self.response_cache = False
+        self.validate_options = False
+        self.command_tree_dir = None
+
+    def read(self, reader):
+        """Read hammer settings."""
+        self.shell_session = reader.get(
+            'hammer', 'shell_session', False, bool)
+        self.single_round_trip_create = reader.get(
+            'hammer', 'single_round_trip_create', False, bool)
+        self.response_cache = reader.get(
+            'hammer', 'response_cache', False, bool)
+        self.validate_options = reader.get(
+            'hammer', 'validate_options', False, bool)
+        self.command_tree_dir = reader.get('hammer', 'command_tree_dir')
+
+    def validate(self):
+        """Validate hammer settings."""
+        return []
+
+
 class LDAPSettings(FeatureSettings):
     """LDAP settings definitions."""
     def __init__(self, *args, **kwargs):
@@ -829,6 +856,9 @@ class PerformanceSettings(FeatureSettings):
     def __init__(self, *args, **kwargs):
         super(PerformanceSettings, self).__init__(*args, **kwargs)
         self.time_hammer = None
+        self.time_hammer_report = None
+        self.profile_factories = None
+        self.profile_factories_report = None
         self.cdn_address = None
         self.virtual_machines = None
         self.fresh_install_savepoint = None
@@ -842,6 +872,12 @@ class PerformanceSettings(FeatureSettings):
         """Read performance settings."""
         self.time_hammer = reader.get(
             'performance', 'time_hammer', False, bool)
+        self.time_hammer_report = reader.get(
+            'performance', 'time_hammer_report', 'hammer_timings.json')
+        self.profile_factories = reader.get(
+            'performance', 'profile_factories', False, bool)
+        self.profile_factories_report = reader.get(
+            'performance', 'profile_factories_report', 'factory_profile.json')
         self.cdn_address = reader.get(
             'performance', 'cdn_address')
         self.virtual_machines = reader.get(
@@ -902,6 +938,13 @@ class SSHClientSettings(FeatureSettings):
         super(SSHClientSettings, self).__init__(*args, **kwargs)
         self._command_timeout = None
         self._connection_timeout = None
+        self._pool_size = None
+        self._pool_idle_timeout = None
+        self._keepalive_interval = None
+        self._local_hosts = None
+        self._probe_cache_ttl = None
+        self.probe_cache_dir = None
+        self._max_sessions = None
 
     @property
     def command_timeout(self):
@@ -913,12 +956,55 @@ class SSHClientSettings(FeatureSettings):
         return self._connection_timeout if (
             self._connection_timeout is not None) else 10
 
+    @property
+    def pool_size(self):
+        return self._pool_size if (
+            self._pool_size is not None) else 10
+
+    @property
+    def pool_idle_timeout(self):
+        return self._pool_idle_timeout if (
+            self._pool_idle_timeout is not None) else 300
+
+    @property
+    def keepalive_interval(self):
+        return self._keepalive_interval if (
+            self._keepalive_interval is not None) else 30
+
+    @property
+    def local_hosts(self):
+        return self._local_hosts if (
+            self._local_hosts is not None) else []
+
+    @property
+    def probe_cache_ttl(self):
+        return self._probe_cache_ttl if (
+            self._probe_cache_ttl is not None) else 3600
+
+    @property
+    def max_sessions(self):
+        return self._max_sessions if (
+            self._max_sessions is not None) else 10
+
     def read(self, reader):
         """Read SSHClient settings."""
         self._command_timeout = reader.get(
             'ssh_client', 'command_timeout', default=300, cast=int)
         self._connection_timeout = reader.get(
             'ssh_client', 'connection_timeout', default=10, cast=int)
+        self._pool_size = reader.get(
+            'ssh_client', 'pool_size', default=10, cast=int)
+        self._pool_idle_timeout = reader.get(
+            'ssh_client', 'pool_idle_timeout', default=300, cast=int)
+        self._keepalive_interval = reader.get(
+            'ssh_client', 'keepalive_interval', default=30, cast=int)
+        self._local_hosts = reader.get(
+            'ssh_client', 'local_hosts', default=[], cast=list)
+        self._probe_cache_ttl = reader.get(
+            'ssh_client', 'probe_cache_ttl', default=3600, cast=int)
+        self.probe_cache_dir = reader.get('ssh_client', 'probe_cache_dir')
+        self._max_sessions = reader.get(
+            'ssh_client', 'max_sessions', default=10, cast=int)
 
     def validate(self):
         """Validate SSHClient settings."""
@@ -1027,6 +1113,7 @@ class SharedFunctionSettings(FeatureSettings):
         self.redis_db = None
         self.redis_password = None
         self.call_retries = None
+        self.pool_size = None
 
     def read(self, reader):
         """Read shared settings."""
@@ -1048,6 +1135,8 @@ class SharedFunctionSettings(FeatureSettings):
             'shared_function', 'redis_password', None)
         self.call_retries = reader.get(
             'shared_function', 'call_retries', 2, int)
+        self.pool_size = reader.get(
+            'shared_function', 'pool_size', 3, int)
 
     def validate(self):
         """Validate the shared settings"""
@@ -1122,6 +1211,7 @@ class Settings(object):
         self.ec2 = EC2Settings()
         self.fake_capsules = FakeCapsuleSettings()
         self.fake_manifest = FakeManifestSettings()
+        self.hammer = HammerSettings()
         self.ldap = LDAPSettings()
         self.ipa = LDAPIPASettings()
         self.oscap = OscapSettings()
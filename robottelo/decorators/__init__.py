@@ -1,5 +1,6 @@
 # -*- encoding: utf-8 -*-
 """Implements various decorators"""
+import hashlib
 import logging
 from functools import partial, wraps
 
@@ -175,16 +176,43 @@ def stubbed(reason=None):
     return wrapper
 
 
+def options_key(options=None):
+    """Return a key identifying the factory ``options``, the md5 hexdigest of
+    the options with a value, or ``None`` if no option has a value.
+    """
+    options = {
+        key: u'{0}'.format(value)
+        for key, value in (options or {}).items()
+        if value is not None
+    }
+    if not options:
+        return None
+    text = u'{0}'.format(tuple(sorted(options.items())))
+    return hashlib.md5(text.encode('utf-8')).hexdigest()
+
+
 def cacheable(func):
-    """Decorator that makes an optional object cache available"""
+    """Decorator that makes an optional object cache available
+
+    ``cached=True`` returns the object created by a previous call with the
+    same options in the process. ``pooled=True`` returns an object of the
+    pool shared by the pytest-xdist workers, see
+    :mod:`robottelo.decorators.func_shared.pool`, which is also available as
+    the ``pool(options=None)`` attribute of the decorated function.
+    """
 
     @wraps(func)
-    def cacheable_function(options=None, cached=False):
+    def cacheable_function(options=None, cached=False, pooled=False):
         """
         This is the function being returned.
         Requires input function's name start with 'make_'
         """
+        if pooled is True:
+            return pool(options).get()
         object_key = func.__name__.replace('make_', '')
+        key = options_key(options)
+        if key is not None:
+            object_key = '{0}.{1}'.format(object_key, key)
         if cached is True and object_key in OBJECT_CACHE:
             return OBJECT_CACHE[object_key]
         new_object = func(options)
@@ -192,6 +220,13 @@ def cacheable(func):
             OBJECT_CACHE[object_key] = new_object
         return new_object
 
+    def pool(options=None, size=None):
+        """Return the entity pool of the factory with ``options``."""
+        # robottelo.decorators.func_shared imports robottelo.decorators
+        from robottelo.decorators.func_shared.pool import get_entity_pool
+        return get_entity_pool(func, options, size)
+
+    cacheable_function.pool = pool
     return cacheable_function
 
 
@@ -0,0 +1,273 @@
+# -*- encoding: utf-8 -*-
+"""Pools of entities shared by the pytest-xdist workers.
+
+A pool keeps up to ``size`` entities created by a factory with the same
+options in the shared function storage (file or redis, see
+:mod:`robottelo.decorators.func_shared.shared`), so the workers reuse them
+instead of creating identical organizations, products or locations each.
+
+Usage::
+
+    from robottelo.decorators.func_shared.pool import get_entity_pool
+
+    pool = get_entity_pool(make_org)
+    # an entity shared with the other tests, which must not modify it
+    org = pool.get()
+    # an entity exclusively leased to this test
+    with pool.lease() as org:
+        Org.update({'id': org['id'], 'new-name': gen_string('alpha')})
+
+The entities leased by tests modifying them are not given back to the pool,
+``lease(mutated=False)`` gives back the entities the test left untouched.
+
+When the shared functions are not enabled, the pools are kept in memory and
+are only shared by the threads of the process.
+
+Note: the entities are stored as json, only the factories returning json
+    compatible entities, like the CLI factories, can be pooled.
+"""
+import datetime
+import logging
+import threading
+import uuid
+
+from contextlib import contextmanager
+
+from robottelo.config import settings
+from robottelo.decorators import options_key
+from robottelo.decorators.func_shared.base import BaseStorageHandler
+from robottelo.decorators.func_shared.shared import (
+    _get_default_storage_handler,
+    _get_function_name_key,
+    _is_enabled,
+    SharedFunctionError,
+)
+
+logger = logging.getLogger(__name__)
+
+# Default number of entities created by each pool
+POOL_SIZE = 3
+
+_NAMESPACE_SCOPE_KEY_TYPE = 'entity_pool'
+
+_DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+# the storage locks are not exclusive between the threads of a process
+_thread_lock = threading.RLock()
+
+
+class MemoryStorageHandler(BaseStorageHandler):
+    """Key value storage handler keeping the values in the process memory."""
+
+    def __init__(self):
+        self._values = {}
+
+    @contextmanager
+    def lock(self, key):
+        """Return the storage locker context manager, the process wide
+        thread lock is enough.
+        """
+        yield None
+
+    def when_lock_acquired(self, data):
+        """Nothing to do when the lock is acquired"""
+
+    def get(self, key):
+        """Return the key value
+        :type key: str
+        """
+        value = self._values.get(key)
+        if value is not None:
+            value = self.decode(value)
+        return value
+
+    def set(self, key, value):
+        """Write the value of key
+
+        :type key: str
+        :type value: object
+        """
+        self._values[key] = self.encode(value)
+
+
+_memory_storage_handler = MemoryStorageHandler()
+
+
+def _get_storage_handler():
+    """Return the shared function storage handler if the shared functions
+    are enabled or the process memory storage handler otherwise.
+    """
+    if _is_enabled():
+        return _get_default_storage_handler()
+    return _memory_storage_handler
+
+
+def _get_default_size():
+    if settings.configured and settings.shared_function.pool_size:
+        return settings.shared_function.pool_size
+    return POOL_SIZE
+
+
+class EntityPool(object):
+    """Pool of the entities created by ``factory`` with ``options``.
+
+    :param str name: The pool name, usually the factory name.
+    :param factory: A callable receiving ``options`` and returning a new json
+        compatible entity.
+    :param dict options: The factory options, pools of the same factory with
+        the same options share their entities.
+    :param int size: The number of entities handed out by :meth:`get`. If it
+        is ``None`` ``pool_size`` from configuration's ``shared_function``
+        section will be used.
+    :param storage_handler: The storage of the pool state. Defaults to the
+        shared function storage.
+    """
+
+    def __init__(self, name, factory, options=None, size=None,
+                 storage_handler=None):
+        self.name = name
+        self.factory = factory
+        self.options = options
+        self.size = max(1, size if size is not None else _get_default_size())
+        if storage_handler is None:
+            storage_handler = _get_storage_handler()
+        self.storage = storage_handler
+        pool_name = name
+        key = options_key(options)
+        if key is not None:
+            pool_name = '.'.join([name, key])
+        self.key = _get_function_name_key(
+            pool_name, scope_context=_NAMESPACE_SCOPE_KEY_TYPE)
+
+    @contextmanager
+    def _state(self):
+        """Yield the pool state, saving it on exit, while holding the storage
+        lock.
+        """
+        with _thread_lock:
+            with self.storage.lock(self.key) as data:
+                self.storage.when_lock_acquired(data)
+                state = self.storage.get(self.key) or {
+                    'shared': [],
+                    'spare': [],
+                    'leased': {},
+                    'next': 0,
+                    'created': 0,
+                    'discarded': 0,
+                }
+                yield state
+                self.storage.set(self.key, state)
+
+    def _create(self, state):
+        """Create a new entity, with the storage lock held so the other
+        workers wait for it instead of creating their own.
+        """
+        logger.info(
+            'creating a new entity for pool %s with options %r', self.name,
+            self.options
+        )
+        entity = self.factory(
+            dict(self.options) if self.options is not None else None)
+        state['created'] += 1
+        return entity
+
+    def fill(self, spare=0):
+        """Create the ``size`` shared entities of the pool in advance.
+
+        :param int spare: The number of entities to create in advance for
+            :meth:`acquire`.
+        """
+        with self._state() as state:
+            while len(state['shared']) < self.size:
+                state['shared'].append(self._create(state))
+            while len(state['spare']) < spare:
+                state['spare'].append(self._create(state))
+
+    def get(self):
+        """Return an entity shared with the other tests, creating it if the
+        pool holds less than ``size`` entities.
+
+        The entities are handed out in turn, whichever worker asks for them,
+        so the workers are spread over all of them. The returned entity must
+        not be modified, see :meth:`lease`.
+        """
+        with self._state() as state:
+            entities = state['shared']
+            index = state.get('next', 0) % self.size
+            state['next'] = index + 1
+            while len(entities) <= index:
+                entities.append(self._create(state))
+            return entities[index]
+
+    def acquire(self):
+        """Lease an entity exclusively, never one handed out by :meth:`get`.
+        A spare entity is used if available, otherwise a new one is created.
+
+        :return: a tuple ``(lease_id, entity)``, the lease must be ended with
+            :meth:`release`.
+        """
+        with self._state() as state:
+            if state['spare']:
+                entity = state['spare'].pop()
+            else:
+                entity = self._create(state)
+            lease_id = uuid.uuid4().hex
+            state['leased'][lease_id] = dict(
+                entity=entity,
+                creation_datetime=datetime.datetime.utcnow().strftime(
+                    _DATETIME_FORMAT),
+            )
+            return lease_id, entity
+
+    def release(self, lease_id, mutated=True):
+        """End the lease of an entity.
+
+        :param str lease_id: the lease returned by :meth:`acquire`.
+        :param bool mutated: whether the entity was modified, a modified
+            entity is discarded, an untouched one is kept as a spare entity
+            for the next lease, up to ``size`` of them.
+        """
+        with self._state() as state:
+            lease = state['leased'].pop(lease_id, None)
+            if lease is None:
+                raise SharedFunctionError(
+                    u'unknown lease {0} of pool {1}'.format(
+                        lease_id, self.name))
+            if mutated or len(state['spare']) >= self.size:
+                state['discarded'] += 1
+            else:
+                state['spare'].append(lease['entity'])
+
+    @contextmanager
+    def lease(self, mutated=True):
+        """Yield an entity exclusively leased until exit, see
+        :meth:`acquire` and :meth:`release`.
+        """
+        lease_id, entity = self.acquire()
+        try:
+            yield entity
+        finally:
+            self.release(lease_id, mutated=mutated)
+
+    def stats(self):
+        """Return the pool statistics."""
+        with self._state() as state:
+            return {
+                'shared': len(state['shared']),
+                'spare': len(state['spare']),
+                'leased': len(state['leased']),
+                'created': state['created'],
+                'discarded': state['discarded'],
+            }
+
+
+def get_entity_pool(factory, options=None, size=None):
+    """Return the pool of the entities created by the ``factory`` with
+    ``options``.
+
+    :param factory: A factory function, for example ``make_org``, the
+        ``cacheable`` factories are called without caching.
+    """
+    function = getattr(factory, '__wrapped__', factory)
+    return EntityPool(
+        function.__name__.replace('make_', ''), function, options, size)
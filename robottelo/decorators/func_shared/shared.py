@@ -168,6 +168,12 @@ def enable_shared_function(value):
     ENABLED = bool(value)
 
 
+def _is_enabled():
+    """Return whether the shared functions are enabled"""
+    _check_config()
+    return ENABLED
+
+
 def set_default_scope(value):
     """Set the default namespace scope
     :type value: str or callable
@@ -19,6 +19,7 @@ from robottelo.constants import (
     RHEL_7_MAJOR_VERSION,
 )
 from robottelo.decorators import bz_bug_is_open
+from robottelo.host_info import cached_probe
 
 from urllib.parse import urljoin  # noqa
 
@@ -79,30 +80,38 @@ class ServerFileDownloader(object):
 download_server_file = ServerFileDownloader()
 
 
-def get_server_software():
+@cached_probe
+def get_server_software(hostname=None):
     """Figure out which product distribution is installed on the server.
 
+    :param str hostname: Hostname or IP address of the remote host. If ``None``
+        the hostname will be get from ``main.server.hostname`` config.
     :return: Either 'upstream' or 'downstream'.
     :rtype: str
 
     """
-    if ssh.command('rpm -q satellite &>/dev/null').return_code == 0:
+    if ssh.command(
+            'rpm -q satellite &>/dev/null', hostname).return_code == 0:
         return 'downstream'
     return 'upstream'
 
 
-def get_server_version():
+@cached_probe
+def get_server_version(hostname=None):
     """Read Satellite version.
 
     Inspect server /usr/share/foreman/lib/satellite/version.rb in
     order to get the installed Satellite version.
 
+    :param str hostname: Hostname or IP address of the remote host. If ``None``
+        the hostname will be get from ``main.server.hostname`` config.
     :return: Either a string containing the Satellite version or
         ``None`` if the version.rb file is not present.
     """
     result = ''.join(ssh.command(
         "cat /usr/share/foreman/lib/satellite/version.rb | grep VERSION | "
-        "awk '{print $3}'"
+        "awk '{print $3}'",
+        hostname
     ).stdout)
     result = result.replace('"', '').strip()
     if len(result) == 0:
@@ -110,6 +119,7 @@ def get_server_version():
     return result
 
 
+@cached_probe(load=tuple)
 def get_host_info(hostname=None):
     """Get remote host's distribution information
 
@@ -522,45 +532,40 @@ def create_repo(name, repo_fetch_url=None, packages=None, wipe_repodata=False,
     :rtype: str
     """
     repo_path = '{}/{}'.format(PULP_PUBLISHED_YUM_REPOS_PATH, name)
-    result = ssh.command(
-        'sudo -u apache mkdir -p {}'.format(repo_path), hostname=hostname)
-    if result.return_code != 0:
-        raise CLIReturnCodeError(
-            result.return_code, result.stderr, 'Unable to create repo dir')
+    # list of (command, error message) run in a single ssh batch
+    steps = [
+        ('sudo -u apache mkdir -p {}'.format(repo_path),
+         'Unable to create repo dir'),
+    ]
     if repo_fetch_url:
         # Add trailing slash if it's not there already
         if not repo_fetch_url.endswith('/'):
             repo_fetch_url += '/'
         for package in packages:
-            result = ssh.command(
+            steps.append((
                 'wget -P {} {}'
                 .format(repo_path, urljoin(repo_fetch_url, package)),
-                hostname=hostname,
-            )
-            if result.return_code != 0:
-                raise CLIReturnCodeError(
-                    result.return_code,
-                    result.stderr,
-                    'Unable to download package {}'.format(package),
-                )
+                'Unable to download package {}'.format(package),
+            ))
     if wipe_repodata:
-        result = ssh.command(
+        steps.append((
             'rm -rf {}/{}'.format(repo_path, 'repodata/'),
-            hostname=hostname
-        )
-        if result.return_code != 0:
-            raise CLIReturnCodeError(
-                result.return_code,
-                result.stderr,
-                'Unable to delete repodata folder',
-            )
-    result = ssh.command('createrepo {}'.format(repo_path), hostname=hostname)
-    if result.return_code != 0:
+            'Unable to delete repodata folder',
+        ))
+    steps.append((
+        'createrepo {}'.format(repo_path),
+        'Unable to create repository. stderr contains following info:\n{}',
+    ))
+    results = ssh.command_batch(
+        [cmd for cmd, _ in steps], hostname=hostname, stop_on_error=True)
+    # with stop_on_error the last result is the one of the failed step
+    if not results or results[-1].return_code != 0:
+        result = results[-1] if results else ssh.SSHCommandResult(
+            stderr=u'', return_code=-1)
         raise CLIReturnCodeError(
             result.return_code,
             result.stderr,
-            'Unable to create repository. stderr contains following info:\n{}'
-            .format(result.stderr),
+            steps[max(len(results), 1) - 1][1].format(result.stderr),
         )
 
     published_url = 'http://{}{}/pulp/repos/{}/'.format(
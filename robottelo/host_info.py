@@ -1,19 +1,160 @@
 """Module that gather several informations about host"""
 import functools
+import hashlib
+import json
 import logging
+import os
 import re
+import tempfile
+import threading
+import time
 from robottelo.cli.base import CLIReturnCodeError
 
 from robottelo import ssh
+from robottelo.config import settings
 LOGGER = logging.getLogger(__name__)
 
 
-@functools.lru_cache(maxsize=1)
-def get_host_os_version():
+class ProbeCache(object):
+    """Cache the results of the remote probes by probe and host.
+
+    The results expire after ``settings.ssh_client.probe_cache_ttl`` seconds.
+    They are also saved as JSON files in the directory returned by
+    :func:`get_probe_cache_dir`, that way the pytest-xdist workers share them
+    instead of probing the same hosts again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._results = {}
+
+    @staticmethod
+    def _path(directory, key):
+        """Return the path of the file storing the result of ``key``."""
+        name = hashlib.md5(u'{0}'.format(key).encode('utf-8')).hexdigest()
+        return os.path.join(directory, 'probe_{0}.json'.format(name))
+
+    def get(self, key, ttl, directory=None):
+        """Return a tuple ``(found, result)`` for the cached result of
+        ``key`` if not older than ``ttl`` seconds.
+        """
+        now = time.time()
+        with self._lock:
+            if key in self._results:
+                created, result = self._results[key]
+                if now - created < ttl:
+                    return True, result
+                del self._results[key]
+        if directory:
+            path = self._path(directory, key)
+            try:
+                created = os.path.getmtime(path)
+                if now - created < ttl:
+                    with open(path) as result_file:
+                        result = json.load(result_file)['result']
+                    with self._lock:
+                        self._results[key] = (created, result)
+                    return True, result
+            except (IOError, OSError, ValueError, KeyError):
+                pass
+        return False, None
+
+    def set(self, key, result, directory=None):
+        """Cache the ``result`` of ``key``."""
+        with self._lock:
+            self._results[key] = (time.time(), result)
+        if directory:
+            if not os.path.isdir(directory):
+                try:
+                    os.makedirs(directory)
+                except OSError:
+                    # created meanwhile by another worker
+                    pass
+            # the file is replaced at once, so the other workers never read
+            # a partially written result
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.json')
+            with os.fdopen(fd, 'w') as result_file:
+                json.dump({'key': list(key), 'result': result}, result_file)
+            os.rename(temp_path, self._path(directory, key))
+
+    def clear(self):
+        """Forget the results cached by this process."""
+        with self._lock:
+            self._results.clear()
+
+
+probe_cache = ProbeCache()
+
+# Environment variable holding the id of the current test run, set by the
+# pytest master process and inherited by its pytest-xdist workers
+PROBE_RUN_ENV = 'ROBOTTELO_PROBE_RUN'
+
+
+def get_probe_cache_dir():
+    """Return ``settings.ssh_client.probe_cache_dir`` or, when not set, the
+    directory of the current test run in the ``probes`` directory next to the
+    files of the shared functions.
+
+    The run is identified by the ``PROBE_RUN_ENV`` environment variable, so
+    the results are only shared by the workers of a run and a later run
+    probes the hosts again, which may have been reprovisioned or upgraded
+    since. ``None`` is returned when the variable is not set, the results
+    being then cached by each process only.
+    """
+    directory = settings.ssh_client.probe_cache_dir
+    run_id = os.environ.get(PROBE_RUN_ENV)
+    if directory is None and run_id:
+        # robottelo.decorators imports robottelo.host_info
+        from robottelo.decorators.func_shared import file_storage
+        directory = os.path.join(
+            file_storage.get_temp_dir(), file_storage.TEMP_ROOT_DIR, 'probes',
+            run_id
+        )
+    return directory
+
+
+def cached_probe(function_=None, load=None):
+    """Cache the results of a remote probe taking an optional ``hostname``
+    argument in :data:`probe_cache`.
+
+    The results are keyed by the probe and by the probed host, ``hostname``
+    defaulting to ``settings.server.hostname``. Exceptions are not cached.
+    The undecorated probe is available as ``__wrapped__``.
+
+    :param load: a callable restoring the result from its JSON form, for
+        example ``tuple`` for probes returning tuples.
+    """
+    def decorator(function):
+        name = u'{0}.{1}'.format(function.__module__, function.__name__)
+
+        @functools.wraps(function)
+        def wrapper(hostname=None):
+            ttl = settings.ssh_client.probe_cache_ttl
+            if ttl <= 0:
+                return function(hostname=hostname)
+            directory = get_probe_cache_dir()
+            key = (name, hostname or settings.server.hostname)
+            found, result = probe_cache.get(key, ttl, directory)
+            if found:
+                return load(result) if load and result is not None else result
+            result = function(hostname=hostname)
+            probe_cache.set(key, result, directory)
+            return result
+        return wrapper
+
+    if function_ is not None:
+        return decorator(function_)
+    return decorator
+
+
+@cached_probe
+def get_host_os_version(hostname=None):
     """Fetches host's OS version through SSH
+    :param str optional hostname: hostname or IP address of the remote host. If
+        ``None`` the hostname will be get from ``main.server.hostname`` config.
     :return: str with version
     """
-    cmd = ssh.command('cat /etc/redhat-release')
+    cmd = ssh.command('cat /etc/redhat-release', hostname=hostname)
     if cmd.stdout:
         version_description = cmd.stdout[0]
         version_re = (
@@ -36,14 +177,16 @@ _SAT_6_1_VERSION_COMMAND = (
 )
 
 
-@functools.lru_cache(maxsize=1)
-def get_host_sat_version():
+@cached_probe
+def get_host_sat_version(hostname=None):
     """Fetches host's Satellite version through SSH
+    :param str optional hostname: hostname or IP address of the remote host. If
+        ``None`` the hostname will be get from ``main.server.hostname`` config.
     :return: Satellite version
     :rtype: version
     """
     commands = (
-        _extract_sat_version(c) for c in
+        _extract_sat_version(c, hostname) for c in
         (_SAT_6_2_VERSION_COMMAND, _SAT_6_1_VERSION_COMMAND)
     )
     for version, ssh_result in commands:
@@ -57,14 +200,15 @@ def get_host_sat_version():
     return version
 
 
-def _extract_sat_version(ssh_cmd):
+def _extract_sat_version(ssh_cmd, hostname=None):
     """Extracts Satellite version if possible or 'Not Available' otherwise
 
     :param ssh_cmd: str ssh command
+    :param hostname: str hostname or IP address of the remote host
     :return: Satellite version
     :rtype: str
     """
-    ssh_result = ssh.command(ssh_cmd)
+    ssh_result = ssh.command(ssh_cmd, hostname=hostname)
     if ssh_result.stdout:
         version_description = ssh_result.stdout[0]
         version_re = (
@@ -0,0 +1,163 @@
+"""Run the steps of a setup pipeline as soon as their inputs are ready.
+
+The factories setting up content for the tests chain many independent
+calls, for example the lifecycle environment, the product and the content
+view of an organization do not depend on each other. A :class:`Pipeline`
+declares each step with the steps it requires and runs the ready steps
+concurrently on a bounded thread pool::
+
+    pipeline = Pipeline()
+    pipeline.add('organization-id', lambda: make_org()['id'])
+    pipeline.add(
+        'lifecycle-environment-id',
+        lambda org_id: make_lifecycle_environment(
+            {u'organization-id': org_id})['id'],
+        requires=['organization-id']
+    )
+    pipeline.add(
+        'product', lambda org_id: make_product({u'organization-id': org_id}),
+        requires=['organization-id']
+    )
+    results = pipeline.run()
+
+"""
+import logging
+import time
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from robottelo.cli.factory_profiler import factory_profiler
+
+LOGGER = logging.getLogger(__name__)
+
+# Default maximum number of steps running at the same time
+PIPELINE_MAX_WORKERS = 4
+
+
+class PipelineError(Exception):
+    """Indicates an invalid pipeline, like a step requiring an unknown step
+    or steps requiring each other.
+    """
+
+
+class Pipeline(object):
+    """A set of steps run in the order of their dependencies.
+
+    :param int max_workers: The maximum number of steps running at the same
+        time, ``1`` runs the steps one by one in the order they were added.
+        Defaults to ``PIPELINE_MAX_WORKERS``.
+    """
+
+    def __init__(self, max_workers=None):
+        if max_workers is None:
+            max_workers = PIPELINE_MAX_WORKERS
+        self.max_workers = max(1, max_workers)
+        self._steps = []
+        self._requires = {}
+        self._functions = {}
+        self._values = {}
+        self.durations = {}
+
+    def add(self, name, function, requires=()):
+        """Add a step to the pipeline.
+
+        :param str name: The step name, its result is returned by
+            :meth:`run` under this name.
+        :param function: A callable receiving the results of the ``requires``
+            steps as positional arguments, in the same order.
+        :param requires: The names of the steps which must be finished before
+            running this one.
+        """
+        if name in self._requires:
+            raise PipelineError(u'Step "{0}" already added'.format(name))
+        self._steps.append(name)
+        self._requires[name] = tuple(requires)
+        self._functions[name] = function
+
+    def add_value(self, name, value):
+        """Add a step already done, whose result is ``value``."""
+        self.add(name, lambda: value)
+        self._values[name] = value
+
+    def _check(self):
+        """Raise ``PipelineError`` if a step requires an unknown step or if
+        some steps require each other.
+        """
+        for name in self._steps:
+            for required in self._requires[name]:
+                if required not in self._requires:
+                    raise PipelineError(
+                        u'Step "{0}" requires unknown step "{1}"'
+                        .format(name, required)
+                    )
+        done = set()
+        remaining = list(self._steps)
+        while remaining:
+            ready = [
+                name for name in remaining
+                if set(self._requires[name]) <= done
+            ]
+            if not ready:
+                raise PipelineError(
+                    u'Steps {0} require each other'.format(remaining))
+            done.update(ready)
+            remaining = [name for name in remaining if name not in done]
+
+    def _run_step(self, name, args):
+        start = time.time()
+        try:
+            return self._functions[name](*args)
+        finally:
+            self.durations[name] = time.time() - start
+
+    def run(self):
+        """Run the steps and return a dictionary with the result of each
+        step by name.
+
+        When a step raises an exception no more step is started, the running
+        ones are waited for and the exception is raised again.
+        """
+        self._check()
+        results = dict(self._values)
+        pending = [name for name in self._steps if name not in results]
+        running = {}
+        error = None
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                if error is None:
+                    ready = [
+                        name for name in pending
+                        if all(required in results
+                               for required in self._requires[name])
+                    ]
+                    for name in ready[:self.max_workers - len(running)]:
+                        pending.remove(name)
+                        args = [
+                            results[required]
+                            for required in self._requires[name]
+                        ]
+                        # the step is part of the running factory calls
+                        step = factory_profiler.propagate(self._run_step)
+                        running[executor.submit(step, name, args)] = name
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as err:
+                        LOGGER.error('Pipeline step %s failed: %r', name, err)
+                        if error is None:
+                            error = err
+        if error is not None:
+            raise error
+        LOGGER.debug(
+            'Pipeline of %d steps done in %.2fs: %s', len(self._steps),
+            time.time() - start,
+            u', '.join(
+                u'{0}={1:.2f}s'.format(name, self.durations[name])
+                for name in self._steps if name in self.durations
+            )
+        )
+        return results
@@ -1,20 +1,49 @@
 """Utility module to handle the shared ssh connection."""
+import atexit
 import base64
+import codecs
+import hashlib
 import logging
 import os
 import re
+import select
+import signal
+import subprocess
+import threading
 import time
+import uuid
 
 import paramiko
 import six
 
+from concurrent.futures import ThreadPoolExecutor
 from fnmatch import fnmatch
+from functools import partial
 from contextlib import contextmanager
+from six.moves import queue, shlex_quote
 from robottelo.cli import hammer
 from robottelo.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Default maximum number of concurrent commands run by ``command_many``
+COMMAND_MANY_MAX_WORKERS = 10
+
+# Default maximum number of SFTP sessions used by ``upload_files_bulk``
+UPLOAD_MAX_WORKERS = 4
+
+# Size of the blocks read when computing the checksum of the local files
+_CHECKSUM_BLOCK_SIZE = 1024 * 1024
+
+# Hostnames starting with this prefix run their commands locally
+LOCAL_HOST_PREFIX = u'local://'
+
+# Shell running the local commands
+LOCAL_SHELL = '/bin/bash'
+
+# Escape codes for colors displayed in the output
+_COLOR_CODES_REGEX = re.compile(r'\x1b\[\d\d?m')
+
 
 class SSHCommandTimeoutError(Exception):
     """Raised when the SSH command has not finished executing after a
@@ -22,6 +51,30 @@ class SSHCommandTimeoutError(Exception):
     """
 
 
+class SSHCommandManyError(Exception):
+    """Raised by :func:`command_many` when some of the commands could not be
+    executed.
+
+    :param errors: list of ``(index, hostname, cmd, exception)`` tuples, one
+        for each command which raised an exception.
+    :param results: the ordered results, ``None`` for the failed commands.
+    """
+
+    def __init__(self, errors, results):
+        self.errors = errors
+        self.results = results
+        super(SSHCommandManyError, self).__init__(
+            u'{0} of {1} ssh commands failed:\n{2}'.format(
+                len(errors),
+                len(results),
+                u'\n'.join(
+                    u'[{0}] {1}: {2!r}'.format(hostname, cmd, exception)
+                    for _, hostname, cmd, exception in errors
+                )
+            )
+        )
+
+
 def decode_to_utf8(text):  # pragma: no cover
     """Paramiko returns bytes object and we need to ensure it is utf-8 before
     parsing
@@ -54,6 +107,222 @@ class SSHCommandResult(object):
         return tmpl.format(**self.__dict__)
 
 
+class SSHCommandStream(object):
+    """Iterator over the stdout lines of a command while it is running.
+
+    Lines are decoded and cleaned up the same way :func:`execute_command`
+    does, but are yielded as soon as they arrive from the channel, so the
+    whole output never needs to be held in memory. The ``stderr`` and
+    ``return_code`` attributes are available once the iteration is over.
+
+    The stream can be used as a context manager to make sure the channel is
+    closed when the caller stops consuming it early::
+
+        with ssh.command('cat /var/log/messages', stream=True) as lines:
+            for line in lines:
+                ...
+
+    :param str cmd: The command being executed.
+    :param channel: The paramiko channel the command was executed on.
+    :param str output_format: json, csv, plain or None. No line filtering is
+        done for json and plain.
+    :param int timeout: Time to wait for the ssh command to finish.
+    :param on_close: Callable called once the stream is over, receiving
+        whether the channel ended in a sane state (``False``) or not
+        (``True``).
+    """
+    chunk_size = 32768
+
+    def __init__(self, cmd, channel, output_format=None, timeout=None,
+                 on_close=None):
+        self.cmd = cmd
+        self.channel = channel
+        self.output_format = output_format
+        self.timeout = timeout
+        self.stderr = None
+        self.return_code = None
+        self._on_close = on_close
+        self._lines = self._iter_lines()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._lines)
+
+    next = __next__
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Stop the command output consumption and close the channel."""
+        self._lines.close()
+        if self._on_close is not None:
+            # the iteration never started
+            self.channel.close()
+            self._on_close(True)
+            self._on_close = None
+
+    def __repr__(self):
+        tmpl = u'SSHCommandStream(cmd={cmd!r}, stderr={stderr!r}, ' + \
+               u'return_code={return_code!r}, output_format={output_format!r})'
+        return tmpl.format(**self.__dict__)
+
+    def _clean_line(self, line):
+        """Apply the same clean up as :func:`execute_command`, return
+        ``None`` if the line must be skipped.
+        """
+        if self.output_format in ('json', 'plain'):
+            return line
+        # for output we don't really want to see all of Rails traffic
+        # information, so strip it out.
+        # Empty fields are returned as "" which gives us u'""'
+        line = line.replace('""', '')
+        if line.startswith('['):
+            return None
+        return _COLOR_CODES_REGEX.sub('', line)
+
+    def _wait_data(self, deadline):
+        """Block until data, EOF or the exit status arrives on the channel."""
+        if deadline is None:
+            remaining = None
+        else:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                logger.error(
+                    'ssh command did not respond in the predefined time'
+                    ' (timeout=%s) and will be interrupted', self.timeout)
+                raise SSHCommandTimeoutError(
+                    'ssh command: {0} \n did not respond in the predefined '
+                    'time (timeout={1})'.format(self.cmd, self.timeout)
+                )
+        select.select([self.channel], [], [], remaining)
+
+    def _iter_lines(self):
+        deadline = time.time() + self.timeout if self.timeout else None
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        stderr = []
+        pending = u''
+        finished = False
+        try:
+            while True:
+                if self.channel.recv_stderr_ready():
+                    stderr.append(self.channel.recv_stderr(self.chunk_size))
+                if self.channel.recv_ready():
+                    chunk = self.channel.recv(self.chunk_size)
+                elif self.channel.eof_received:
+                    chunk = b''
+                else:
+                    self._wait_data(deadline)
+                    continue
+                if not chunk:
+                    break
+                lines = (pending + decoder.decode(chunk)).split('\n')
+                pending = lines.pop()
+                for line in lines:
+                    line = self._clean_line(line)
+                    if line is not None:
+                        yield line
+            line = self._clean_line(pending + decoder.decode(b'', True))
+            if line is not None:
+                yield line
+            while not self.channel.exit_status_ready():
+                self._wait_data(deadline)
+            while self.channel.recv_stderr_ready():
+                stderr.append(self.channel.recv_stderr(self.chunk_size))
+            self.return_code = self.channel.recv_exit_status()
+            self.stderr = _COLOR_CODES_REGEX.sub(
+                '', decode_to_utf8(b''.join(stderr)))
+            if self.stderr:
+                logger.info('<<< stderr\n%s', self.stderr)
+            finished = True
+        finally:
+            if not finished:
+                self.channel.close()
+            if self._on_close is not None:
+                self._on_close(not finished)
+                self._on_close = None
+
+
+class LocalCommandStream(SSHCommandStream):
+    """:class:`SSHCommandStream` over the output of a local process, see
+    :func:`execute_local_command`.
+
+    :param str cmd: The command being executed.
+    :param process: The ``subprocess.Popen`` running the command.
+    :param str output_format: json, csv, plain or None.
+    :param int timeout: Time to wait for the command to finish.
+    """
+
+    def __init__(self, cmd, process, output_format=None, timeout=None):
+        self.process = process
+        self._stderr = []
+        # stderr is drained aside so a chatty process never blocks on it
+        self._stderr_reader = threading.Thread(
+            target=lambda: self._stderr.append(process.stderr.read()))
+        self._stderr_reader.daemon = True
+        self._stderr_reader.start()
+        self._timed_out = False
+        super(LocalCommandStream, self).__init__(
+            cmd, None, output_format, timeout)
+
+    def close(self):
+        """Stop the command output consumption and kill the process."""
+        self._lines.close()
+        if self.process.poll() is None:
+            _kill_process_group(self.process)
+            self.process.wait()
+
+    def _expire(self):
+        self._timed_out = True
+        _kill_process_group(self.process)
+
+    def _iter_lines(self):
+        timer = None
+        if self.timeout:
+            timer = threading.Timer(self.timeout, self._expire)
+            timer.daemon = True
+            timer.start()
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        pending = u''
+        try:
+            for chunk in iter(self.process.stdout.readline, b''):
+                pending += decoder.decode(chunk)
+                if pending.endswith(u'\n'):
+                    line = self._clean_line(pending[:-1])
+                    pending = u''
+                    if line is not None:
+                        yield line
+            line = self._clean_line(pending + decoder.decode(b'', True))
+            if line is not None:
+                yield line
+            self.process.wait()
+            self._stderr_reader.join()
+        finally:
+            if timer is not None:
+                timer.cancel()
+            if self.process.poll() is None:
+                _kill_process_group(self.process)
+                self.process.wait()
+        if self._timed_out:
+            logger.error(
+                'local command did not respond in the predefined time'
+                ' (timeout=%s) and was interrupted', self.timeout)
+            raise SSHCommandTimeoutError(
+                'local command: {0} \n did not respond in the predefined '
+                'time (timeout={1})'.format(self.cmd, self.timeout)
+            )
+        self.return_code = self.process.returncode
+        self.stderr = _COLOR_CODES_REGEX.sub(
+            '', decode_to_utf8(b''.join(self._stderr)))
+        if self.stderr:
+            logger.info('<<< stderr\n%s', self.stderr)
+
+
 class SSHClient(paramiko.SSHClient):
     """Extended SSHClient allowing custom methods"""
 
@@ -85,9 +354,11 @@ def _call_paramiko_sshclient():  # pragma: no cover
     return SSHClient()
 
 
-def get_client(hostname=None, username=None, password=None,
-               key_filename=None, timeout=None):
-    """Returns a SSH client connected to given hostname"""
+def _get_connection_args(hostname=None, username=None, password=None,
+                         key_filename=None, timeout=None):
+    """Return the connection arguments with the configuration defaults
+    applied to the ones which are not provided.
+    """
     if hostname is None:
         hostname = settings.server.hostname
     if username is None:
@@ -98,19 +369,192 @@ def get_client(hostname=None, username=None, password=None,
         password = settings.server.ssh_password
     if timeout is None:
         timeout = settings.ssh_client.connection_timeout
+    return {
+        'hostname': hostname,
+        'username': username,
+        'password': password,
+        'key_filename': key_filename,
+        'timeout': timeout,
+    }
+
+
+def get_client(hostname=None, username=None, password=None,
+               key_filename=None, timeout=None):
+    """Returns a SSH client connected to given hostname"""
+    connection_args = _get_connection_args(
+        hostname, username, password, key_filename, timeout)
     client = _call_paramiko_sshclient()
     client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    client.connect(
-        hostname=hostname,
-        username=username,
-        key_filename=key_filename,
-        password=password,
-        timeout=timeout
-    )
+    client.connect(**connection_args)
     client._id = hex(id(client))
     return client
 
 
+def _is_client_alive(client):
+    """Check whether the client transport is still connected and
+    authenticated.
+    """
+    transport = client.get_transport()
+    return (
+        transport is not None and
+        transport.is_active() and
+        transport.is_authenticated()
+    )
+
+
+class SSHConnectionPool(object):
+    """Per process pool of connected SSH clients.
+
+    Idle clients are kept by ``(hostname, username, key_filename, password)``
+    so consecutive commands against the same host reuse an already
+    authenticated transport instead of paying the TCP, key exchange and
+    authentication handshake again. A client is handed to a single caller at
+    a time and is given back to the pool when the caller is done with it.
+
+    :param int max_size: Maximum number of idle clients kept open, ``0``
+        disables the pooling. If it is ``None`` ``pool_size`` from
+        configuration's ``ssh_client`` section will be used.
+    :param int idle_timeout: Time after which an idle client is closed. If it
+        is ``None`` ``pool_idle_timeout`` from configuration's ``ssh_client``
+        section will be used.
+    :param int keepalive_interval: Interval between keepalive packets sent on
+        the pooled transports. If it is ``None`` ``keepalive_interval`` from
+        configuration's ``ssh_client`` section will be used.
+    """
+
+    def __init__(self, max_size=None, idle_timeout=None,
+                 keepalive_interval=None):
+        self._max_size = max_size
+        self._idle_timeout = idle_timeout
+        self._keepalive_interval = keepalive_interval
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    @property
+    def max_size(self):
+        if self._max_size is not None:
+            return self._max_size
+        return settings.ssh_client.pool_size
+
+    @property
+    def idle_timeout(self):
+        if self._idle_timeout is not None:
+            return self._idle_timeout
+        return settings.ssh_client.pool_idle_timeout
+
+    @property
+    def keepalive_interval(self):
+        if self._keepalive_interval is not None:
+            return self._keepalive_interval
+        return settings.ssh_client.keepalive_interval
+
+    @property
+    def size(self):
+        """Number of idle clients currently held by the pool."""
+        with self._lock:
+            return sum(len(clients) for clients in self._idle.values())
+
+    @staticmethod
+    def _close(client):
+        client.close()
+        logger.debug('Destroyed Paramiko client {0}'.format(client._id))
+
+    def _evict_idle(self):
+        """Close the clients which have been idle for too long. Must be
+        called with the lock held.
+        """
+        deadline = time.time() - self.idle_timeout
+        for key in list(self._idle):
+            clients = self._idle[key]
+            for client, last_used in list(clients):
+                if last_used < deadline:
+                    clients.remove((client, last_used))
+                    self._close(client)
+            if not clients:
+                del self._idle[key]
+
+    def acquire(self, hostname=None, username=None, password=None,
+                key_filename=None, timeout=None):
+        """Return a connected client, reusing an idle one if available.
+
+        The arguments are the same of :func:`get_client`.
+        """
+        connection_args = _get_connection_args(
+            hostname, username, password, key_filename, timeout)
+        key = (
+            connection_args['hostname'],
+            connection_args['username'],
+            connection_args['key_filename'],
+            connection_args['password'],
+        )
+        with self._lock:
+            self._evict_idle()
+            clients = self._idle.get(key, [])
+            while clients:
+                client, _ = clients.pop()
+                if _is_client_alive(client):
+                    logger.debug(
+                        'Reusing Paramiko client {0}'.format(client._id))
+                    return client
+                self._close(client)
+        client = get_client(**connection_args)
+        client._pool_key = key
+        if self.keepalive_interval:
+            client.get_transport().set_keepalive(self.keepalive_interval)
+        logger.debug('Instantiated Paramiko client {0}'.format(client._id))
+        logger.info('Connected to [%s]', connection_args['hostname'])
+        return client
+
+    def release(self, client, discard=False):
+        """Give a client back to the pool.
+
+        :param client: A client returned by :meth:`acquire`.
+        :param bool discard: Close the client instead of keeping it for reuse,
+            should be used when the client state is unknown, for example after
+            a command timed out.
+        """
+        if discard or not self.max_size or not _is_client_alive(client):
+            self._close(client)
+            return
+        with self._lock:
+            self._evict_idle()
+            idle_count = sum(len(clients) for clients in self._idle.values())
+            if idle_count >= self.max_size:
+                self._close(client)
+                return
+            self._idle.setdefault(client._pool_key, []).append(
+                (client, time.time()))
+
+    def clear(self):
+        """Close all the idle clients."""
+        with self._lock:
+            for clients in self._idle.values():
+                for client, _ in clients:
+                    self._close(client)
+            self._idle.clear()
+
+    @contextmanager
+    def connection(self, hostname=None, username=None, password=None,
+                   key_filename=None, timeout=None):
+        """Yield a pooled client which is given back to the pool on exit.
+        If an exception is raised while the client is in use it is discarded.
+        """
+        client = self.acquire(
+            hostname, username, password, key_filename, timeout)
+        discard = False
+        try:
+            yield client
+        except BaseException:
+            discard = True
+            raise
+        finally:
+            self.release(client, discard=discard)
+
+
+_connection_pool = SSHConnectionPool()
+atexit.register(_connection_pool.clear)
+
+
 @contextmanager
 def get_connection(hostname=None, username=None, password=None,
                    key_filename=None, timeout=None):
@@ -157,6 +601,244 @@ def get_connection(hostname=None, username=None, password=None,
         logger.debug('Destroyed Paramiko client {0}'.format(client._id))
 
 
+@contextmanager
+def get_pooled_connection(hostname=None, username=None, password=None,
+                          key_filename=None, timeout=None):
+    """Yield an ssh connection object from the process connection pool.
+
+    Work like :func:`get_connection` but instead of being closed, the
+    connection is kept open on exit to be reused by the next caller with the
+    same hostname and credentials. See :class:`SSHConnectionPool`.
+
+    :param str hostname: The hostname of the server to establish connection.If
+        it is ``None`` ``hostname`` from configuration's ``server`` section
+        will be used.
+    :param str username: The username to use when connecting. If it is ``None``
+        ``ssh_username`` from configuration's ``server`` section will be used.
+    :param str password: The password to use when connecting. If it is ``None``
+        ``ssh_password`` from configuration's ``server`` section will be used.
+        Should be applied only in case ``key_filename`` is not set
+    :param str key_filename: The path of the ssh private key to use when
+        connecting to the server. If it is ``None`` ``key_filename`` from
+        configuration's ``server`` section will be used.
+    :param int timeout: Time to wait for establish the connection.
+
+    :return: An SSH connection.
+    :rtype: ``paramiko.SSHClient``
+
+    """
+    with _connection_pool.connection(
+            hostname, username, password, key_filename, timeout) as client:
+        yield client
+
+
+def _session_refused(err, client):
+    """Return whether ``err`` was raised by the server of ``client`` refusing
+    to open a new channel, as it does once its ``MaxSessions`` is reached.
+    """
+    return (isinstance(err, paramiko.ChannelException) and
+            err.code == paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED and
+            _is_client_alive(client))
+
+
+def _refusal_lost(err, client):
+    """Return whether ``err`` was raised for a channel the server of
+    ``client`` refused without telling why.
+
+    Paramiko keeps the ``ChannelException`` of a refused channel in a single
+    attribute of the transport, when channels are refused concurrently
+    another thread may pick it up and the refused one only gets a generic
+    ``SSHException``.
+    """
+    return (not isinstance(err, paramiko.ChannelException) and
+            str(err) == 'Unable to open channel.' and
+            _is_client_alive(client))
+
+
+class MultiplexedConnection(object):
+    """SSH connection running several commands at the same time.
+
+    Each command runs on its own channel of a single authenticated transport,
+    so concurrent threads pay the TCP, key exchange and authentication
+    handshake only once while still getting independent results and
+    timeouts::
+
+        connection = get_multiplexed_connection()
+        results = connection.run_many(['rpm -q satellite', 'hostname -f'])
+
+    The number of channels open at the same time is bounded by
+    ``max_sessions``, which should not exceed the ``MaxSessions`` of the ssh
+    server. When the server refuses to open a channel anyway the bound is
+    lowered to the number of channels it accepted and the command waits for
+    one of them to be closed.
+
+    The connection is established on the first command and established again
+    if the transport dies. The other arguments are the same of
+    :func:`get_client`.
+
+    :param int max_sessions: Maximum number of commands running at the same
+        time. If it is ``None`` ``max_sessions`` from configuration's
+        ``ssh_client`` section will be used.
+    """
+
+    # times a command is run again when its channel was refused for an
+    # unknown reason, see _refusal_lost
+    refusal_retries = 3
+
+    def __init__(self, hostname=None, username=None, password=None,
+                 key_filename=None, timeout=None, max_sessions=None):
+        self._connection_args = _get_connection_args(
+            hostname, username, password, key_filename, timeout)
+        if max_sessions is None:
+            max_sessions = settings.ssh_client.max_sessions
+        self.max_sessions = max(1, max_sessions)
+        self.open_sessions = 0
+        self._client = None
+        self._condition = threading.Condition()
+
+    @property
+    def hostname(self):
+        return self._connection_args['hostname']
+
+    def _acquire_session(self):
+        """Wait for a free session and return the connected client."""
+        with self._condition:
+            while self.open_sessions >= self.max_sessions:
+                self._condition.wait()
+            self.open_sessions += 1
+            try:
+                if self._client is None or not _is_client_alive(
+                        self._client):
+                    if self._client is not None:
+                        self._client.close()
+                    self._client = None
+                    self._client = get_client(**self._connection_args)
+                    logger.info('Connected to [%s]', self.hostname)
+            except BaseException:
+                self.open_sessions -= 1
+                self._condition.notify()
+                raise
+            return self._client
+
+    def _release_session(self):
+        with self._condition:
+            self.open_sessions -= 1
+            self._condition.notify()
+
+    def run(self, cmd, output_format=None, timeout=None,
+            connection_timeout=None):
+        """Run ``cmd`` on a new channel, see :func:`execute_command`.
+
+        A command timing out only closes its own channel, the other commands
+        and the transport are not affected.
+        """
+        retries = self.refusal_retries
+        while True:
+            client = self._acquire_session()
+            try:
+                return execute_command(
+                    cmd, client, output_format, timeout, connection_timeout)
+            except paramiko.SSHException as err:
+                if retries > 0 and _refusal_lost(err, client):
+                    # the thread which got the reason lowers the bound
+                    retries -= 1
+                    continue
+                if not _session_refused(err, client):
+                    raise
+                with self._condition:
+                    if self.open_sessions <= 1:
+                        raise
+                    # the server MaxSessions is lower than max_sessions, a
+                    # refusal seen with more sessions open must not raise it
+                    self.max_sessions = max(1, min(
+                        self.max_sessions, self.open_sessions - 1))
+                logger.warning(
+                    '[%s] refused to open a new session, running at most %d '
+                    'commands at the same time', self.hostname,
+                    self.max_sessions
+                )
+            finally:
+                self._release_session()
+
+    def run_many(self, cmds, output_format=None, timeout=None,
+                 connection_timeout=None):
+        """Run ``cmds`` at the same time, up to ``max_sessions``.
+
+        :return: A list of ``SSHCommandResult`` in the same order of
+            ``cmds``.
+        :raises robottelo.ssh.SSHCommandManyError: If any command raised an
+            exception, once all the commands are finished.
+        """
+        commands = [(self.hostname, cmd) for cmd in cmds]
+        if not commands:
+            return []
+        with ThreadPoolExecutor(
+                max_workers=min(len(commands), self.max_sessions)
+                ) as executor:
+            futures = [
+                executor.submit(
+                    self.run, cmd, output_format=output_format,
+                    timeout=timeout, connection_timeout=connection_timeout
+                )
+                for _, cmd in commands
+            ]
+            return _gather_results(futures, commands)
+
+    def close(self):
+        """Close the connection, commands still running are interrupted."""
+        with self._condition:
+            if self._client is not None:
+                self._client.close()
+                logger.debug(
+                    'Destroyed Paramiko client {0}'.format(self._client._id))
+                self._client = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+_multiplexed_connections = {}
+_multiplexed_connections_lock = threading.Lock()
+
+
+def get_multiplexed_connection(hostname=None, username=None, password=None,
+                               key_filename=None, timeout=None):
+    """Return the process wide :class:`MultiplexedConnection` of the
+    hostname and credentials, shared by all the threads of the process.
+
+    The arguments are the same of :func:`get_connection`.
+    """
+    connection_args = _get_connection_args(
+        hostname, username, password, key_filename, timeout)
+    key = (
+        connection_args['hostname'],
+        connection_args['username'],
+        connection_args['key_filename'],
+        connection_args['password'],
+    )
+    with _multiplexed_connections_lock:
+        connection = _multiplexed_connections.get(key)
+        if connection is None:
+            connection = MultiplexedConnection(**connection_args)
+            _multiplexed_connections[key] = connection
+        return connection
+
+
+def close_multiplexed_connections():
+    """Close the connections returned by :func:`get_multiplexed_connection`.
+    """
+    with _multiplexed_connections_lock:
+        for connection in _multiplexed_connections.values():
+            connection.close()
+        _multiplexed_connections.clear()
+
+
+atexit.register(close_multiplexed_connections)
+
+
 @contextmanager
 def get_sftp_session(hostname=None, username=None,
                      password=None, key_filename=None, timeout=None):
@@ -186,11 +868,11 @@ def get_sftp_session(hostname=None, username=None,
         configuration's ``server`` section will be used.
     :param int timeout: Time to wait for establish the connection.
        """
-    with get_connection(hostname=hostname, username=username,
-                        password=password, key_filename=key_filename,
-                        timeout=timeout) as connection:
+    with get_pooled_connection(hostname=hostname, username=username,
+                               password=password, key_filename=key_filename,
+                               timeout=timeout) as connection:
+        sftp = connection.open_sftp()
         try:
-            sftp = connection.open_sftp()
             yield sftp
         finally:
             sftp.close()
@@ -234,30 +916,57 @@ def add_authorized_key(key, hostname=None, username=None, password=None,
     ssh_path = '~/.ssh'
     auth_file = os.path.join(ssh_path, 'authorized_keys')
 
-    with get_connection(hostname=hostname, username=username,
-                        password=password, key_filename=key_filename,
-                        timeout=timeout) as con:
-
+    ssh_user = username or settings.server.ssh_username
+    command_batch([
         # ensure ssh directory exists
-        execute_command('mkdir -p %s' % ssh_path, con)
-
+        'mkdir -p %s' % ssh_path,
         # append the key if doesn't exists
-        add_key = "grep -q '{key}' {dest} || echo '{key}' >> {dest}".format(
-            key=key_content, dest=auth_file)
-        execute_command(add_key, con)
-
+        "grep -q '{key}' {dest} || echo '{key}' >> {dest}".format(
+            key=key_content, dest=auth_file),
         # set proper permissions
-        execute_command('chmod 700 %s' % ssh_path, con)
-        execute_command('chmod 600 %s' % auth_file, con)
-        ssh_user = username or settings.server.ssh_username
-        execute_command('chown -R %s %s' % (ssh_user, ssh_path), con)
-
+        'chmod 700 %s' % ssh_path,
+        'chmod 600 %s' % auth_file,
+        'chown -R %s %s' % (ssh_user, ssh_path),
         # Restore SELinux context with restorecon, if it's available:
-        cmd = 'command -v restorecon && restorecon -RvF %s || true' % ssh_path
-        execute_command(cmd, con)
+        'command -v restorecon && restorecon -RvF %s || true' % ssh_path,
+    ], hostname=hostname, username=username, password=password,
+        key_filename=key_filename, connection_timeout=timeout)
+
 
+class TransferReport(object):
+    """Summary of the files transferred by :func:`upload_files_bulk`.
+
+    :param uploaded: list of the ``(local_file, remote_file)`` uploaded.
+    :param skipped: list of the ``(local_file, remote_file)`` not uploaded
+        because the remote file was already identical.
+    :param int size: Number of bytes uploaded.
+    :param float elapsed: Time spent transferring the files, in seconds.
+    """
 
-def upload_file(local_file, remote_file, key_filename=None, hostname=None):
+    def __init__(self, uploaded=None, skipped=None, size=0, elapsed=0.0):
+        self.uploaded = uploaded or []
+        self.skipped = skipped or []
+        self.size = size
+        self.elapsed = elapsed
+
+    @property
+    def throughput(self):
+        """Number of bytes uploaded per second."""
+        if not self.elapsed:
+            return 0.0
+        return self.size / self.elapsed
+
+    def __repr__(self):
+        return (
+            u'<TransferReport uploaded={0} skipped={1} size={2} '
+            u'elapsed={3:.3f}s throughput={4:.0f}B/s>'.format(
+                len(self.uploaded), len(self.skipped), self.size,
+                self.elapsed, self.throughput)
+        )
+
+
+def upload_file(local_file, remote_file, key_filename=None, hostname=None,
+                skip_identical=False):
     """Upload a local file to a remote machine
 
     :param local_file: either a file path or a file-like object to be uploaded.
@@ -268,7 +977,13 @@ def upload_file(local_file, remote_file, key_filename=None, hostname=None):
     :param str key_filename: The path of the ssh private key to use when
         connecting to the server. If it is ``None`` ``key_filename`` from
         configuration's ``server`` section will be used.
+    :param bool skip_identical: Whether to skip the upload if the remote file
+        has the same checksum, see :func:`upload_files_bulk`.
     """
+    if skip_identical:
+        upload_files_bulk([(local_file, remote_file)], hostname=hostname,
+                          key_filename=key_filename, max_workers=1)
+        return
 
     with get_sftp_session(hostname=hostname,
                           key_filename=key_filename) as sftp:
@@ -287,17 +1002,143 @@ def upload_files(local_dir, remote_dir, file_search="*.txt",
     :param str key_filename: The path of the ssh private key to use when
         connecting to the server. If it is ``None`` ``key_filename`` from
         configuration's ``server`` section will be used.
+    :return: A :class:`TransferReport` of the transfer, the files already
+        identical on the remote machine are not uploaded again.
     """
-    command("mkdir -p {}".format(remote_dir))
-    # making only one SFTP Session to transfer all files
-    with get_sftp_session(hostname=hostname,
-                          key_filename=key_filename) as sftp:
-        for root, dirs, files in os.walk(local_dir):
-            for local_filename in files:
-                if fnmatch(local_filename, file_search):
-                    remote_file = "{0}/{1}".format(remote_dir, local_filename)
-                    local_file = os.path.join(local_dir, local_filename)
-                    _upload_file(sftp, local_file, remote_file)
+    files = []
+    for root, dirs, filenames in os.walk(local_dir):
+        for local_filename in filenames:
+            if fnmatch(local_filename, file_search):
+                remote_file = "{0}/{1}".format(remote_dir, local_filename)
+                local_file = os.path.join(root, local_filename)
+                files.append((local_file, remote_file))
+    return upload_files_bulk(files, hostname=hostname,
+                             key_filename=key_filename,
+                             remote_dirs=[remote_dir])
+
+
+def _local_md5(local_file):
+    """Return the md5 hexdigest of the ``local_file`` path."""
+    md5 = hashlib.md5()
+    with open(local_file, 'rb') as file_:
+        for block in iter(lambda: file_.read(_CHECKSUM_BLOCK_SIZE), b''):
+            md5.update(block)
+    return md5.hexdigest()
+
+
+def _remote_md5_command(files):
+    """Return a command printing the md5sum of each remote file having the
+    same size as its local file.
+
+    :param files: list of ``(local_file, remote_file)`` where ``local_file``
+        is a path.
+    """
+    return u'; '.join(
+        u'[ "$(stat -c %s -- {0} 2>/dev/null)" = {1} ] && md5sum -- {0}'
+        .format(shlex_quote(remote_file), os.path.getsize(local_file))
+        for local_file, remote_file in files
+    )
+
+
+def upload_files_bulk(files, hostname=None, key_filename=None,
+                      max_workers=None, skip_identical=True,
+                      remote_dirs=None):
+    """Upload several local files to a remote machine.
+
+    The files are uploaded in parallel over up to ``max_workers`` SFTP
+    sessions, each one on its own pooled connection. Before uploading, a
+    single ssh command creates the remote directories and computes the
+    checksum of the remote files having the same size as the local ones, the
+    files whose remote copy is identical are not uploaded again::
+
+        report = upload_files_bulk([
+            ('/tmp/manifest.zip', '/root/manifest.zip'),
+            (gpg_key_path, '/root/RPM-GPG-KEY'),
+        ])
+
+    :param files: an iterable of ``(local_file, remote_file)`` tuples.
+        ``local_file`` is either a file path or a file-like object, file-like
+        objects are always uploaded.
+    :param hostname: target machine hostname. If not provided will be used the
+        ``server.hostname`` from the configuration.
+    :param str key_filename: The path of the ssh private key to use when
+        connecting to the server. If it is ``None`` ``key_filename`` from
+        configuration's ``server`` section will be used.
+    :param int max_workers: The maximum number of files uploaded at the same
+        time. Defaults to the number of files, up to ``UPLOAD_MAX_WORKERS``.
+    :param bool skip_identical: Whether to skip the files whose remote copy
+        has the same size and md5 checksum.
+    :param remote_dirs: Remote directories to create in addition to the
+        directories of the remote files.
+    :return: A :class:`TransferReport` of the transfer.
+    """
+    files = list(files)
+    report = TransferReport()
+    start = time.time()
+    directories = set(remote_dirs or [])
+    directories.update(
+        os.path.dirname(remote_file) for _, remote_file in files)
+    directories.discard('')
+    commands = []
+    if directories:
+        commands.append(u'mkdir -p -- {0}'.format(
+            u' '.join(shlex_quote(directory)
+                      for directory in sorted(directories))))
+    checked = set(
+        (local_file, remote_file) for local_file, remote_file in files
+        if skip_identical and not hasattr(local_file, 'read')
+    )
+    if checked:
+        commands.append(_remote_md5_command(sorted(checked)))
+    remote_md5 = {}
+    if commands:
+        # "true" ignores the status of the last size comparison
+        result = command(u'; '.join(commands + [u'true']), hostname=hostname,
+                         key_filename=key_filename)
+        for line in result.stdout:
+            if line:
+                md5, _, remote_file = line.partition(u'  ')
+                remote_md5[remote_file] = md5
+    pending = queue.Queue()
+    for local_file, remote_file in files:
+        if (remote_file in remote_md5 and
+                (local_file, remote_file) in checked and
+                remote_md5[remote_file] == _local_md5(local_file)):
+            report.skipped.append((local_file, remote_file))
+        else:
+            pending.put((local_file, remote_file))
+    lock = threading.Lock()
+
+    def upload():
+        """Upload the pending files over a single SFTP session."""
+        with get_sftp_session(hostname=hostname,
+                              key_filename=key_filename) as sftp:
+            while True:
+                try:
+                    local_file, remote_file = pending.get_nowait()
+                except queue.Empty:
+                    return
+                attributes = _upload_file(sftp, local_file, remote_file)
+                with lock:
+                    report.uploaded.append((local_file, remote_file))
+                    report.size += getattr(attributes, 'st_size', 0) or 0
+
+    if max_workers is None:
+        max_workers = UPLOAD_MAX_WORKERS
+    max_workers = min(max_workers, pending.qsize())
+    if max_workers:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(upload) for _ in range(max_workers)]
+            for future in futures:
+                future.result()
+    report.elapsed = time.time() - start
+    logger.info(
+        'Uploaded %d files (%d bytes) to %s in %.2fs (%.1f KiB/s), skipped '
+        '%d identical files', len(report.uploaded), report.size,
+        hostname or settings.server.hostname, report.elapsed,
+        report.throughput / 1024, len(report.skipped)
+    )
+    return report
 
 
 def _upload_file(sftp, local_file, remote_file):
@@ -311,9 +1152,8 @@ def _upload_file(sftp, local_file, remote_file):
     # Check if local_file is a file-like object and use the proper
     # paramiko function to upload it to the remote machine.
     if hasattr(local_file, 'read'):
-        sftp.putfo(local_file, remote_file)
-    else:
-        sftp.put(local_file, remote_file)
+        return sftp.putfo(local_file, remote_file)
+    return sftp.put(local_file, remote_file)
 
 
 def download_file(remote_file, local_file=None, hostname=None):
@@ -323,19 +1163,85 @@ def download_file(remote_file, local_file=None, hostname=None):
     """
     if local_file is None:  # pragma: no cover
         local_file = remote_file
-    with get_connection(
-        hostname=hostname,
-    ) as connection:  # pragma: no cover
-        try:
-            sftp = connection.open_sftp()
-            sftp.get(remote_file, local_file)
-        finally:
-            sftp.close()
+    with get_sftp_session(hostname=hostname) as sftp:  # pragma: no cover
+        sftp.get(remote_file, local_file)
+
+
+def is_local_host(hostname):
+    """Whether commands for ``hostname`` are run on the local machine, see
+    :func:`execute_local_command`.
+
+    A host is local when its name starts with ``LOCAL_HOST_PREFIX`` or is
+    listed in ``local_hosts`` from configuration's ``ssh_client`` section.
+    """
+    return bool(hostname) and (
+        hostname.startswith(LOCAL_HOST_PREFIX) or
+        hostname in settings.ssh_client.local_hosts
+    )
+
+
+def _kill_process_group(process):
+    """Kill a process started by :func:`execute_local_command` and the
+    processes it started.
+    """
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except OSError:  # pragma: no cover
+        pass
+
+
+def execute_local_command(cmd, output_format=None, timeout=None,
+                          stream=False):
+    """Execute a command on the local machine instead of over ssh.
+
+    The command is run by ``bash``, like the login shell of the server, with
+    the permissions and working directory of the current process. The result
+    is cleaned up and parsed the same way :func:`execute_command` does.
+
+    :param cmd: The command to run.
+    :param output_format: plain|json|csv|list valid only for hammer commands
+    :param timeout: Time to wait for the command to finish.
+    :param stream: Return a :class:`LocalCommandStream` which yields the
+        output lines as they arrive instead of waiting for the command to
+        finish.
+    :return: SSHCommandResult or LocalCommandStream
+    :raises robottelo.ssh.SSHCommandTimeoutError: If the command did not
+        finish in ``timeout``, the command is killed.
+    """
+    if timeout is None:
+        timeout = settings.ssh_client.command_timeout
+    logger.info('>>> [local] %s', cmd)
+    process = subprocess.Popen(
+        cmd,
+        shell=True,
+        executable=LOCAL_SHELL if os.path.exists(LOCAL_SHELL) else None,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        # the command and its children are killed together on timeout
+        start_new_session=True,
+    )
+    if stream:
+        return LocalCommandStream(cmd, process, output_format, timeout)
+    try:
+        stdout, stderr = process.communicate(timeout=timeout or None)
+    except subprocess.TimeoutExpired:
+        _kill_process_group(process)
+        stdout, stderr = process.communicate()
+        logger.error('local command did not respond in the predefined time'
+                     ' (timeout=%s) and was interrupted', timeout)
+        logger.error('[Captured stdout]\n{0}\n-----\n'.format(stdout))
+        logger.error('[Captured stderr]\n{0}\n-----\n'.format(stderr))
+        raise SSHCommandTimeoutError(
+            'local command: {0} \n did not respond in the predefined time '
+            '(timeout={1})'.format(cmd, timeout)
+        )
+    return make_result(stdout, stderr, process.returncode, output_format)
 
 
 def command(cmd, hostname=None, output_format=None, username=None,
             password=None, key_filename=None, timeout=None,
-            connection_timeout=None):
+            connection_timeout=None, stream=False):
     """Executes SSH command(s) on remote hostname.
 
     :param str cmd: The command to run
@@ -353,21 +1259,150 @@ def command(cmd, hostname=None, output_format=None, username=None,
         configuration's ``server`` section will be used.
     :param int timeout: Time to wait for the ssh command to finish.
     :param connection_timeout: Time to wait for establishing the connection.
+    :param bool stream: Return a :class:`SSHCommandStream` yielding the
+        output lines as they arrive instead of a ``SSHCommandResult``. The
+        pooled connection is held until the stream is exhausted or closed.
+
+    Commands for local hosts, see :func:`is_local_host`, are run by
+    :func:`execute_local_command` without ssh.
     """
     hostname = hostname or settings.server.hostname
     if timeout is None:
         timeout = settings.ssh_client.command_timeout
+    if is_local_host(hostname):
+        return execute_local_command(
+            cmd, output_format, timeout, stream=stream)
     if connection_timeout is None:
         connection_timeout = settings.ssh_client.connection_timeout
-    with get_connection(hostname=hostname, username=username,
-                        password=password, key_filename=key_filename,
-                        timeout=connection_timeout) as connection:
+    if stream:
+        connection = _connection_pool.acquire(
+            hostname, username, password, key_filename, connection_timeout)
+        try:
+            result = execute_command(
+                cmd, connection, output_format, timeout, connection_timeout,
+                stream=True
+            )
+        except BaseException:
+            _connection_pool.release(connection, discard=True)
+            raise
+        result._on_close = partial(_connection_pool.release, connection)
+        return result
+    with get_pooled_connection(hostname=hostname, username=username,
+                               password=password, key_filename=key_filename,
+                               timeout=connection_timeout) as connection:
         return execute_command(
             cmd, connection, output_format, timeout, connection_timeout)
 
 
+def command_many(commands, max_workers=None, output_format=None,
+                 username=None, password=None, key_filename=None,
+                 timeout=None, connection_timeout=None, multiplex=False):
+    """Executes SSH commands on several hosts concurrently.
+
+    Each command is run through :func:`command` in a thread pool, so it uses
+    the pooled connections and the total time is bounded by the slowest host
+    instead of being the sum of all of them::
+
+        results = command_many([
+            (settings.server.hostname, 'cat /etc/hosts'),
+            (capsule_ip, 'cat /etc/hosts'),
+        ])
+
+    :param commands: an iterable of ``(hostname, cmd)`` tuples. If
+        ``hostname`` is ``None`` ``hostname`` from configuration's ``server``
+        section will be used.
+    :param int max_workers: The maximum number of commands running at the
+        same time. Defaults to the number of commands, up to
+        ``COMMAND_MANY_MAX_WORKERS``.
+    :param str output_format: json, csv or None
+    :param str username: The username to use when connecting.
+    :param str password: The password to use when connecting.
+    :param str key_filename: The path of the ssh private key to use when
+        connecting.
+    :param int timeout: Time to wait for each ssh command to finish.
+    :param connection_timeout: Time to wait for establishing each connection.
+    :param bool multiplex: Run the commands of the same host on the channels
+        of a single connection, see :func:`get_multiplexed_connection`,
+        instead of one pooled connection per running command.
+    :return: A list of ``SSHCommandResult`` in the same order of
+        ``commands``.
+    :raises robottelo.ssh.SSHCommandManyError: If any command raised an
+        exception, once all the commands are finished.
+    """
+    commands = list(commands)
+    if not commands:
+        return []
+    if max_workers is None:
+        max_workers = min(len(commands), COMMAND_MANY_MAX_WORKERS)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = []
+        for hostname, cmd in commands:
+            if multiplex and not is_local_host(
+                    hostname or settings.server.hostname):
+                connection = get_multiplexed_connection(
+                    hostname, username, password, key_filename,
+                    connection_timeout
+                )
+                futures.append(executor.submit(
+                    connection.run, cmd, output_format=output_format,
+                    timeout=timeout, connection_timeout=connection_timeout
+                ))
+            else:
+                futures.append(executor.submit(
+                    command, cmd, hostname=hostname,
+                    output_format=output_format, username=username,
+                    password=password, key_filename=key_filename,
+                    timeout=timeout, connection_timeout=connection_timeout
+                ))
+        return _gather_results(futures, commands)
+
+
+def _gather_results(futures, commands):
+    """Wait for the ``futures`` of the ``(hostname, cmd)`` ``commands`` and
+    return their results in order.
+
+    :raises robottelo.ssh.SSHCommandManyError: If any command raised an
+        exception, once all the commands are finished.
+    """
+    results = [None] * len(commands)
+    errors = []
+    for index, future in enumerate(futures):
+        try:
+            results[index] = future.result()
+        except Exception as err:
+            hostname, cmd = commands[index]
+            logger.error(
+                'ssh command %r on %s failed: %r', cmd, hostname, err)
+            errors.append((index, hostname, cmd, err))
+    if errors:
+        raise SSHCommandManyError(errors, results)
+    return results
+
+
+def _wait_exit_status(channel, timeout):
+    """Wait for the remote command running on ``channel`` to exit.
+
+    Paramiko channels set ``status_event`` as soon as the exit status is
+    received or the channel is closed, blocking on it returns right when the
+    remote process exits. Channels not providing it are polled.
+
+    :param channel: The channel the command was executed on.
+    :param timeout: Time to wait for the command to exit.
+    :return: ``True`` if the command exited before ``timeout``.
+    """
+    status_event = getattr(channel, 'status_event', None)
+    if status_event is not None:
+        return status_event.wait(timeout)
+    end_time = time.time() + timeout
+    while time.time() < end_time:
+        if channel.exit_status_ready():
+            return True
+        time.sleep(1)
+    return False
+
+
 def execute_command(cmd, connection, output_format=None, timeout=None,
-                    connection_timeout=None):
+                    connection_timeout=None, stream=False):
     """Execute a command via ssh in the given connection
 
     :param cmd: a command to be executed via ssh
@@ -375,7 +1410,9 @@ def execute_command(cmd, connection, output_format=None, timeout=None,
     :param output_format: plain|json|csv|list valid only for hammer commands
     :param timeout: Time to wait for the ssh command to finish.
     :param connection_timeout: Time to wait for establishing the connection.
-    :return: SSHCommandResult
+    :param stream: Return a ``SSHCommandStream`` which yields the output lines
+        as they arrive instead of waiting for the command to finish.
+    :return: SSHCommandResult or SSHCommandStream
     """
     if timeout is None:
         timeout = settings.ssh_client.command_timeout
@@ -384,14 +1421,11 @@ def execute_command(cmd, connection, output_format=None, timeout=None,
     logger.info('>>> %s', cmd)
     _, stdout, stderr = connection.exec_command(
         cmd, timeout=connection_timeout)
+    if stream:
+        return SSHCommandStream(
+            cmd, stdout.channel, output_format, timeout)
     if timeout:
-        # wait for the exit status ready
-        end_time = time.time() + timeout
-        while time.time() < end_time:
-            if stdout.channel.exit_status_ready():
-                break
-            time.sleep(1)
-        else:
+        if not _wait_exit_status(stdout.channel, timeout):
             logger.error('ssh command did not respond in the predefined time'
                          ' (timeout=%s) and will be interrupted', timeout)
             stdout.channel.close()
@@ -409,18 +1443,25 @@ def execute_command(cmd, connection, output_format=None, timeout=None,
 
     errorcode = stdout.channel.recv_exit_status()
 
-    stdout = stdout.read()
-    stderr = stderr.read()
+    return make_result(stdout.read(), stderr.read(), errorcode, output_format)
+
+
+def make_result(stdout, stderr, errorcode, output_format, log=True):
+    """Decode and clean up a command output and wrap it in a
+    ``SSHCommandResult``.
+    """
     # Remove escape code for colors displayed in the output
-    regex = re.compile(r'\x1b\[\d\d?m')
+    regex = _COLOR_CODES_REGEX
     if stdout:
         # Convert to unicode string
         stdout = decode_to_utf8(stdout)
-        logger.info('<<< stdout\n%s', stdout)
+        if log:
+            logger.info('<<< stdout\n%s', stdout)
     if stderr:
         # Convert to unicode string and remove all color codes characters
         stderr = regex.sub('', decode_to_utf8(stderr))
-        logger.info('<<< stderr\n%s', stderr)
+        if log:
+            logger.info('<<< stderr\n%s', stderr)
     # we don't want a list as output of 'plain' just pure text
     if stdout and output_format not in ('json', 'plain'):
         # Mostly only for hammer commands
@@ -438,6 +1479,135 @@ def execute_command(cmd, connection, output_format=None, timeout=None,
         stdout, stderr, errorcode, output_format)
 
 
+def _split_batch_output(output, token, count, default_return_code):
+    """Split the output of a script generated by :func:`run_batch` using the
+    delimiters printed around each command.
+
+    :return: a list of ``(output, return_code)`` tuples for the commands
+        which were started. A command started but without end delimiter, for
+        example because it called ``exit``, gets ``default_return_code``.
+    """
+    parts = []
+    position = 0
+    for index in range(count):
+        begin = u'{0}:{1}:begin\n'.format(token, index)
+        end = u'\n{0}:{1}:end:'.format(token, index)
+        start = output.find(begin, position)
+        if start == -1:
+            break
+        start += len(begin)
+        stop = output.find(end, start)
+        if stop == -1:
+            parts.append((output[start:], default_return_code))
+            break
+        code_start = stop + len(end)
+        position = output.find(u'\n', code_start)
+        parts.append((output[start:stop], int(output[code_start:position])))
+    return parts
+
+
+def run_batch(cmds, connection, output_format=None, stop_on_error=False,
+              timeout=None, connection_timeout=None):
+    """Execute several commands in a single script over one exec channel
+
+    Each command is run in the same shell, in order, between delimiters
+    printed on both stdout and stderr which carry its exit code. The output is
+    then split back in one ``SSHCommandResult`` per command, saving a channel
+    open and a round trip per command::
+
+        with ssh.get_pooled_connection() as connection:
+            results = ssh.run_batch(
+                ['mkdir -p /tmp/foo', 'touch /tmp/foo/bar'], connection)
+
+    As the commands share the same shell, a variable set by a command can be
+    used by the next ones.
+
+    :param cmds: an iterable of commands to be executed via ssh
+    :param connection: SSH Paramiko client connection
+    :param output_format: plain|json|csv|list valid only for hammer commands,
+        applied to each command output.
+    :param stop_on_error: stop at the first command returning a non zero exit
+        code, the next commands are not run and have no result.
+    :param timeout: Time to wait for the whole batch to finish.
+    :param connection_timeout: Time to wait for establishing the connection.
+    :return: A list of ``SSHCommandResult``, one for each command run.
+    """
+    cmds = list(cmds)
+    token, script = _batch_script(cmds, stop_on_error)
+    result = execute_command(
+        script, connection, output_format='plain',
+        timeout=timeout, connection_timeout=connection_timeout
+    )
+    return _split_batch_results(result, token, len(cmds), output_format)
+
+
+def command_batch(cmds, hostname=None, output_format=None,
+                  stop_on_error=False, username=None, password=None,
+                  key_filename=None, timeout=None, connection_timeout=None):
+    """Execute several commands on ``hostname`` with :func:`run_batch`,
+    using a pooled connection.
+
+    Like :func:`command`, the commands for local hosts, see
+    :func:`is_local_host`, are run by :func:`execute_local_command` without
+    ssh.
+
+    :return: A list of ``SSHCommandResult``, one for each command run.
+    """
+    hostname = hostname or settings.server.hostname
+    if is_local_host(hostname):
+        cmds = list(cmds)
+        token, script = _batch_script(cmds, stop_on_error)
+        result = execute_local_command(
+            script, output_format='plain', timeout=timeout)
+        return _split_batch_results(result, token, len(cmds), output_format)
+    with get_pooled_connection(hostname=hostname, username=username,
+                               password=password, key_filename=key_filename,
+                               timeout=connection_timeout) as connection:
+        return run_batch(
+            cmds, connection, output_format=output_format,
+            stop_on_error=stop_on_error, timeout=timeout,
+            connection_timeout=connection_timeout
+        )
+
+
+def _batch_script(cmds, stop_on_error):
+    """Return the delimiter token and the script running the list of
+    ``cmds`` in a batch, see :func:`run_batch`.
+    """
+    token = u'ROBOTTELO-BATCH-{0}'.format(uuid.uuid4().hex)
+    script = []
+    for index, cmd in enumerate(cmds):
+        logger.info('>>> [%s/%s] %s', index + 1, len(cmds), cmd)
+        begin = u"echo '{0}:{1}:begin'".format(token, index)
+        end = u"printf '\\n{0}:{1}:end:%d\\n' $__batch_rc".format(
+            token, index)
+        script.append(u'{0}; {0} >&2'.format(begin))
+        script.append(u'{{ {0}\n}}'.format(cmd))
+        script.append(u'__batch_rc=$?')
+        script.append(u'{0}; {0} >&2'.format(end))
+        if stop_on_error:
+            script.append(u'[ $__batch_rc -eq 0 ] || exit $__batch_rc')
+    return token, u'\n'.join(script)
+
+
+def _split_batch_results(result, token, count, output_format):
+    """Split the result of a batch script in one ``SSHCommandResult`` per
+    command run.
+    """
+    stdout_parts = _split_batch_output(
+        decode_to_utf8(result.stdout) or u'', token, count,
+        result.return_code
+    )
+    stderr_parts = _split_batch_output(
+        result.stderr or u'', token, count, result.return_code)
+    results = []
+    for index, (stdout, return_code) in enumerate(stdout_parts):
+        stderr = stderr_parts[index][0] if index < len(stderr_parts) else u''
+        results.append(make_result(
+            stdout, stderr, return_code, output_format, log=False))
+    return results
+
+
 def is_ssh_pub_key(key):
     """Validates if a string is in valid ssh pub key format
 
@@ -122,16 +122,24 @@ class CapsuleVirtualMachine(VirtualMachine):
         """Setup a name resolution so the capsule and satellite
         are resolvable
         """
-        self.run('echo "{0} {1} {2}" >> /etc/hosts'.format(
-            self.ip_addr, self._capsule_hostname, self._capsule_instance_name))
-
-        # add the capsule reverse record to the satellite hosts file
-        ssh.command(
-            u'sed -i \'/{0}/d\' /etc/hosts &&'
-            u' echo "{1} {0}" >> /etc/hosts'
-            .format(self._capsule_hostname, self.ip_addr),
-            hostname=settings.server.hostname
-        )
+        # add the capsule record to its own hosts file and the capsule reverse
+        # record to the satellite hosts file at the same time
+        ssh.command_many([
+            (
+                self.ip_addr,
+                'echo "{0} {1} {2}" >> /etc/hosts'.format(
+                    self.ip_addr,
+                    self._capsule_hostname,
+                    self._capsule_instance_name
+                )
+            ),
+            (
+                settings.server.hostname,
+                u'sed -i \'/{0}/d\' /etc/hosts &&'
+                u' echo "{1} {0}" >> /etc/hosts'
+                .format(self._capsule_hostname, self.ip_addr)
+            ),
+        ])
         if self.distro[:-1] == DISTRO_RHEL7:
             self.run('hostnamectl set-hostname {}'.format(
                 self._capsule_hostname))
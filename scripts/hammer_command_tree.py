@@ -4,26 +4,10 @@ help.
 """
 import json
 
-from robottelo import ssh
-from robottelo.cli import hammer
+from robottelo.cli.command_tree import generate_command_tree
 from robottelo.config import settings
 
 
-def generate_command_tree(command):
-    """Recursively walk trhough the hammer commands and subcommands and fetch
-    their help. Return a dictionary with the contents.
-
-    """
-    output = ssh.command('{0} --help'.format(command)).stdout
-    contents = hammer.parse_help(output)
-    if len(contents['subcommands']) > 0:
-        for subcommand in contents['subcommands']:
-            subcommand.update(generate_command_tree(
-                '{0} {1}'.format(command, subcommand['name'])
-            ))
-    return contents
-
-
 settings.configure()
 
 # Generate the json file in the working directory
@@ -16,6 +16,8 @@
 
 :Upstream: No
 """
+import time
+
 from random import choice
 
 from fauxfactory import gen_string, gen_alphanumeric
@@ -29,6 +31,7 @@ from robottelo.cli.factory import (
     add_role_permissions,
     CLIFactoryError,
     make_activation_key,
+    make_activation_key_bulk,
     make_content_view,
     make_host_collection,
     make_lifecycle_environment,
@@ -228,6 +231,36 @@ class ActivationKeyTestCase(CLITestCase):
         })
         self.assertEqual(new_ak['host-limit'], u'10')
 
+    @tier2
+    def test_positive_bulk_create_rate(self):
+        """Create activation keys with a single hammer csv import and log
+        the creation rate next to the one of the per key factory
+
+        :id: 6aa46315-df88-4749-abe4-99a1460ea8e6
+
+        :expectedresults: All the activation keys are created in the
+            organization
+
+        :CaseLevel: Integration
+        """
+        count = 20
+        start = time.time()
+        for _ in range(count):
+            make_activation_key({u'organization-id': self.org['id']})
+        single_rate = count / (time.time() - start)
+        start = time.time()
+        keys = make_activation_key_bulk(
+            count, {u'organization': self.org['name']})
+        bulk_rate = count / (time.time() - start)
+        self.logger.info(
+            'activation keys created per second: %.2f one by one, %.2f in '
+            'bulk', single_rate, bulk_rate
+        )
+        self.assertEqual(len(keys), count)
+        self.assertEqual(len(set(key['name'] for key in keys)), count)
+        key = ActivationKey.info({u'id': keys[0]['id']})
+        self.assertEqual(key['host-limit'], u'Unlimited')
+
     @tier2
     def test_positive_create_content_and_check_enabled(self):
         """Create activation key and add content to it. Check enabled state.
@@ -2,6 +2,9 @@
 """Configurations for py.test runner"""
 import datetime
 import logging
+import os
+import shutil
+import uuid
 
 import pytest
 try:
@@ -9,8 +12,11 @@ try:
 except ImportError:
     pass
 from time import time
+from robottelo.cli.factory_profiler import factory_profiler
+from robottelo.cli.hammer_timing import hammer_timings
 from robottelo.config import settings
 from robottelo.decorators import setting_is_set
+from robottelo.host_info import PROBE_RUN_ENV, get_probe_cache_dir
 from robottelo.bz_helpers import get_deselect_bug_ids, group_by_key
 from robottelo.helpers import get_func_name
 
@@ -175,3 +181,69 @@ def pytest_collection_modifyitems(items, config):
 @pytest.fixture(autouse=True, scope="function")
 def record_test_timestamp_xml(record_property):
     record_property("start_time", int(time() * 1000))
+
+
+def pytest_configure(config):
+    """Enable the factory profiler once for the session and identify the
+    test run, its pytest-xdist workers sharing the probe results of the hosts
+    """
+    if not settings.configured:
+        settings.configure()
+    factory_profiler.enabled = bool(
+        settings.performance and settings.performance.profile_factories)
+    if not hasattr(config, 'slaveinput'):
+        os.environ[PROBE_RUN_ENV] = uuid.uuid4().hex
+
+
+def pytest_unconfigure(config):
+    """Remove the probe results shared by the workers of the test run"""
+    if (not hasattr(config, 'slaveinput') and
+            settings.ssh_client.probe_cache_dir is None):
+        shutil.rmtree(get_probe_cache_dir(), ignore_errors=True)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_setup(item):
+    """Attribute the factory calls profiled during the setup of a test class,
+    like ``setUpClass``, to the class
+    """
+    test_class = item.getparent(pytest.Class)
+    factory_profiler.current_test = (
+        test_class.nodeid if test_class is not None else item.nodeid)
+    yield
+
+
+@pytest.fixture(autouse=True, scope="function")
+def profile_factories(request):
+    """Attribute the factory calls profiled during the test to it, and the
+    ones of ``tearDownClass`` to its class
+    """
+    class_nodeid = factory_profiler.current_test
+    factory_profiler.current_test = request.node.nodeid
+    yield
+    factory_profiler.current_test = class_nodeid
+
+
+def _worker_report_path(session, report_path):
+    """Add the pytest-xdist worker id to the name of a report file"""
+    if hasattr(session.config, 'slaveinput'):
+        root, ext = os.path.splitext(report_path)
+        report_path = '{0}_{1}{2}'.format(
+            root, session.config.slaveinput['slaveid'], ext)
+    return report_path
+
+
+def pytest_sessionfinish(session):
+    """Write the reports of the hammer commands timed and of the factory
+    calls profiled during the session
+    """
+    if len(hammer_timings):
+        report_path = _worker_report_path(
+            session, settings.performance.time_hammer_report)
+        hammer_timings.write_report(report_path)
+        log('Hammer timings report written to {0}'.format(report_path))
+    if len(factory_profiler):
+        report_path = _worker_report_path(
+            session, settings.performance.profile_factories_report)
+        factory_profiler.write_report(report_path)
+        log('Factory profile report written to {0}'.format(report_path))
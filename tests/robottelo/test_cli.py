@@ -1,7 +1,14 @@
+import os
 import six
+import stat
+import sys
+import tempfile
+import time
 import unittest2
 
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
+from robottelo import ssh
 from robottelo.cli.base import (
     Base,
     CLIBaseError,
@@ -9,6 +16,9 @@ from robottelo.cli.base import (
     CLIError,
     CLIReturnCodeError
 )
+from robottelo.cli.cache import ResponseCache
+from robottelo.cli.org import Org
+from tests.robottelo.test_ssh import StubSSHServer
 
 if six.PY2:
     import mock
@@ -22,6 +32,42 @@ class CLIClass(Base):
     foreman_admin_password = 'adminpassword'
 
 
+class OrgCLIClass(Base):
+    """Class used for the single round trip create tests"""
+    command_base = 'organization'
+    command_requires_org = False
+
+
+class OrgRequiredCLIClass(Base):
+    """Class used for the single round trip create tests"""
+    command_base = 'product'
+    command_requires_org = True
+
+
+FAKE_HAMMER = u'''import sys
+
+args = sys.argv[1:]
+options = dict(
+    arg[2:].split('=', 1) for arg in args if arg.startswith('--') and '=' in arg
+)
+if 'create' in args:
+    if options['name'] == 'fail':
+        sys.stderr.write('Could not create: Name has already been taken\\n')
+        sys.exit(65)
+    if options['name'] == 'noid':
+        print('Message')
+        print('Created.')
+    else:
+        print('Message,Id,Name')
+        print('Created.,42,' + options['name'])
+elif 'info' in args:
+    print('Id:              ' + options['id'])
+    if 'organization-id' in options:
+        print('Organization Id: ' + options['organization-id'])
+    print('Command:         ' + ' '.join(args[5:7]))
+'''
+
+
 class BaseCliTestCase(unittest2.TestCase):
     """Tests for the Base cli class"""
 
@@ -43,6 +89,62 @@ class BaseCliTestCase(unittest2.TestCase):
         self.assertNotIn(u'--flag-two', command_parts)
         self.assertEqual(len(command_parts), 4)
 
+    def test_construct_command_with_command_sub(self):
+        """_construct_command uses the given subcommand and leaves the class
+        untouched
+        """
+        Base.command_base = 'basecommand'
+        Base.command_sub = 'subcommand'
+        command = Base._construct_command(
+            {u'argument': u'value'}, command_sub='othersubcommand')
+        self.assertEqual(
+            command, u'basecommand othersubcommand --argument="value"')
+        self.assertEqual(Base.command_sub, 'subcommand')
+
+    @mock.patch('robottelo.cli.base.ssh.command')
+    @mock.patch('robottelo.cli.base.settings')
+    def test_concurrent_commands(self, settings, command):
+        """Concurrent calls on the same class run their own subcommand"""
+        settings.performance = False
+        settings.hammer.shell_session = False
+        settings.hammer.response_cache = False
+        settings.hammer.validate_options = False
+        settings.locale = 'en_US'
+        settings.server.admin_username = 'admin'
+        settings.server.admin_password = 'password'
+
+        def fake_command(cmd, **kwargs):
+            # echo the hammer command back, without the global options
+            return ssh.SSHCommandResult(
+                cmd.decode('utf-8').split(u'password  ', 1)[1], u'', 0)
+
+        command.side_effect = fake_command
+        methods = [
+            (Org.add_domain, u'add-domain'),
+            (Org.remove_domain, u'remove-domain'),
+            (Org.add_user, u'add-user'),
+            (Org.remove_user, u'remove-user'),
+            (Org.delete, u'delete'),
+        ]
+        calls = [
+            (methods[index % len(methods)], index) for index in range(500)
+        ]
+        if six.PY3:
+            # switch threads as often as possible to surface races
+            switch_interval = sys.getswitchinterval()
+            self.addCleanup(sys.setswitchinterval, switch_interval)
+            sys.setswitchinterval(1e-6)
+        with ThreadPoolExecutor(max_workers=50) as executor:
+            futures = [
+                executor.submit(method, {u'id': index})
+                for (method, _), index in calls
+            ]
+        for future, ((_, command_sub), index) in zip(futures, calls):
+            self.assertEqual(
+                future.result(),
+                u'organization {0} --id="{1}"'.format(command_sub, index)
+            )
+
     def test_username_password_parameters_lookup(self):
         """Username and password returned are the parameters"""
         username, password = CLIClass._get_username_password('auser', 'apass')
@@ -156,15 +258,16 @@ class BaseCliTestCase(unittest2.TestCase):
     @mock.patch('robottelo.cli.base.Base.execute')
     @mock.patch('robottelo.cli.base.Base._construct_command')
     def test_add_operating_system(self, construct, execute):
-        """Check command_sub edited when executing add_operating_system"""
+        """Check command_sub passed when executing add_operating_system"""
         options = {u'foo': u'bar'}
-        self.assertNotEqual('add-operatingsystem', Base.command_sub)
+        command_sub = Base.command_sub
         self.assertEqual(
             execute.return_value,
             Base.add_operating_system(options)
         )
-        self.assertEqual('add-operatingsystem', Base.command_sub)
-        construct.called_once_with(options)
+        self.assertEqual(command_sub, Base.command_sub)
+        construct.assert_called_once_with(
+            options, command_sub='add-operatingsystem')
         execute.called_once_with(construct.return_value)
 
     @mock.patch('robottelo.cli.base.Base.execute')
@@ -176,8 +279,7 @@ class BaseCliTestCase(unittest2.TestCase):
             execute.return_value,
             Base.create()
         )
-        self.assertEqual('create', Base.command_sub)
-        construct.called_once_with({})
+        construct.assert_called_once_with({}, command_sub='create')
         execute.called_once_with(construct.return_value, output_format='csv')
 
     @mock.patch('robottelo.cli.base.Base.info')
@@ -191,8 +293,7 @@ class BaseCliTestCase(unittest2.TestCase):
             execute.return_value,
             Base.create()
         )
-        self.assertEqual('create', Base.command_sub)
-        construct.called_once_with({})
+        construct.assert_called_once_with({}, command_sub='create')
         execute.called_once_with(construct.return_value, output_format='csv')
         self.assertFalse(info.called)
 
@@ -210,8 +311,7 @@ class BaseCliTestCase(unittest2.TestCase):
             execute.return_value,
             Base.create()
         )
-        self.assertEqual('create', Base.command_sub)
-        construct.called_once_with({})
+        construct.assert_called_once_with({}, command_sub='create')
         execute.called_once_with(construct.return_value, output_format='csv')
         info.called_once_with({'id': 'foo'})
 
@@ -229,8 +329,8 @@ class BaseCliTestCase(unittest2.TestCase):
             execute.return_value,
             Base.create({'organization-id': 'org-id'})
         )
-        self.assertEqual('create', Base.command_sub)
-        construct.called_once_with({})
+        construct.assert_called_once_with(
+            {'organization-id': 'org-id'}, command_sub='create')
         execute.called_once_with(construct.return_value, output_format='csv')
         info.called_once_with({'id': 'foo', 'organization-id': 'org-id'})
 
@@ -246,8 +346,7 @@ class BaseCliTestCase(unittest2.TestCase):
         ]
         Base.command_requires_org = True
         self.assertRaises(CLIError, Base.create)
-        self.assertEqual('create', Base.command_sub)
-        construct.called_once_with({})
+        construct.assert_called_once_with({}, command_sub='create')
         execute.called_once_with(construct.return_value, output_format='csv')
 
     def assert_cmd_execution(
@@ -258,8 +357,8 @@ class BaseCliTestCase(unittest2.TestCase):
             execute.return_value,
             base_method(**base_method_kwargs)
         )
-        self.assertEqual(cmd_sub, Base.command_sub)
-        construct.called_once_with({})
+        self.assertEqual(construct.call_count, 1)
+        self.assertEqual(construct.call_args[1], {'command_sub': cmd_sub})
         execute.called_once_with(
             construct.return_value, ignore_stderr=ignore_stderr
         )
@@ -290,6 +389,9 @@ class BaseCliTestCase(unittest2.TestCase):
         """Check excuted build ssh method and returns raw response"""
         settings.locale = 'en_US'
         settings.performance = False
+        settings.hammer.shell_session = False
+        settings.hammer.response_cache = False
+        settings.hammer.validate_options = False
         settings.server.admin_username = 'admin'
         settings.server.admin_password = 'password'
         response = Base.execute('some_cmd', return_raw_response=True)
@@ -302,15 +404,21 @@ class BaseCliTestCase(unittest2.TestCase):
         )
         self.assertIs(response, command.return_value)
 
+    @mock.patch('robottelo.cli.base.hammer_timings')
     @mock.patch('robottelo.cli.base.Base._handle_response')
     @mock.patch('robottelo.cli.base.ssh.command')
     @mock.patch('robottelo.cli.base.settings')
-    def test_execute_with_performance(self, settings, command, handle_resp):
+    def test_execute_with_performance(
+            self, settings, command, handle_resp, timings):
         """Check excuted build ssh method and delegate response handling"""
         settings.locale = 'en_US'
         settings.performance.timer_hammer = True
+        settings.hammer.response_cache = False
+        settings.hammer.validate_options = False
         settings.server.admin_username = 'admin'
         settings.server.admin_password = 'password'
+        command.return_value = ssh.SSHCommandResult(
+            u'', u'Warning: foo\nreal 1.25\nuser 0.50\nsys 0.10\n', 0)
         response = Base.execute('some_cmd', output_format='json')
         ssh_cmd = (
             u'LANG=en_US time -p hammer -v -u admin -p password --output=json'
@@ -324,9 +432,83 @@ class BaseCliTestCase(unittest2.TestCase):
         )
         handle_resp.assert_called_once_with(
             command.return_value,
-            ignore_stderr=None
+            ignore_stderr=None,
+            command='some_cmd'
+        )
+        self.assertIs(response, handle_resp.return_value)
+        # the timing is moved from stderr to the statistics
+        self.assertEqual(command.return_value.stderr, u'Warning: foo')
+        timings.record.assert_called_once_with(
+            u'some_cmd', u'', {'real': 1.25, 'user': 0.5, 'sys': 0.1})
+
+    @mock.patch('robottelo.cli.base.hammer_timings')
+    @mock.patch('robottelo.cli.base.ssh.command')
+    @mock.patch('robottelo.cli.base.settings')
+    def test_execute_records_timing_by_command(
+            self, settings, command, timings):
+        """Check the hammer timing is recorded for the command subcommand"""
+        settings.performance.time_hammer = True
+        settings.hammer.response_cache = False
+        settings.hammer.validate_options = False
+        command.side_effect = lambda *args, **kwargs: ssh.SSHCommandResult(
+            u'', u'real 1.25\nuser 0.50\nsys 0.10\n', 0)
+        timing = {'real': 1.25, 'user': 0.5, 'sys': 0.1}
+        OrgCLIClass.execute(u'organization info --id="1"')
+        timings.record.assert_called_with(u'organization', u'info', timing)
+        OrgCLIClass.execute(u'content-view version list --id="1"')
+        timings.record.assert_called_with(
+            u'content-view', u'version list', timing)
+        command.side_effect = None
+        command.return_value = ssh.SSHCommandResult(u'', u'', 0)
+        OrgCLIClass.execute(u'organization list')
+        self.assertEqual(timings.record.call_count, 2)
+
+    @mock.patch('robottelo.cli.base.Base._handle_response')
+    @mock.patch('robottelo.cli.base.hammer_shell.execute')
+    @mock.patch('robottelo.cli.base.ssh.command')
+    @mock.patch('robottelo.cli.base.settings')
+    def test_execute_with_shell_session(
+            self, settings, command, shell_execute, handle_resp):
+        """Check execute runs the command in a hammer shell session"""
+        settings.performance = False
+        settings.hammer.shell_session = True
+        settings.hammer.response_cache = False
+        settings.hammer.validate_options = False
+        settings.server.hostname = 'example.com'
+        settings.server.admin_username = 'admin'
+        settings.server.admin_password = 'password'
+        shell_execute.return_value = ssh.SSHCommandResult(u'', u'', 0)
+        response = Base.execute('org list', output_format='csv')
+        shell_execute.assert_called_once_with(
+            'org list',
+            user='admin',
+            password='password',
+            output_format='csv',
+            timeout=None,
+            connection_timeout=None
+        )
+        command.assert_not_called()
+        handle_resp.assert_called_once_with(
+            shell_execute.return_value,
+            ignore_stderr=None,
+            command='org list'
         )
         self.assertIs(response, handle_resp.return_value)
+        # multi-line and not read-only commands are not sent to the shell
+        Base.execute('org list\nsecond line')
+        Base.execute('org create --name foo')
+        self.assertEqual(command.call_count, 2)
+        self.assertEqual(shell_execute.call_count, 1)
+        # the real exit status of a command guessed failed is fetched
+        shell_execute.return_value = ssh.SSHCommandResult(u'', u'error', 1)
+        Base.execute('org info --id 1')
+        self.assertEqual(command.call_count, 3)
+        self.assertIs(handle_resp.call_args[0][0], command.return_value)
+        # the commands for a local host are not sent to the shell
+        settings.server.hostname = 'local://satellite'
+        Base.execute('org list')
+        self.assertEqual(command.call_count, 4)
+        self.assertEqual(shell_execute.call_count, 2)
 
     @mock.patch('robottelo.cli.base.Base.list')
     def test_exists_without_option_and_empty_return(self, lst_method):
@@ -397,10 +579,62 @@ class BaseCliTestCase(unittest2.TestCase):
             execute.return_value,
             Base.list(options={'organization-id': 1})
         )
-        self.assertEqual('list', Base.command_sub)
-        construct.called_once_with({'per-page': 1000})
+        construct.assert_called_once_with(
+            {'organization-id': 1, 'per-page': 10000}, command_sub='list')
         execute.called_once_with(construct.return_value, output_format='csv')
 
+    @mock.patch('robottelo.cli.base.Base.command_requires_org')
+    def test_iter_list_requires_organization_id(self, _):
+        """Check iter_list raises CLIError with organization-id is not
+        present in options
+        """
+        self.assertRaises(CLIError, list, Base.iter_list())
+
+    @mock.patch('robottelo.cli.base.Base.execute')
+    def test_iter_list(self, execute):
+        """Check iter_list fetches the pages until a partial one"""
+        execute.side_effect = [[1, 2], [3, 4], [5]]
+        self.assertEqual(
+            list(OrgCLIClass.iter_list({u'per-page': 100}, page_size=2)),
+            [1, 2, 3, 4, 5]
+        )
+        self.assertEqual(
+            [call[0][0] for call in execute.call_args_list],
+            [u'organization list --page="{0}" --per-page="2"'.format(page)
+             for page in range(1, 4)]
+        )
+        execute.assert_called_with(mock.ANY, output_format='csv')
+
+    @mock.patch('robottelo.cli.base.Base.execute')
+    def test_iter_list_stop_early(self, execute):
+        """Check iter_list does not fetch pages which are not consumed"""
+        execute.side_effect = lambda *args, **kwargs: [1, 2]
+        entries = OrgCLIClass.iter_list({u'page': 3}, page_size=2)
+        self.assertEqual(next(entries), 1)
+        self.assertEqual(next(entries), 2)
+        self.assertEqual(next(entries), 1)
+        entries.close()
+        self.assertEqual(execute.call_count, 2)
+        self.assertIn(u'--page="4"', execute.call_args[0][0])
+
+    @mock.patch('robottelo.cli.base.Base.execute')
+    def test_iter_list_prefetch(self, execute):
+        """Check iter_list fetches the next page while the current one is
+        consumed
+        """
+        pages = iter([[1, 2], [3, 4], []])
+        execute.side_effect = lambda *args, **kwargs: next(pages)
+        entries = OrgCLIClass.iter_list(page_size=2, prefetch=True)
+        self.assertEqual(next(entries), 1)
+        # the second page is requested while the first one is consumed
+        for _ in range(100):
+            if execute.call_count == 2:
+                break
+            time.sleep(0.01)
+        self.assertEqual(execute.call_count, 2)
+        self.assertEqual(list(entries), [2, 3, 4])
+        self.assertEqual(execute.call_count, 3)
+
     @mock.patch('robottelo.cli.base.Base.execute')
     @mock.patch('robottelo.cli.base.Base._construct_command')
     def test_list_without_per_page(self, construct, execute):
@@ -473,6 +707,232 @@ class BaseCliTestCase(unittest2.TestCase):
         )
 
 
+class FakeHammerTestCase(unittest2.TestCase):
+    """Base class for the tests running a fake hammer served by a local
+    stand-in sshd.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = StubSSHServer()
+        cls.bin_dir = tempfile.mkdtemp()
+        cls.hammer = os.path.join(cls.bin_dir, 'hammer')
+        with open(cls.hammer, 'w') as hammer:
+            hammer.write(u'#!{0}\n'.format(sys.executable))
+            hammer.write(FAKE_HAMMER)
+        os.chmod(cls.hammer, stat.S_IRWXU)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.close()
+        os.remove(cls.hammer)
+        os.rmdir(cls.bin_dir)
+
+    def setUp(self):
+        patcher = mock.patch.dict(os.environ, {
+            'PATH': os.pathsep.join([self.bin_dir, os.environ['PATH']])})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch('robottelo.cli.base.settings')
+        settings = patcher.start()
+        self.addCleanup(patcher.stop)
+        settings.locale = 'en_US'
+        settings.performance = False
+        settings.hammer.shell_session = False
+        settings.hammer.response_cache = False
+        settings.hammer.validate_options = False
+        settings.hammer.single_round_trip_create = True
+        settings.server.admin_username = 'admin'
+        settings.server.admin_password = 'password'
+        client = self.server.connect()
+        self.addCleanup(client.close)
+        patcher = mock.patch(
+            'robottelo.cli.base.ssh.get_pooled_connection')
+        get_pooled_connection = patcher.start()
+        self.addCleanup(patcher.stop)
+        get_pooled_connection.return_value.__enter__.return_value = client
+        self.get_pooled_connection = get_pooled_connection
+        self.settings = settings
+
+
+class SingleRoundTripCreateTestCase(FakeHammerTestCase):
+    """Tests for ``Base.create`` running create and info in one ssh exec."""
+
+    def test_create(self):
+        """Check create returns the created entity info"""
+        self.assertEqual(
+            OrgCLIClass.create({u'name': u'foo'}),
+            {
+                u'id': u'42',
+                u'command': u'organization info',
+            }
+        )
+        self.assertEqual(self.get_pooled_connection.call_count, 1)
+
+    def test_create_requires_org(self):
+        """Check the organization id is passed to info"""
+        self.assertEqual(
+            OrgRequiredCLIClass.create(
+                {u'name': u'foo', u'organization-id': 7}),
+            {
+                u'id': u'42',
+                u'organization-id': u'7',
+                u'command': u'product info',
+            }
+        )
+
+    @mock.patch('robottelo.cli.base.ssh.command')
+    def test_create_invalidates_response_cache(self, command):
+        """Check create drops the cached responses of its resource"""
+        self.settings.hammer.response_cache = True
+        self.settings.server.hostname = 'example.com'
+        command.side_effect = lambda *args, **kwargs: (
+            ssh.SSHCommandResult([{u'id': u'1'}], u'', 0))
+        with mock.patch(
+                'robottelo.cli.base.response_cache', ResponseCache()):
+            OrgCLIClass.list()
+            OrgCLIClass.list()
+            self.assertEqual(command.call_count, 1)
+            OrgCLIClass.create({u'name': u'foo'})
+            OrgCLIClass.list()
+        self.assertEqual(command.call_count, 2)
+
+    def test_create_without_id(self):
+        """Check create returns the create output when it has no id"""
+        self.assertEqual(
+            OrgCLIClass.create({u'name': u'noid'}),
+            [{u'message': u'Created.'}]
+        )
+
+    def test_create_error(self):
+        """Check create raises when the create command fails"""
+        with self.assertRaises(CLIReturnCodeError) as context:
+            OrgCLIClass.create({u'name': u'fail'})
+        self.assertEqual(context.exception.return_code, 65)
+        self.assertIn(u'Command "organization create"', context.exception.msg)
+        self.assertIn(u'Name has already been taken', context.exception.msg)
+
+    @mock.patch('robottelo.cli.base.Base.execute')
+    def test_create_fallback(self, execute):
+        """Check create runs two commands when info is overridden or the
+        organization id is missing
+        """
+        execute.return_value = []
+
+        class InfoCLIClass(OrgCLIClass):
+            @classmethod
+            def info(cls, options=None):
+                return {}
+
+        InfoCLIClass.create({u'name': u'foo'})
+        OrgRequiredCLIClass.create({u'name': u'foo'})
+        self.assertEqual(execute.call_count, 2)
+        self.assertFalse(self.get_pooled_connection.called)
+
+
+class ExecuteBatchTestCase(FakeHammerTestCase):
+    """Tests for ``Base.execute_batch``."""
+
+    def test_execute_batch(self):
+        """Check the commands run in one ssh exec and get previous ids"""
+        results = Base.execute_batch([
+            OrgCLIClass._construct_command(
+                {u'name': u'foo'}, command_sub='create'),
+            OrgCLIClass._construct_command(
+                {u'name': u'noid'}, command_sub='create'),
+            OrgCLIClass._construct_command(
+                {u'name': u'child-{0}'.format(Base.batch_id(0))},
+                command_sub='create'),
+        ])
+        self.assertEqual(results, [
+            [{u'message': u'Created.', u'id': u'42', u'name': u'foo'}],
+            [{u'message': u'Created.'}],
+            [{u'message': u'Created.', u'id': u'42', u'name': u'child-42'}],
+        ])
+        self.assertEqual(self.get_pooled_connection.call_count, 1)
+
+    def test_execute_batch_id_prefix(self):
+        """Check only the referenced ids are read, ``batch_id(1)`` being a
+        prefix of ``batch_id(10)``
+        """
+        commands = [
+            u'organization create --name="foo{0}"'.format(index)
+            for index in range(11)
+        ]
+        commands.append(u'organization info --id="{0}"'.format(
+            Base.batch_id(10)))
+        with mock.patch(
+                'robottelo.cli.base.ssh.run_batch',
+                wraps=ssh.run_batch) as run_batch:
+            Base.execute_batch(commands)
+        cmds = run_batch.call_args[0][0]
+        self.assertIn(u'__robottelo_id_10=', cmds[10])
+        self.assertNotIn(u'__robottelo_id_1=', cmds[1])
+
+    def test_execute_batch_error(self):
+        """Check the batch stops at the first failing command"""
+        responses = []
+        original_run_batch = ssh.run_batch
+
+        def run_batch(*args, **kwargs):
+            responses.extend(original_run_batch(*args, **kwargs))
+            return responses
+
+        with mock.patch('robottelo.cli.base.ssh.run_batch', run_batch):
+            with self.assertRaises(CLIReturnCodeError) as context:
+                Base.execute_batch([
+                    u'organization create --name="fail"',
+                    u'organization create --name="foo"',
+                ])
+        self.assertEqual(context.exception.return_code, 65)
+        self.assertEqual(len(responses), 1)
+
+    def test_execute_batch_id_requires_csv(self):
+        """Check ids can not be referenced without csv output"""
+        with self.assertRaises(CLIError):
+            Base.execute_batch([
+                u'organization create --name="foo"',
+                u'organization info --id="{0}"'.format(Base.batch_id(0)),
+            ], output_format='json')
+        self.assertFalse(self.get_pooled_connection.called)
+
+
+class LocalHostBatchTestCase(FakeHammerTestCase):
+    """Tests for the single exec commands run on a local host."""
+
+    def setUp(self):
+        super(LocalHostBatchTestCase, self).setUp()
+        patcher = mock.patch('robottelo.ssh.settings')
+        settings = patcher.start()
+        self.addCleanup(patcher.stop)
+        settings.server.hostname = u'local://satellite'
+        settings.ssh_client.command_timeout = 60
+
+    def test_create(self):
+        """Check create runs create and info without ssh"""
+        self.assertEqual(
+            OrgCLIClass.create({u'name': u'foo'}),
+            {
+                u'id': u'42',
+                u'command': u'organization info',
+            }
+        )
+        self.assertFalse(self.get_pooled_connection.called)
+
+    def test_execute_batch(self):
+        """Check the batch runs without ssh"""
+        results = Base.execute_batch([
+            OrgCLIClass._construct_command(
+                {u'name': u'foo'}, command_sub='create'),
+            OrgCLIClass._construct_command(
+                {u'name': u'child-{0}'.format(Base.batch_id(0))},
+                command_sub='create'),
+        ])
+        self.assertEqual(results[1], [
+            {u'message': u'Created.', u'id': u'42', u'name': u'child-42'}])
+        self.assertFalse(self.get_pooled_connection.called)
+
+
 class CLIErrorTests(unittest2.TestCase):
     """Tests for the CLIError cli class"""
 
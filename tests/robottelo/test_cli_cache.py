@@ -0,0 +1,153 @@
+"""Tests for module ``robottelo.cli.cache``."""
+import six
+
+from robottelo import ssh
+from robottelo.cli.base import Base, CLIReturnCodeError
+from robottelo.cli.cache import ResponseCache
+from unittest2 import TestCase
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class ResponseCacheTestCase(TestCase):
+    """Tests for the ``ResponseCache`` class."""
+
+    def setUp(self):
+        self.cache = ResponseCache()
+
+    def test_is_read_only(self):
+        for command in (
+                u'organization info --id="1"',
+                u'content-view version list --content-view-id="2"',
+                u'content-view version info --id="3"',
+                u'product list'):
+            self.assertTrue(self.cache.is_read_only(command), command)
+        for command in (
+                u'organization create --name="info"',
+                u'content-view publish --id="1"',
+                u'repository synchronize --name="list"',
+                u'info',
+                u''):
+            self.assertFalse(self.cache.is_read_only(command), command)
+
+    def test_resource(self):
+        self.assertEqual(
+            self.cache.resource(u'content-view filter create --name="x"'),
+            u'content-view'
+        )
+        self.assertEqual(self.cache.resource(u''), u'')
+
+    def test_hit_and_miss(self):
+        self.assertIsNone(self.cache.get(u'organization', 'key'))
+        generation = self.cache.generation(u'organization')
+        self.cache.set(u'organization', 'key', [{u'id': u'1'}], generation)
+        self.assertEqual(
+            self.cache.get(u'organization', 'key'), [{u'id': u'1'}])
+        self.assertEqual(
+            self.cache.stats(),
+            {'hits': 1, 'misses': 1, 'invalidations': 0, 'size': 1}
+        )
+
+    def test_cached_copies(self):
+        generation = self.cache.generation(u'organization')
+        response = [{u'id': u'1'}]
+        self.cache.set(u'organization', 'key', response, generation)
+        response[0][u'id'] = u'2'
+        cached = self.cache.get(u'organization', 'key')
+        self.assertEqual(cached, [{u'id': u'1'}])
+        cached.append({u'id': u'3'})
+        self.assertEqual(
+            self.cache.get(u'organization', 'key'), [{u'id': u'1'}])
+
+    def test_invalidate(self):
+        for resource in (u'organization', u'product'):
+            self.cache.set(
+                resource, 'key', [], self.cache.generation(resource))
+        self.cache.invalidate(u'organization')
+        self.assertIsNone(self.cache.get(u'organization', 'key'))
+        self.assertEqual(self.cache.get(u'product', 'key'), [])
+        self.assertEqual(self.cache.stats()['invalidations'], 1)
+
+    def test_invalidated_while_running(self):
+        """A response fetched before an invalidation is not cached"""
+        generation = self.cache.generation(u'organization')
+        self.cache.invalidate(u'organization')
+        self.cache.set(u'organization', 'key', [], generation)
+        self.assertIsNone(self.cache.get(u'organization', 'key'))
+        generation = self.cache.generation(u'organization')
+        self.cache.clear()
+        self.cache.set(u'organization', 'key', [], generation)
+        self.assertEqual(self.cache.stats()['size'], 0)
+
+    def test_clear(self):
+        self.cache.set(u'organization', 'key', [],
+                       self.cache.generation(u'organization'))
+        self.cache.get(u'organization', 'key')
+        self.cache.clear()
+        self.assertEqual(
+            self.cache.stats(),
+            {'hits': 0, 'misses': 0, 'invalidations': 0, 'size': 0}
+        )
+
+
+class ExecuteResponseCacheTestCase(TestCase):
+    """Tests for the response cache usage in ``Base.execute``."""
+
+    def setUp(self):
+        patcher = mock.patch('robottelo.cli.base.settings')
+        settings = patcher.start()
+        self.addCleanup(patcher.stop)
+        settings.locale = 'en_US'
+        settings.performance = False
+        settings.hammer.shell_session = False
+        settings.hammer.response_cache = True
+        settings.server.hostname = 'example.com'
+        settings.server.admin_username = 'admin'
+        settings.server.admin_password = 'password'
+        patcher = mock.patch(
+            'robottelo.cli.base.response_cache', ResponseCache())
+        self.cache = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch('robottelo.cli.base.ssh.command')
+        self.command = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.command.side_effect = lambda *args, **kwargs: (
+            ssh.SSHCommandResult([{u'id': u'1'}], u'', 0))
+
+    def test_read_only_command_cached(self):
+        first = Base.execute(u'organization info --id="1"')
+        second = Base.execute(u'organization info --id="1"')
+        self.assertEqual(first, second)
+        self.assertIsNot(first, second)
+        self.assertEqual(self.command.call_count, 1)
+        Base.execute(u'organization info --id="1"', user='other')
+        Base.execute(u'organization info --id="1"', output_format='csv')
+        self.assertEqual(self.command.call_count, 3)
+
+    def test_mutation_invalidates(self):
+        Base.execute(u'organization list')
+        Base.execute(u'product list')
+        Base.execute(u'organization update --id="1" --name="foo"')
+        Base.execute(u'organization list')
+        Base.execute(u'product list')
+        self.assertEqual(self.command.call_count, 4)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+    def test_failure_not_cached(self):
+        self.command.side_effect = lambda *args, **kwargs: (
+            ssh.SSHCommandResult(u'', u'Not found', 65))
+        for _ in range(2):
+            with self.assertRaises(CLIReturnCodeError):
+                Base.execute(u'organization info --id="1"')
+        self.assertEqual(self.command.call_count, 2)
+
+    def test_raw_response(self):
+        Base.execute(u'organization list')
+        response = Base.execute(u'organization list',
+                                return_raw_response=True)
+        self.assertIsInstance(response, ssh.SSHCommandResult)
+        self.assertEqual(response.stdout, [{u'id': u'1'}])
+        self.assertEqual(self.command.call_count, 1)
@@ -0,0 +1,218 @@
+"""Tests for module ``robottelo.cli.command_tree``."""
+import json
+import os
+import shutil
+import six
+import tempfile
+import threading
+import time
+
+from robottelo import ssh
+from robottelo.cli import command_tree
+from robottelo.cli.base import Base, CLIError
+from robottelo.helpers import read_data_file
+from unittest2 import TestCase
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+HELP_OUTPUTS = {
+    u'hammer': [
+        u'Usage:',
+        u'    hammer [OPTIONS] SUBCOMMAND [ARG] ...',
+        u'',
+        u'Subcommands:',
+        u' organization                  Manipulate organizations',
+        u' product                       Manipulate products',
+        u'',
+        u'Options:',
+        u' --output ADAPTER              Set output format',
+        u' -h, --help                    Print help',
+    ],
+    u'hammer organization': [
+        u'Subcommands:',
+        u' create                        Create an organization',
+        u' info                          Show an organization',
+        u'',
+        u'Options:',
+        u' -h, --help                    Print help',
+    ],
+    u'hammer organization create': [
+        u'Options:',
+        u' --description DESCRIPTION     Description',
+        u' --name NAME                   Name',
+    ],
+    u'hammer organization info': [
+        u'Options:',
+        u' --id ID                       Id',
+    ],
+    u'hammer product': [
+        u'Options:',
+        u' -h, --help                    Print help',
+    ],
+}
+
+
+class GenerateCommandTreeTestCase(TestCase):
+    """Tests for the ``generate_command_tree`` function."""
+
+    @mock.patch('robottelo.cli.command_tree.ssh.command')
+    def test_generate_command_tree(self, command):
+        running = []
+        max_running = []
+        lock = threading.Lock()
+
+        def fake_command(cmd, **kwargs):
+            with lock:
+                running.append(cmd)
+                max_running.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.remove(cmd)
+            return ssh.SSHCommandResult(
+                HELP_OUTPUTS[cmd[:-len(u' --help')]], u'', 0)
+
+        command.side_effect = fake_command
+        tree = command_tree.generate_command_tree(max_workers=4)
+        self.assertEqual(command.call_count, len(HELP_OUTPUTS))
+        # siblings are fetched at the same time
+        self.assertGreater(max(max_running), 1)
+        self.assertEqual(
+            [option['name'] for option in tree['options']],
+            [u'output', u'help']
+        )
+        organization = tree['subcommands'][0]
+        self.assertEqual(organization['name'], u'organization')
+        self.assertEqual(
+            organization['subcommands'][0],
+            {
+                u'name': u'create',
+                u'description': u'Create an organization',
+                u'subcommands': [],
+                u'options': [
+                    {u'name': u'description', u'deprecation_name': None,
+                     u'shortname': None,
+                     u'value': u'DESCRIPTION', u'help': u'Description'},
+                    {u'name': u'name', u'deprecation_name': None,
+                     u'shortname': None,
+                     u'value': u'NAME', u'help': u'Name'},
+                ],
+            }
+        )
+        self.assertEqual(tree['subcommands'][1]['subcommands'], [])
+
+
+class LoadCommandTreeTestCase(TestCase):
+    """Tests for saving and loading the command trees."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        patcher = mock.patch('robottelo.cli.command_tree.settings')
+        settings = patcher.start()
+        self.addCleanup(patcher.stop)
+        settings.hammer.command_tree_dir = os.path.join(
+            self.directory, 'trees')
+
+    @mock.patch('robottelo.cli.command_tree.generate_command_tree')
+    def test_load_command_tree(self, generate):
+        generate.return_value = {u'options': [], u'subcommands': []}
+        tree = command_tree.load_command_tree('6.6')
+        self.assertEqual(tree, generate.return_value)
+        path = command_tree.command_tree_path('6.6')
+        self.assertEqual(path, os.path.join(
+            self.directory, 'trees', 'hammer_commands_6.6.json'))
+        with open(path) as tree_file:
+            self.assertEqual(json.load(tree_file), tree)
+        self.assertEqual(command_tree.load_command_tree('6.6'), tree)
+        self.assertEqual(generate.call_count, 1)
+        command_tree.load_command_tree('6.7')
+        self.assertEqual(generate.call_count, 2)
+
+    @mock.patch('robottelo.cli.command_tree.generate_command_tree')
+    def test_unknown_version_not_saved(self, generate):
+        generate.return_value = {u'options': [], u'subcommands': []}
+        command_tree.load_command_tree('Not Available')
+        self.assertFalse(os.path.exists(
+            command_tree.command_tree_path('Not Available')))
+
+
+class CommandIndexTestCase(TestCase):
+    """Tests for the ``CommandIndex`` class."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.index = command_tree.CommandIndex(
+            json.loads(read_data_file('hammer_commands.json')))
+
+    def test_options(self):
+        options = self.index.options(u'organization create')
+        self.assertIn(u'name', options)
+        self.assertIn(u'description', options)
+        self.assertNotIn(u'id', options)
+        self.assertIn(u'content-view-id',
+                      self.index.options(u'content-view version list'))
+        self.assertIsNone(self.index.options(u'organization frobnicate'))
+
+    def test_unknown_options(self):
+        self.assertEqual(
+            self.index.unknown_options(
+                u'organization create',
+                [u'name', u'nmae', u'output', u'descriptoin']),
+            [u'descriptoin', u'nmae']
+        )
+        self.assertEqual(
+            self.index.unknown_options(u'organization frobnicate', [u'x']),
+            []
+        )
+
+    def test_deprecation_name(self):
+        index = command_tree.CommandIndex({
+            u'options': [],
+            u'subcommands': [{
+                u'name': u'host',
+                u'options': [{
+                    u'name': u'organization-title',
+                    u'deprecation_name': u'organization-label',
+                }],
+                u'subcommands': [],
+            }],
+        })
+        self.assertEqual(
+            index.unknown_options(
+                u'host',
+                [u'organization-title', u'organization-label', u'org']),
+            [u'org']
+        )
+
+
+class ConstructCommandValidationTestCase(TestCase):
+    """Tests for the options validation of ``Base._construct_command``."""
+
+    def setUp(self):
+        patcher = mock.patch('robottelo.cli.base.settings')
+        settings = patcher.start()
+        self.addCleanup(patcher.stop)
+        settings.hammer.validate_options = True
+        patcher = mock.patch('robottelo.cli.base.command_tree.get_index')
+        get_index = patcher.start()
+        self.addCleanup(patcher.stop)
+        get_index.return_value = command_tree.CommandIndex(
+            json.loads(read_data_file('hammer_commands.json')))
+        patcher = mock.patch.object(Base, 'command_base', 'organization')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_known_options(self):
+        self.assertEqual(
+            Base._construct_command(
+                {u'name': u'foo', u'description': None, u'label': False},
+                command_sub='create'),
+            u'organization create --name="foo"'
+        )
+
+    def test_unknown_options(self):
+        with self.assertRaisesRegex(CLIError, u'organization create.*nmae'):
+            Base._construct_command({u'nmae': u'foo'}, command_sub='create')
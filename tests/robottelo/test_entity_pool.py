@@ -0,0 +1,172 @@
+# coding: utf-8
+"""Tests for module ``robottelo.decorators.func_shared.pool``."""
+import itertools
+import multiprocessing
+import shutil
+import six
+import tempfile
+
+from unittest2 import TestCase
+
+from robottelo import decorators
+from robottelo.decorators.func_shared import pool
+from robottelo.decorators.func_shared.file_storage import FileStorageHandler
+from robottelo.decorators.func_shared.shared import (
+    _set_configured,
+    SharedFunctionError,
+)
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+_counter = itertools.count(1)
+_set_configured(True)
+
+
+def make_foo(options=None):
+    """A factory returning a new entity for each call"""
+    return {'id': next(_counter), 'options': options}
+
+
+def _get_from_process(root_dir):
+    entity_pool = pool.EntityPool(
+        'foo', make_foo, size=1,
+        storage_handler=FileStorageHandler(root_dir=root_dir))
+    return entity_pool.get()
+
+
+class EntityPoolTestCase(TestCase):
+    """Tests for the ``EntityPool`` class."""
+
+    def setUp(self):
+        self.storage = pool.MemoryStorageHandler()
+
+    def entity_pool(self, options=None, size=2):
+        return pool.EntityPool(
+            'foo', make_foo, options, size=size, storage_handler=self.storage)
+
+    def test_get(self):
+        """The shared entities are handed out in turn"""
+        entity_pool = self.entity_pool()
+        first = entity_pool.get()
+        second = entity_pool.get()
+        self.assertNotEqual(first, second)
+        # another process using the same storage
+        self.assertEqual(self.entity_pool().get(), first)
+        self.assertEqual(entity_pool.get(), second)
+        self.assertEqual(entity_pool.stats()['created'], 2)
+
+    def test_options(self):
+        """Pools are keyed by the options with a value"""
+        first = self.entity_pool(
+            {'organization-id': 1, 'name': None}, size=1).get()
+        self.assertEqual(
+            self.entity_pool({'organization-id': '1'}, size=1).get(), first)
+        self.assertEqual(first['options'], {'organization-id': 1,
+                                            'name': None})
+        self.assertNotEqual(
+            self.entity_pool({'organization-id': 2}, size=1).get(), first)
+        self.assertNotEqual(self.entity_pool(size=1).get(), first)
+
+    def test_lease(self):
+        """Leased entities are exclusive and discarded once mutated"""
+        entity_pool = self.entity_pool(size=1)
+        shared_entity = entity_pool.get()
+        with entity_pool.lease() as first:
+            with entity_pool.lease(mutated=False) as second:
+                self.assertNotIn(
+                    shared_entity, [first, second])
+                self.assertNotEqual(first, second)
+                self.assertEqual(entity_pool.stats()['leased'], 2)
+        # the untouched entity is leased again, the mutated one is not
+        with entity_pool.lease() as third:
+            self.assertEqual(third, second)
+        with entity_pool.lease() as fourth:
+            self.assertNotIn(fourth, [first, second, shared_entity])
+        self.assertEqual(entity_pool.get(), shared_entity)
+        self.assertEqual(entity_pool.stats(), {
+            'shared': 1, 'spare': 0, 'leased': 0, 'created': 4,
+            'discarded': 3,
+        })
+
+    def test_unknown_lease(self):
+        """Releasing an unknown lease raises an error"""
+        with self.assertRaises(SharedFunctionError):
+            self.entity_pool().release('unknown')
+
+    def test_fill(self):
+        """Entities are created in advance"""
+        entity_pool = self.entity_pool(size=3)
+        entity_pool.fill(spare=2)
+        stats = entity_pool.stats()
+        self.assertEqual(
+            (stats['shared'], stats['spare'], stats['created']), (3, 2, 5))
+        entity_pool.get()
+        entity_pool.acquire()
+        self.assertEqual(entity_pool.stats()['created'], 5)
+
+    def test_factory_error(self):
+        """A failing factory does not change the pool"""
+        entity_pool = pool.EntityPool(
+            'fail', mock.Mock(side_effect=ValueError), size=1,
+            storage_handler=self.storage)
+        with self.assertRaises(ValueError):
+            entity_pool.get()
+        self.assertEqual(entity_pool.stats()['created'], 0)
+
+    def test_processes_share_entities(self):
+        """The processes using the file storage share the entities"""
+        root_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root_dir)
+        process_pool = multiprocessing.Pool(4)
+        try:
+            entities = process_pool.map(_get_from_process, [root_dir] * 8)
+        finally:
+            process_pool.close()
+            process_pool.join()
+        self.assertEqual(len(set(entity['id'] for entity in entities)), 1)
+
+
+class CacheablePoolTestCase(TestCase):
+    """Tests for the pools of :func:`robottelo.decorators.cacheable`."""
+
+    def setUp(self):
+        patcher = mock.patch(
+            'robottelo.decorators.func_shared.pool._get_storage_handler',
+            return_value=pool.MemoryStorageHandler()
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch(
+            'robottelo.decorators.func_shared.pool._get_default_size',
+            return_value=1
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.dict('robottelo.decorators.OBJECT_CACHE')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.make_foo = decorators.cacheable(make_foo)
+
+    def test_pooled(self):
+        """``pooled=True`` returns the shared entity of the pool"""
+        entity = self.make_foo({'name': 'foo'}, pooled=True)
+        self.assertEqual(self.make_foo({'name': 'foo'}, pooled=True), entity)
+        self.assertEqual(self.make_foo.pool({'name': 'foo'}).get(), entity)
+        with self.make_foo.pool({'name': 'foo'}).lease() as leased:
+            self.assertNotEqual(leased, entity)
+
+    def test_cached_by_options(self):
+        """``cached=True`` returns the entity created with the same options"""
+        first = self.make_foo({'name': 'foo'}, cached=True)
+        self.assertIs(self.make_foo({'name': 'foo'}, cached=True), first)
+        self.assertIsNot(self.make_foo({'name': 'bar'}, cached=True), first)
+        self.assertEqual(
+            sorted(decorators.OBJECT_CACHE),
+            sorted([
+                'foo.{0}'.format(decorators.options_key({'name': 'foo'})),
+                'foo.{0}'.format(decorators.options_key({'name': 'bar'})),
+            ])
+        )
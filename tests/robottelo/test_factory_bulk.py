@@ -0,0 +1,97 @@
+"""Tests for the bulk factories of module ``robottelo.cli.factory``."""
+import csv
+import six
+
+from robottelo.cli import factory
+from robottelo.cli.base import CLIReturnCodeError
+from unittest2 import TestCase
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class MakeBulkTestCase(TestCase):
+    """Tests for the ``make_<entity>_bulk`` factories."""
+
+    def setUp(self):
+        self.uploads = []
+        for target, kwargs in (
+                ('upload_file', {'side_effect': self.upload}),
+                ('ssh', {}),
+                ('CSV_', {}),
+                ('ActivationKey', {})):
+            patcher = mock.patch.object(factory, target, **kwargs)
+            setattr(self, target, patcher.start())
+            self.addCleanup(patcher.stop)
+        self.ActivationKey.__name__ = 'ActivationKey'
+        self.ActivationKey.command_base = 'activation-key'
+
+    def upload(self, local_file, remote_file):
+        self.uploads.append((
+            remote_file,
+            list(csv.reader(
+                six.StringIO(local_file.read().decode('utf-8'))))
+        ))
+
+    def assert_removed(self, remote_file):
+        self.ssh.command.assert_called_once_with(
+            u'rm -f {0}'.format(remote_file))
+
+    def test_make_activation_key_bulk(self):
+        """The activation keys are imported by a single hammer csv command"""
+        self.ActivationKey.list.return_value = [
+            {'id': '12', 'name': 'bulk-2'}, {'id': '11', 'name': 'bulk-1'}]
+        keys = factory.make_activation_key_bulk(2, {
+            'name': 'bulk', 'organization': 'org 1'})
+        self.assertEqual(keys, [
+            {'id': '11', 'name': 'bulk-1'}, {'id': '12', 'name': 'bulk-2'}])
+        self.assertEqual(len(self.uploads), 1)
+        remote_file, rows = self.uploads[0]
+        self.assertEqual(
+            rows[0],
+            [column for column, _ in factory.ACTIVATION_KEY_CSV_COLUMNS]
+        )
+        rows = [dict(zip(rows[0], row)) for row in rows[1:]]
+        self.assertEqual([row['Name'] for row in rows], ['bulk-1', 'bulk-2'])
+        self.assertEqual(rows[0]['Organization'], 'org 1')
+        self.assertEqual(rows[0]['Limit'], 'Unlimited')
+        self.assertEqual(rows[0]['Environment'], 'Library')
+        self.assertEqual(rows[0]['Description'], '')
+        self.CSV_.activation_keys.assert_called_once_with(
+            {u'file': remote_file})
+        self.ActivationKey.list.assert_called_once_with(
+            {u'organization': 'org 1', u'search': u'name ~ bulk-'})
+        self.assert_removed(remote_file)
+
+    def test_import_failure(self):
+        """A failing import raises ``CLIFactoryError`` and removes the file"""
+        self.CSV_.activation_keys.side_effect = CLIReturnCodeError(
+            1, u'', u'import error')
+        with self.assertRaisesRegex(factory.CLIFactoryError, 'import error'):
+            factory.make_activation_key_bulk(3, {'organization': 'org'})
+        self.assert_removed(self.uploads[0][0])
+        self.assertFalse(self.ActivationKey.list.called)
+
+    def test_missing_entities(self):
+        """Listing less entities than imported raises ``CLIFactoryError``"""
+        self.ActivationKey.list.return_value = [{'id': '11', 'name': 'bulk-1'}]
+        with self.assertRaisesRegex(
+                factory.CLIFactoryError,
+                'Imported 2 ActivationKey but 1 were found'):
+            factory.make_activation_key_bulk(
+                2, {'name': 'bulk', 'organization': 'org'})
+
+    def test_no_entity(self):
+        """Nothing is imported for a count of zero"""
+        self.assertEqual(
+            factory.make_activation_key_bulk(0, {'organization': 'org'}), [])
+        self.assertEqual(self.uploads, [])
+        self.assertFalse(self.CSV_.activation_keys.called)
+
+    def test_required_options(self):
+        """The options required by the import are checked first"""
+        with self.assertRaises(factory.CLIFactoryError):
+            factory.make_activation_key_bulk(2, {'organization-id': 1})
+        self.assertEqual(self.uploads, [])
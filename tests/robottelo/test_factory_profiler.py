@@ -0,0 +1,149 @@
+"""Tests for module ``robottelo.cli.factory_profiler``."""
+import json
+import os
+import six
+import tempfile
+
+from robottelo import ssh
+from robottelo.cli.base import Base
+from robottelo.cli.factory_profiler import FactoryProfiler
+from robottelo.pipeline import Pipeline
+from unittest2 import TestCase
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class FactoryProfilerTestCase(TestCase):
+    """Tests for the ``FactoryProfiler`` class."""
+
+    def setUp(self):
+        self.profiler = FactoryProfiler()
+        self.profiler.enabled = True
+        self.profiler.current_test = u'test_module.py::test_one'
+        self.response = response = ssh.SSHCommandResult(
+            [u'Id,Name', u'1,org'], u'', 0)
+
+        @self.profiler.profile
+        def make_org(options=None):
+            self.profiler.record([u'organization create'], [response], 0.5)
+            return {'id': 1}
+
+        @self.profiler.profile
+        def setup_org(options=None):
+            make_org()
+            self.profiler.record(
+                [u'product create', u'product info'],
+                [response, response], 0.25, [{'real': 0.2}, None]
+            )
+            return make_org()
+
+        self.make_org = make_org
+        self.setup_org = setup_org
+
+    def test_nested_calls(self):
+        """The round trips of nested calls are included in their caller"""
+        self.assertEqual(self.setup_org(), {'id': 1})
+        self.assertEqual(self.setup_org.__name__, 'setup_org')
+        self.assertEqual(len(self.profiler), 3)
+        report = self.profiler.report()
+        self.assertEqual(
+            [(summary['factory'], summary['calls'], summary['executes'],
+              summary['ssh_time'], summary['hammer_time'])
+             for summary in report['factories']],
+            [('setup_org', 1, 3, 1.25, 0.2), ('make_org', 2, 2, 1.0, 0)]
+        )
+        size = len(u'organization create') + len(u'Id,Name') + len(u'1,org')
+        self.assertEqual(report['factories'][1]['bytes'], 2 * (size + 2))
+        self.assertEqual(
+            list(report['tests']), [u'test_module.py::test_one'])
+
+    def test_tests(self):
+        """The calls are attributed to the running test"""
+        self.make_org()
+        self.profiler.current_test = u'test_module.py::test_two'
+        self.setup_org()
+        tests = self.profiler.report()['tests']
+        self.assertEqual(
+            [summary['factory']
+             for summary in tests[u'test_module.py::test_two']],
+            ['setup_org', 'make_org']
+        )
+        self.assertEqual(
+            tests[u'test_module.py::test_one'][0]['calls'], 1)
+
+    def test_folded_stacks(self):
+        """The folded stacks hold the ssh time not spent in nested calls"""
+        self.setup_org()
+        self.assertEqual(self.profiler.folded_stacks(), [
+            u'test_module.py::test_one;setup_org 250',
+            u'test_module.py::test_one;setup_org;make_org 1000',
+        ])
+
+    def test_pipeline(self):
+        """The calls of the steps of a pipeline are included in the factory
+        running it
+        """
+        @self.profiler.profile
+        def setup_content():
+            pipeline = Pipeline(max_workers=2)
+            pipeline.add('org', self.make_org)
+            pipeline.add('product', lambda: self.profiler.record(
+                [u'product create'], [self.response], 0.25))
+            return pipeline.run()
+
+        with mock.patch('robottelo.pipeline.factory_profiler', self.profiler):
+            setup_content()
+        self.assertEqual(self.profiler.folded_stacks(), [
+            u'test_module.py::test_one;setup_content 250',
+            u'test_module.py::test_one;setup_content;make_org 500',
+        ])
+        self.assertEqual(
+            self.profiler.report()['factories'][0]['executes'], 2)
+
+    def test_disabled(self):
+        """Nothing is recorded when the profiler is disabled"""
+        self.profiler.enabled = False
+        self.setup_org()
+        self.assertEqual(len(self.profiler), 0)
+        self.profiler.record([u'organization list'], [], 1)
+        self.assertEqual(len(self.profiler), 0)
+
+    def test_write_report(self):
+        """The report is written as JSON or as folded stacks"""
+        self.setup_org()
+        report_dir = tempfile.mkdtemp()
+        json_path = os.path.join(report_dir, 'profile.json')
+        folded_path = os.path.join(report_dir, 'profile.folded')
+        self.profiler.write_report(json_path)
+        self.profiler.write_report(folded_path)
+        with open(json_path) as report_file:
+            self.assertEqual(
+                json.load(report_file)['factories'][0]['executes'], 3)
+        with open(folded_path) as report_file:
+            self.assertEqual(len(report_file.readlines()), 2)
+        self.profiler.clear()
+        self.assertEqual(len(self.profiler), 0)
+        os.remove(json_path)
+        os.remove(folded_path)
+        os.rmdir(report_dir)
+
+    @mock.patch('robottelo.cli.base.hammer_timings')
+    @mock.patch('robottelo.cli.base.ssh.command')
+    @mock.patch('robottelo.cli.base.settings')
+    def test_base_execute(self, settings, command, timings):
+        """The hammer commands run by ``Base.execute`` are recorded"""
+        settings.performance.time_hammer = True
+        settings.hammer.response_cache = False
+        settings.hammer.validate_options = False
+        command.return_value = ssh.SSHCommandResult(
+            u'', u'real 1.25\nuser 0.50\nsys 0.10\n', 0)
+        with mock.patch(
+                'robottelo.cli.base.factory_profiler', self.profiler):
+            self.profiler.profile(Base.execute)(u'organization list')
+        summary = self.profiler.report()['factories'][0]
+        self.assertEqual(summary['executes'], 1)
+        self.assertEqual(summary['hammer_time'], 1.25)
+        self.assertEqual(summary['bytes'], len(u'organization list'))
@@ -0,0 +1,128 @@
+"""Tests for the waiting helpers of module ``robottelo.cli.factory``."""
+import six
+import threading
+import time
+
+from robottelo.cli import factory
+from robottelo.cli.base import CLIReturnCodeError
+from unittest2 import TestCase
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class WaitForConditionTestCase(TestCase):
+    """Tests for the ``wait_for_condition`` function."""
+
+    def setUp(self):
+        self.clock = 1000.0
+        self.waits = []
+        patcher = mock.patch.object(factory, 'time')
+        patcher.start().time.side_effect = lambda: self.clock
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(factory, 'sleep', side_effect=self.sleep)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def sleep(self, seconds):
+        self.waits.append(round(seconds, 3))
+        self.clock += seconds
+
+    def test_backoff(self):
+        """The waits grow exponentially up to ``max_delay``"""
+        results = iter([None, [], None, None, None, {'id': 1}])
+        self.assertEqual(
+            factory.wait_for_condition(
+                lambda: next(results), delay=1, max_delay=5, jitter=0),
+            {'id': 1}
+        )
+        self.assertEqual(self.waits, [1, 2, 4, 5, 5])
+
+    def test_ready(self):
+        """A condition already true is not waited for"""
+        self.assertEqual(factory.wait_for_condition(lambda: 1), 1)
+        self.assertEqual(self.waits, [])
+
+    def test_jitter(self):
+        """The waits are randomly spread around the delay"""
+        results = iter([None] * 50 + [True])
+        factory.wait_for_condition(
+            lambda: next(results), timeout=1000, delay=4, max_delay=4,
+            jitter=0.5
+        )
+        self.assertTrue(all(2 <= wait <= 6 for wait in self.waits))
+        self.assertGreater(len(set(self.waits)), 1)
+
+    def test_deadline(self):
+        """The condition is checked one last time at the deadline"""
+        condition = mock.Mock(return_value=None)
+        with self.assertRaisesRegex(factory.CLIFactoryError, 'not found'):
+            factory.wait_for_condition(
+                condition, timeout=10, delay=3, jitter=0, message='not found')
+        self.assertEqual(self.waits, [3, 6, 1])
+        self.assertEqual(condition.call_count, 4)
+
+    def test_wake_up(self):
+        """A set event ends the wait early, only once"""
+        wake_up = mock.Mock(spec=threading.Event)
+        wake_up.wait.return_value = True
+        results = iter([None, None, True])
+        factory.wait_for_condition(
+            lambda: next(results), delay=1, jitter=0, wake_up=wake_up)
+        wake_up.wait.assert_called_once_with(1)
+        self.assertEqual(self.waits, [2])
+
+
+class WaitCallSitesTestCase(TestCase):
+    """Tests for the factories waiting for the server."""
+
+    @mock.patch.object(factory, 'sleep')
+    @mock.patch.object(factory, 'Product')
+    @mock.patch.object(factory, 'bz_bug_is_open', return_value=True)
+    @mock.patch.object(factory, 'make_product')
+    def test_make_product_wait(self, make_product, _, product, sleep):
+        """The product is queried until it is found"""
+        make_product.side_effect = factory.CLIFactoryError('create failed')
+        product.info.side_effect = [
+            CLIReturnCodeError(128, u'', u'not found'), {'id': 1}]
+        self.assertEqual(
+            factory.make_product_wait({'organization-id': 1}), {'id': 1})
+        self.assertEqual(sleep.call_count, 1)
+        self.assertLess(sleep.call_args[0][0], 1)
+        product.info.side_effect = CLIReturnCodeError(128, u'', u'not found')
+        with self.assertRaisesRegex(factory.CLIFactoryError, 'create failed'):
+            factory.make_product_wait({'organization-id': 1}, wait_for=0)
+
+    @mock.patch.object(factory, 'Task')
+    def test_task_completion_event(self, task):
+        """The event is set once the tasks found are finished"""
+        task.list.side_effect = [[], [{'id': 'a'}, {'id': 'b'}]]
+        event = factory.task_completion_event('label=Task', timeout=5)
+        start = time.time()
+        self.assertTrue(event.wait(5))
+        self.assertLess(time.time() - start, 2)
+        task.list.assert_called_with({u'search': 'label=Task'})
+        self.assertEqual(
+            task.progress.call_args_list,
+            [mock.call({u'id': 'a'}), mock.call({u'id': 'b'})]
+        )
+        # the event is also set when the tasks cannot be followed
+        task.list.side_effect = CLIReturnCodeError(128, u'', u'error')
+        self.assertTrue(
+            factory.task_completion_event('label=Task').wait(5))
+
+    @mock.patch.object(factory, 'Task')
+    def test_task_completion_event_stop(self, task):
+        """The tasks are no longer polled once the caller stopped waiting"""
+        task.list.return_value = []
+        stop = threading.Event()
+        event = factory.task_completion_event(
+            'label=Task', timeout=60, stop=stop)
+        stop.set()
+        self.assertTrue(event.wait(5))
+        calls = task.list.call_count
+        time.sleep(1)
+        self.assertEqual(task.list.call_count, calls)
+        self.assertFalse(task.progress.called)
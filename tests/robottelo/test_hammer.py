@@ -1,9 +1,46 @@
 # -*- encoding: utf-8 -*-
 """Tests for Robottelo's hammer helpers"""
+import csv
+import glob
+import io
+import json
+import logging
+import os
+import timeit
 import unittest2
 
 from robottelo.cli import hammer
 
+logger = logging.getLogger(__name__)
+
+ERRATUM_LIST_CSV = os.path.join(
+    os.path.dirname(__file__), 'data', 'hammer_erratum_list.csv')
+# captured "hammer <entity> info" outputs with their parsed values
+INFO_CORPUS = os.path.join(os.path.dirname(__file__), 'data', 'hammer_info')
+
+
+def _read_erratum_list():
+    """Return the header and the rows of the captured ``erratum list``
+    output.
+    """
+    with io.open(ERRATUM_LIST_CSV, encoding='utf-8') as handler:
+        return handler.readline().rstrip('\n'), [
+            line.rstrip('\n') for line in handler]
+
+
+def _read_info_corpus():
+    """Return ``(name, output lines, expected parsed info)`` for each output
+    of the info corpus.
+    """
+    corpus = []
+    for path in sorted(glob.glob(os.path.join(INFO_CORPUS, '*.txt'))):
+        with io.open(path, encoding='utf-8') as handler:
+            lines = handler.read().split(u'\n')
+        with io.open(path[:-len('.txt')] + '.json', encoding='utf-8') as handler:
+            expected = json.load(handler)
+        corpus.append((os.path.basename(path), lines, expected))
+    return corpus
+
 
 class ParseCSVTestCase(unittest2.TestCase):
     """Tests for parsing CSV hammer output"""
@@ -38,6 +75,68 @@ class ParseCSVTestCase(unittest2.TestCase):
             ]
         )
 
+    def test_parse_csv_compact(self):
+        """The compact rows compare and read like the parsed dicts"""
+        output_lines = [
+            u'Id,Name,Content Count',
+            u'1,"foo, bar",3',
+            u'',
+            u'2,baz',
+        ]
+        expected = hammer.parse_csv(output_lines)
+        table = hammer.parse_csv(iter(output_lines), compact=True)
+        self.assertIsInstance(table, hammer.CSVTable)
+        self.assertEqual(table, expected)
+        self.assertEqual(table.to_dicts(), expected)
+        self.assertEqual(table.keys, [u'id', u'name', u'content-count'])
+        self.assertEqual(table.rows, [(u'1', u'foo, bar', u'3'), (u'2', u'baz')])
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table[0][u'name'], u'foo, bar')
+        self.assertEqual(table[-1], {u'id': u'2', u'name': u'baz'})
+        self.assertEqual(len(table[1]), 2)
+        self.assertNotIn(u'content-count', table[1])
+        with self.assertRaises(KeyError):
+            table[1][u'content-count']
+        self.assertEqual(table[1:], expected[1:])
+        self.assertEqual([row[u'id'] for row in table], [u'1', u'2'])
+
+    def test_parse_csv_empty_output(self):
+        """An output without header gives no rows"""
+        self.assertEqual(hammer.parse_csv([]), [])
+        self.assertEqual(hammer.parse_csv([], compact=True), [])
+
+    def test_parse_csv_erratum_list(self):
+        """The compact parser gives the same rows as the full one on a
+        captured ``erratum list`` output
+        """
+        header, rows = _read_erratum_list()
+        output_lines = [header] + rows + [u'']
+        parsed = hammer.parse_csv(output_lines)
+        self.assertEqual(len(parsed), len(rows))
+        self.assertEqual(parsed[5][u'title'], (
+            u'Important: kernel security, bug fix, and enhancement update'))
+        self.assertEqual(parsed[8][u'title'], u'"yum" bug fix update')
+        self.assertEqual(hammer.parse_csv(output_lines, compact=True), parsed)
+
+    def test_parse_csv_benchmark(self):
+        """Log the time taken to parse a large hammer list output.
+
+        The captured ``erratum list`` output is repeated to more than 10k
+        rows, the parsed values are checked by
+        :meth:`test_parse_csv_erratum_list`.
+        """
+        header, rows = _read_erratum_list()
+        output_lines = [header] + rows * (10000 // len(rows) + 1) + [u'']
+        for compact in (False, True):
+            duration = min(timeit.repeat(
+                lambda: hammer.parse_csv(output_lines, compact=compact),
+                number=1, repeat=3
+            ))
+            logger.info(
+                'parse_csv of %s rows, compact=%s: %.1f ms',
+                len(output_lines), compact, duration * 1000
+            )
+
 
 class ParseJSONTestCase(unittest2.TestCase):
     """Tests for parsing JSON hammer output"""
@@ -137,6 +236,50 @@ class ParseJSONTestCase(unittest2.TestCase):
         self.assertEqual(hammer.parse_json(json_output),
                          hammer.parse_csv(csv_ouput_lines)[0])
 
+    def test_parse_json_without_int_coercion(self):
+        """Integers can be kept as they are"""
+        self.assertEqual(
+            hammer.parse_json(
+                u'[{"ID": 1, "Sub Total": 2.5, "Enabled": true, '
+                u'"Nested Items": {"Item ID": 3}}]',
+                coerce_ints=False
+            ),
+            [{u'id': 1, u'sub-total': 2.5, u'enabled': True,
+              u'nested-items': {u'item-id': 3}}]
+        )
+
+    def test_parse_json_benchmark(self):
+        """Benchmark parsing the JSON of a large hammer list output against
+        its CSV.
+
+        The captured ``erratum list`` output is repeated to more than 10k
+        rows, the JSON has the same entries with integer ids.
+        """
+        with io.open(ERRATUM_LIST_CSV, encoding='utf-8') as handler:
+            lines = [line.rstrip('\n') for line in handler]
+        header, rows = lines[0], lines[1:]
+        rows = rows * (10000 // len(rows) + 1)
+        csv_lines = [header] + rows + [u'']
+        keys = next(csv.reader([header]))
+        json_output = json.dumps([
+            dict(zip(keys, [int(values[0])] + values[1:]))
+            for values in csv.reader(rows)
+        ])
+        self.assertGreater(len(rows), 10000)
+        timings = {}
+        for name, parse in (
+                ('csv', lambda: hammer.parse_csv(csv_lines)),
+                ('json', lambda: hammer.parse_json(json_output)),
+                ('json without int coercion',
+                 lambda: hammer.parse_json(json_output, coerce_ints=False))):
+            timings[name] = min(timeit.repeat(parse, number=1, repeat=3))
+            logger.info(
+                'parse %s of %s rows: %.1f ms',
+                name, len(rows), timings[name] * 1000
+            )
+        self.assertEqual(
+            hammer.parse_json(json_output), hammer.parse_csv(csv_lines))
+
 
 class ParseHelpTestCase(unittest2.TestCase):
     """Tests for parsing hammer help output"""
@@ -205,30 +348,35 @@ class ParseHelpTestCase(unittest2.TestCase):
                 'options': [
                     {
                         'name': 'autocomplete',
+                        'deprecation_name': None,
                         'shortname': None,
                         'value': 'LINE',
                         'help': 'Get list of possible endings',
                     },
                     {
                         'name': 'name',
+                        'deprecation_name': 'deprecation-name',
                         'shortname': None,
                         'value': None,
                         'help': 'An option with a deprecation name',
                     },
                     {
                         'name': 'csv',
+                        'deprecation_name': None,
                         'shortname': None,
                         'value': None,
                         'help': 'Output as CSV (same as --output=csv)',
                     },
                     {
                         'name': 'csv-separator',
+                        'deprecation_name': None,
                         'shortname': None,
                         'value': 'SEPARATOR',
                         'help': 'Character to separate the values',
                     },
                     {
                         'name': 'output',
+                        'deprecation_name': None,
                         'shortname': None,
                         'value': 'ADAPTER',
                         'help': (
@@ -238,12 +386,14 @@ class ParseHelpTestCase(unittest2.TestCase):
                     },
                     {
                         'name': 'password',
+                        'deprecation_name': None,
                         'shortname': 'p',
                         'value': 'PASSWORD',
                         'help': 'password to access the remote system',
                     },
                     {
                         'name': 'reload-cache',
+                        'deprecation_name': None,
                         'shortname': 'r',
                         'value': None,
                         'help': 'force reload of Apipie cache',
@@ -395,9 +545,42 @@ class ParseInfoTestCase(unittest2.TestCase):
             }
         )
 
+    def test_parse_json_keys_cache_bounded(self):
+        """The cache of the normalized keys does not grow with every
+        distinct key parsed
+        """
+        size = hammer.NORMALIZED_KEYS_CACHE_SIZE
+        parsed = hammer.parse_json(json.dumps(
+            {u'Fact {0}'.format(index): index for index in range(2 * size)}))
+        self.assertEqual(parsed[u'fact-{0}'.format(2 * size - 1)],
+                         u'{0}'.format(2 * size - 1))
+        self.assertLessEqual(hammer._normalize_key.cache_info().currsize, size)
+
     def test_parse_json_list(self):
         """Can parse a list in json"""
         self.assertEqual(
             hammer.parse_json('["item1", "item2"]'),
             ['item1', 'item2']
         )
+
+    def test_parse_info_corpus(self):
+        """Captured info outputs are parsed to their expected values"""
+        corpus = _read_info_corpus()
+        self.assertGreater(len(corpus), 0)
+        for name, lines, expected in corpus:
+            with self.subTest(name):
+                self.assertEqual(hammer.parse_info(lines), expected)
+
+    def test_parse_info_benchmark(self):
+        """Log the time taken to parse the info corpus, in lines per second,
+        the parsed values are checked by :meth:`test_parse_info_corpus`
+        """
+        outputs = [lines for _, lines, _ in _read_info_corpus()]
+        line_count = sum(len(lines) for lines in outputs)
+        runs = 100
+        duration = min(timeit.repeat(
+            lambda: [hammer.parse_info(lines) for lines in outputs],
+            number=runs, repeat=3
+        ))
+        logger.info(
+            'parse_info: %.0f lines/s', line_count * runs / duration)
@@ -0,0 +1,146 @@
+"""Tests for module ``robottelo.cli.hammer_shell``."""
+import os
+import six
+import sys
+import tempfile
+
+from robottelo import ssh
+from robottelo.cli import hammer_shell
+from tests.robottelo.test_ssh import StubSSHServer
+from unittest2 import TestCase
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+FAKE_HAMMER_SHELL = u'''
+import os
+import sys
+import time
+
+while True:
+    sys.stdout.write('hammer> ')
+    sys.stdout.flush()
+    line = sys.stdin.readline()
+    if not line or line.strip() == 'exit':
+        break
+    args = line.split()
+    output = 'base'
+    if args[0].startswith('--output='):
+        output = args.pop(0)[len('--output='):]
+    if args[0] == 'organization' and output == 'csv':
+        sys.stdout.write('Id,Name\\n1,"{0}"\\n'.format(args[-1]))
+    elif args[0] == 'organization':
+        sys.stdout.write('Id:   1\\nName: {0}\\n'.format(args[-1]))
+    elif args[0] == 'pid':
+        sys.stdout.write('{0}\\n'.format(os.getpid()))
+    elif args[0] == 'echo':
+        sys.stdout.write(line)
+        sys.stdout.write('done\\n')
+    elif args[0] == 'warn':
+        sys.stderr.write('Warning: deprecated option\\n')
+        sys.stdout.write('ok\\n')
+    elif args[0] == 'fail':
+        sys.stderr.write('Could not find organization\\n')
+    elif args[0] == 'sleep':
+        time.sleep(float(args[1]))
+    sys.stdout.flush()
+    sys.stderr.flush()
+'''
+
+
+class HammerShellTestCase(TestCase):
+    """Run hammer shell sessions against a fake hammer shell served by a
+    local stand-in sshd.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = StubSSHServer()
+        fd, cls.script = tempfile.mkstemp(suffix='.py')
+        with os.fdopen(fd, 'w') as script:
+            script.write(FAKE_HAMMER_SHELL)
+        cls.shell_command = u'{0} {1}'.format(sys.executable, cls.script)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.close()
+        os.remove(cls.script)
+
+    def setUp(self):
+        self.session = hammer_shell.HammerShellSession(
+            self.server.connect(), self.shell_command, timeout=10)
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_run(self):
+        result = self.session.run('organization info --name foo', timeout=10)
+        self.assertEqual(result.return_code, 0)
+        self.assertEqual(result.stdout, [u'Id:   1', u'Name: foo', u''])
+        self.assertEqual(result.stderr, u'')
+
+    def test_output_format(self):
+        result = self.session.run(
+            'organization list --name foo', output_format='csv', timeout=10)
+        self.assertEqual(result.stdout, [{u'id': u'1', u'name': u'foo'}])
+
+    def test_session_reused(self):
+        first = self.session.run('pid', output_format='plain', timeout=10)
+        second = self.session.run('pid', output_format='plain', timeout=10)
+        self.assertEqual(first.stdout, second.stdout)
+
+    def test_echoed_command_line(self):
+        result = self.session.run('echo foo', output_format='plain',
+                                  timeout=10)
+        self.assertEqual(result.stdout, u'done\n')
+
+    def test_stderr_return_code(self):
+        result = self.session.run('fail', timeout=10)
+        self.assertEqual(result.return_code, 1)
+        self.assertEqual(result.stderr, u'Could not find organization\n')
+        result = self.session.run('warn', output_format='plain', timeout=10)
+        self.assertEqual(result.return_code, 0)
+        self.assertEqual(result.stdout, u'ok\n')
+
+    def test_timeout(self):
+        with self.assertRaises(ssh.SSHCommandTimeoutError):
+            self.session.run('sleep 5', timeout=0.5)
+        self.assertTrue(self.session.closed)
+
+    def test_exited_shell(self):
+        with self.assertRaises(hammer_shell.HammerShellError):
+            self.session.run('exit', timeout=10)
+        with self.assertRaises(hammer_shell.HammerShellError):
+            self.session.run('pid', timeout=10)
+
+    @mock.patch('robottelo.cli.hammer_shell._shell_command')
+    @mock.patch('robottelo.cli.hammer_shell.ssh.get_client')
+    def test_get_session(self, get_client, shell_command):
+        get_client.side_effect = lambda **kwargs: self.server.connect()
+        shell_command.return_value = self.shell_command
+        self.addCleanup(hammer_shell.close_sessions)
+        session = hammer_shell.get_session('admin', 'changeme', 'example.com')
+        self.assertIs(
+            hammer_shell.get_session('admin', 'changeme', 'example.com'),
+            session
+        )
+        self.assertIsNot(
+            hammer_shell.get_session('other', 'changeme', 'example.com'),
+            session
+        )
+        session.close()
+        self.assertIsNot(
+            hammer_shell.get_session('admin', 'changeme', 'example.com'),
+            session
+        )
+        self.assertEqual(get_client.call_count, 3)
+        hammer_shell.close_sessions()
+        self.assertEqual(hammer_shell._sessions, {})
+
+    @mock.patch('robottelo.cli.hammer_shell.ssh.get_client')
+    def test_get_session_local_host(self, get_client):
+        with self.assertRaises(hammer_shell.HammerShellError):
+            hammer_shell.get_session('admin', 'changeme', 'local://satellite')
+        self.assertFalse(get_client.called)
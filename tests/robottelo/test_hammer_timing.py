@@ -0,0 +1,73 @@
+"""Tests for module ``robottelo.cli.hammer_timing``."""
+import json
+import os
+import tempfile
+
+from robottelo.cli.hammer_timing import HammerTimings, split_timing
+from unittest2 import TestCase
+
+
+class SplitTimingTestCase(TestCase):
+    """Tests for the ``split_timing`` function."""
+
+    def test_split_timing(self):
+        stderr, timing = split_timing(
+            u'Warning: deprecated\nreal 12.50\nuser 3.25\nsys 0.40\n')
+        self.assertEqual(stderr, u'Warning: deprecated')
+        self.assertEqual(timing, {'real': 12.5, 'user': 3.25, 'sys': 0.4})
+
+    def test_only_timing(self):
+        self.assertEqual(
+            split_timing(u'real 1,50\nuser 1,00\nsys 0,25'),
+            (u'', {'real': 1.5, 'user': 1.0, 'sys': 0.25})
+        )
+
+    def test_no_timing(self):
+        for stderr in (
+                None,
+                u'',
+                u'Could not find organization\n',
+                u'real 1.50\nuser 1.00\nsys 0.25\nError: timed out\n'):
+            self.assertEqual(split_timing(stderr), (stderr, None))
+
+
+class HammerTimingsTestCase(TestCase):
+    """Tests for the ``HammerTimings`` class."""
+
+    def setUp(self):
+        self.timings = HammerTimings()
+        for real in range(1, 21):
+            self.timings.record(u'organization', u'info', {
+                'real': float(real), 'user': 1.0, 'sys': 0.5})
+        self.timings.record(u'content-view', u'publish', {
+            'real': 300.0, 'user': 2.0, 'sys': 1.0})
+
+    def test_report(self):
+        report = self.timings.report()
+        self.assertEqual(len(self.timings), 21)
+        self.assertEqual(
+            [(entry['command_base'], entry['command_sub'], entry['count'])
+             for entry in report],
+            [(u'content-view', u'publish', 1), (u'organization', u'info', 20)]
+        )
+        self.assertEqual(
+            report[1]['real'],
+            {'total': 210.0, 'p50': 10.0, 'p95': 19.0, 'max': 20.0}
+        )
+        self.assertEqual(
+            report[0]['sys'],
+            {'total': 1.0, 'p50': 1.0, 'p95': 1.0, 'max': 1.0}
+        )
+
+    def test_write_report(self):
+        fd, path = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        self.timings.write_report(path)
+        with open(path) as report_file:
+            self.assertEqual(json.load(report_file), self.timings.report())
+
+    def test_clear(self):
+        self.timings.clear()
+        self.assertEqual(len(self.timings), 0)
+        self.assertEqual(self.timings.report(), [])
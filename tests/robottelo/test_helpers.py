@@ -9,6 +9,7 @@ from robottelo.helpers import (
     get_server_version,
     Storage
 )
+from robottelo.host_info import probe_cache
 
 if six.PY2:
     import mock
@@ -18,6 +19,14 @@ else:
 
 class GetServerVersionTestCase(unittest2.TestCase):
     """Tests for method ``get_server_version``."""
+    def setUp(self):
+        probe_cache.clear()
+        # the probe results are not shared with the other tests
+        patcher = mock.patch(
+            'robottelo.host_info.get_probe_cache_dir', return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     @mock.patch('robottelo.helpers.ssh')
     def test_return_version(self, ssh):
         """get_server_version returns a proper version.
@@ -45,6 +54,13 @@ class GetServerVersionTestCase(unittest2.TestCase):
 
 class GetHostInfoTestCase(unittest2.TestCase):
     """Tests for method ``get_host_credentials``."""
+    def setUp(self):
+        probe_cache.clear()
+        # the probe results are not shared with the other tests
+        patcher = mock.patch(
+            'robottelo.host_info.get_probe_cache_dir', return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
     @mock.patch('robottelo.helpers.ssh')
     def test_fedora_info(self, ssh):
@@ -65,6 +81,17 @@ class GetHostInfoTestCase(unittest2.TestCase):
             ('Red Hat Enterprise Linux Server', 7, 1)
         )
 
+    @mock.patch('robottelo.helpers.ssh')
+    def test_cached_by_host(self, ssh):
+        ssh.command = mock.MagicMock(return_value=FakeSSHResult(
+            ['Red Hat Enterprise Linux Server release 7.1 (Maipo)'],
+            0
+        ))
+        for _ in range(2):
+            get_host_info()
+            get_host_info('client.example.com')
+        self.assertEqual(ssh.command.call_count, 2)
+
     @mock.patch('robottelo.helpers.ssh')
     def test_cat_fail(self, ssh):
         ssh.command = mock.MagicMock(
@@ -1,5 +1,8 @@
 import operator
+import os
+import shutil
 import six
+import tempfile
 from unittest2 import TestCase
 
 from robottelo import host_info
@@ -21,6 +24,12 @@ class GetHostOsVersionTestCase(TestCase):
         self._patcher = mock.patch(
             'robottelo.host_info.ssh.command')
         self._command = self._patcher.start()
+        host_info.probe_cache.clear()
+        # the probe results are not shared with the other tests
+        patcher = mock.patch(
+            'robottelo.host_info.get_probe_cache_dir', return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
     def tearDown(self):
         """Stop mock created on setUp method"""
@@ -37,7 +46,8 @@ class GetHostOsVersionTestCase(TestCase):
             parsed_version,
             host_info.get_host_os_version.__wrapped__()
         )
-        self._command.assert_called_once_with('cat /etc/redhat-release')
+        self._command.assert_called_once_with(
+            'cat /etc/redhat-release', hostname=None)
 
     def test_rhel_major_version_parsing(self):
         """Check if can parse major versions.
@@ -72,13 +82,15 @@ class GetHostOsVersionTestCase(TestCase):
             u'Red Hat Enterprise Linux Server release 7.2.1 (Maipo)'
         ]
         self.assertEqual(u'RHEL7.2.1', host_info.get_host_os_version())
-        self._command.assert_called_once_with('cat /etc/redhat-release')
+        self._command.assert_called_once_with(
+            'cat /etc/redhat-release', hostname=None)
         self._command.return_value.stdout = [
             u'Doesnt matter because because its cached'
         ]
         self.assertEqual(u'RHEL7.2.1', host_info.get_host_os_version())
         # if called more than once cache didn't worked
-        self._command.assert_called_once_with('cat /etc/redhat-release')
+        self._command.assert_called_once_with(
+            'cat /etc/redhat-release', hostname=None)
 
     @mock.patch('robottelo.host_info.LOGGER')
     def test_command_error(self, logger):
@@ -93,7 +105,8 @@ class GetHostOsVersionTestCase(TestCase):
 
         os_version = host_info.get_host_os_version.__wrapped__()
         self.assertEqual('Not Available', os_version)
-        self._command.assert_called_once_with('cat /etc/redhat-release')
+        self._command.assert_called_once_with(
+            'cat /etc/redhat-release', hostname=None)
         logger.warning.assert_called_once_with(
             u'Host version not available: %r' % cmd)
 
@@ -109,7 +122,8 @@ class GetHostOsVersionTestCase(TestCase):
         self._command.return_value = cmd
         os_version = host_info.get_host_os_version.__wrapped__()
         self.assertEqual('Not Available', os_version)
-        self._command.assert_called_once_with('cat /etc/redhat-release')
+        self._command.assert_called_once_with(
+            'cat /etc/redhat-release', hostname=None)
         logger.warning.assert_called_once_with(
             u'Host version not available: %r' % cmd
         )
@@ -133,6 +147,12 @@ class GetHostSatVersionTestCase(TestCase):
         self._patcher = mock.patch(
             'robottelo.host_info.ssh.command')
         self._command = self._patcher.start()
+        host_info.probe_cache.clear()
+        # the probe results are not shared with the other tests
+        patcher = mock.patch(
+            'robottelo.host_info.get_probe_cache_dir', return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
     def tearDown(self):
         """Stop mock created on setUp method"""
@@ -150,7 +170,7 @@ class GetHostSatVersionTestCase(TestCase):
             host_info.get_host_sat_version.__wrapped__()
         )
         self._command.assert_called_once_with(
-            host_info._SAT_6_2_VERSION_COMMAND
+            host_info._SAT_6_2_VERSION_COMMAND, hostname=None
         )
 
     def test_sat_6_dot_2(self):
@@ -171,8 +191,8 @@ class GetHostSatVersionTestCase(TestCase):
 
         self.assertEqual(u"6.1", sat_version)
         calls = [
-            call(host_info._SAT_6_2_VERSION_COMMAND),
-            call(host_info._SAT_6_1_VERSION_COMMAND)
+            call(host_info._SAT_6_2_VERSION_COMMAND, hostname=None),
+            call(host_info._SAT_6_1_VERSION_COMMAND, hostname=None)
         ]
         self._command.assert_has_calls(calls)
 
@@ -183,7 +203,7 @@ class GetHostSatVersionTestCase(TestCase):
         ]
         self.assertEqual(u'6.2', host_info.get_host_sat_version())
         self._command.assert_called_once_with(
-            host_info._SAT_6_2_VERSION_COMMAND
+            host_info._SAT_6_2_VERSION_COMMAND, hostname=None
         )
         self._command.return_value.stdout = [
             u'Doesnt matter because because its cached'
@@ -191,7 +211,7 @@ class GetHostSatVersionTestCase(TestCase):
         self.assertEqual(u'6.2', host_info.get_host_sat_version())
         # if called more than once cache didn't worked
         self._command.assert_called_once_with(
-            host_info._SAT_6_2_VERSION_COMMAND
+            host_info._SAT_6_2_VERSION_COMMAND, hostname=None
         )
 
     @mock.patch('robottelo.host_info.LOGGER')
@@ -203,8 +223,8 @@ class GetHostSatVersionTestCase(TestCase):
         sat_version = host_info.get_host_sat_version.__wrapped__()
         self.assertEqual('Not Available', sat_version)
         calls = [
-            call(host_info._SAT_6_2_VERSION_COMMAND),
-            call(host_info._SAT_6_1_VERSION_COMMAND)
+            call(host_info._SAT_6_2_VERSION_COMMAND, hostname=None),
+            call(host_info._SAT_6_1_VERSION_COMMAND, hostname=None)
         ]
         self._command.assert_has_calls(calls)
         logger.warning.assert_called_once_with(
@@ -212,6 +232,95 @@ class GetHostSatVersionTestCase(TestCase):
         )
 
 
+class CachedProbeTestCase(TestCase):
+    """Tests for the cached_probe decorator and ProbeCache class"""
+
+    def setUp(self):
+        """Mocking settings and using an empty probe cache"""
+        patcher = mock.patch('robottelo.host_info.settings')
+        self.settings = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.settings.server.hostname = u'sat.example.com'
+        self.settings.ssh_client.probe_cache_ttl = 60
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.settings.ssh_client.probe_cache_dir = self.directory
+        patcher = mock.patch(
+            'robottelo.host_info.probe_cache', host_info.ProbeCache())
+        self.cache = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.probe = mock.Mock(__name__='probe', __module__='tests')
+        self.probe.side_effect = lambda hostname=None: [hostname, u'7.4']
+
+    def test_keyed_by_host(self):
+        """Check the results are cached by probed host"""
+        probe = host_info.cached_probe(self.probe)
+        self.assertEqual(probe(), [None, u'7.4'])
+        self.assertEqual(probe(), [None, u'7.4'])
+        self.assertEqual(probe(u'sat.example.com'), [None, u'7.4'])
+        self.assertEqual(probe(u'other.example.com'),
+                         [u'other.example.com', u'7.4'])
+        self.assertEqual(self.probe.call_count, 2)
+        self.assertIs(probe.__wrapped__, self.probe)
+
+    @mock.patch('robottelo.host_info.get_probe_cache_dir', return_value=None)
+    @mock.patch('robottelo.host_info.time')
+    def test_ttl(self, time, _):
+        """Check the results expire after the TTL"""
+        probe = host_info.cached_probe(self.probe)
+        time.time.return_value = 1000
+        probe()
+        time.time.return_value = 1059
+        probe()
+        self.assertEqual(self.probe.call_count, 1)
+        time.time.return_value = 1060
+        probe()
+        self.assertEqual(self.probe.call_count, 2)
+
+    def test_disabled(self):
+        """Check a TTL of 0 disables the cache"""
+        self.settings.ssh_client.probe_cache_ttl = 0
+        probe = host_info.cached_probe(self.probe)
+        probe()
+        probe()
+        self.assertEqual(self.probe.call_count, 2)
+
+    def test_errors_not_cached(self):
+        """Check the probes raising errors are called again"""
+        self.probe.side_effect = ValueError
+        probe = host_info.cached_probe(self.probe)
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                probe()
+        self.assertEqual(self.probe.call_count, 2)
+
+    def test_shared_directory(self):
+        """Check the results saved by a process are used by the others"""
+        probe = host_info.cached_probe(self.probe, load=tuple)
+        self.assertEqual(probe(), [None, u'7.4'])
+        # another worker
+        with mock.patch(
+                'robottelo.host_info.probe_cache', host_info.ProbeCache()):
+            self.assertEqual(probe(), (None, u'7.4'))
+        self.assertEqual(self.probe.call_count, 1)
+
+    @mock.patch('robottelo.decorators.func_shared.file_storage.settings')
+    def test_default_directory(self, file_storage_settings):
+        """Check the results are shared in a directory of the test run by
+        default, and by each process only outside of a test run
+        """
+        self.settings.ssh_client.probe_cache_dir = None
+        file_storage_settings.tmp_dir = self.directory
+        with mock.patch.dict(os.environ, {host_info.PROBE_RUN_ENV: u'run1'}):
+            self.assertEqual(
+                host_info.get_probe_cache_dir(),
+                os.path.join(self.directory, 'robottelo', 'probes', 'run1')
+            )
+        with mock.patch.dict(os.environ):
+            os.environ.pop(host_info.PROBE_RUN_ENV, None)
+            self.assertIsNone(host_info.get_probe_cache_dir())
+
+
 class SatVersionDependentValuesTestCase(TestCase):
     """Tests for SatVersionDependentValues class"""
 
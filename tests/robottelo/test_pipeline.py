@@ -0,0 +1,223 @@
+"""Tests for module ``robottelo.pipeline``."""
+import six
+import threading
+import time
+
+from robottelo.cli import factory
+from robottelo.cli.base import CLIReturnCodeError
+from robottelo.pipeline import Pipeline, PipelineError
+from unittest2 import TestCase
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class PipelineTestCase(TestCase):
+    """Tests for the ``Pipeline`` class."""
+
+    def setUp(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def step(self, name, duration=0, result=None):
+        """Return a step function sleeping ``duration`` and recording its
+        start and end.
+        """
+        def function(*args):
+            with self.lock:
+                self.calls.append(('start', name))
+            time.sleep(duration)
+            with self.lock:
+                self.calls.append(('end', name))
+            return (name, args) if result is None else result
+        return function
+
+    def test_results(self):
+        """Each step receives the results of the steps it requires"""
+        pipeline = Pipeline()
+        pipeline.add('org', self.step('org', result=1))
+        pipeline.add_value('env', 2)
+        pipeline.add('product', self.step('product'), requires=['org', 'env'])
+        self.assertEqual(
+            pipeline.run(),
+            {'org': 1, 'env': 2, 'product': ('product', (1, 2))}
+        )
+        self.assertEqual(
+            self.calls,
+            [('start', 'org'), ('end', 'org'), ('start', 'product'),
+             ('end', 'product')]
+        )
+
+    def test_independent_steps_run_concurrently(self):
+        """Steps whose requirements are done run at the same time"""
+        pipeline = Pipeline(max_workers=3)
+        pipeline.add('org', self.step('org'))
+        for name in ('env', 'product', 'cv'):
+            pipeline.add(name, self.step(name, 0.3), requires=['org'])
+        pipeline.add('ak', self.step('ak'), requires=['env', 'cv'])
+        start = time.time()
+        pipeline.run()
+        self.assertLess(time.time() - start, 0.8)
+        self.assertEqual(self.calls[-2:], [('start', 'ak'), ('end', 'ak')])
+        self.assertEqual(
+            sorted(pipeline.durations), ['ak', 'cv', 'env', 'org', 'product'])
+
+    def test_max_workers(self):
+        """No more than ``max_workers`` steps run at the same time and a
+        single worker runs the steps in the order they were added
+        """
+        pipeline = Pipeline(max_workers=1)
+        for name in ('a', 'b', 'c'):
+            pipeline.add(name, self.step(name, 0.1))
+        start = time.time()
+        pipeline.run()
+        self.assertGreaterEqual(time.time() - start, 0.3)
+        self.assertEqual(
+            [name for event, name in self.calls if event == 'start'],
+            ['a', 'b', 'c']
+        )
+
+    def test_error_stops_pipeline(self):
+        """A failing step stops the pipeline once the running steps are done
+        """
+        def fail():
+            time.sleep(0.1)
+            raise ValueError('fail')
+
+        pipeline = Pipeline()
+        pipeline.add('fail', fail)
+        pipeline.add('slow', self.step('slow', 0.3))
+        pipeline.add('next', self.step('next'), requires=['fail'])
+        pipeline.add('after', self.step('after'), requires=['slow'])
+        with self.assertRaisesRegex(ValueError, 'fail'):
+            pipeline.run()
+        self.assertEqual(self.calls, [('start', 'slow'), ('end', 'slow')])
+
+    def test_invalid_pipelines(self):
+        """Unknown requirements, cycles and duplicated steps are rejected"""
+        pipeline = Pipeline()
+        pipeline.add('a', self.step('a'), requires=['unknown'])
+        with self.assertRaisesRegex(PipelineError, 'unknown'):
+            pipeline.run()
+        pipeline = Pipeline()
+        pipeline.add('a', self.step('a'), requires=['b'])
+        pipeline.add('b', self.step('b'), requires=['a'])
+        pipeline.add('c', self.step('c'))
+        with self.assertRaisesRegex(PipelineError, 'require each other'):
+            pipeline.run()
+        self.assertEqual(self.calls, [])
+        with self.assertRaises(PipelineError):
+            pipeline.add('c', self.step('c'))
+
+
+class SetupOrgForACustomRepoTestCase(TestCase):
+    """Tests for the pipeline of ``setup_org_for_a_custom_repo``."""
+
+    def setUp(self):
+        self.calls = []
+        self.lock = threading.Lock()
+        for name, result in (
+                ('make_org', {'id': 1}),
+                ('make_lifecycle_environment', {'id': 2}),
+                ('make_product', {'id': 3, 'name': 'product'}),
+                ('make_repository', {'id': 4}),
+                ('make_content_view', {'id': 5}),
+                ('make_activation_key', {'id': 6}),
+                ('activationkey_add_subscription_to_repo', None)):
+            patcher = mock.patch.object(
+                factory, name, side_effect=self.record(name, result))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        for cli_class, method, result in (
+                ('Repository', 'synchronize', None),
+                ('ContentView', 'add_repository', None),
+                ('ContentView', 'publish', None),
+                ('ContentView', 'info', {'versions': [{'id': 7}]}),
+                ('ContentView', 'version_promote', None),
+                ('ActivationKey', 'update', None)):
+            patcher = mock.patch.object(
+                getattr(factory, cli_class), method,
+                side_effect=self.record(
+                    '{0}.{1}'.format(cli_class, method), result)
+            )
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def record(self, name, result):
+        def function(*args, **kwargs):
+            with self.lock:
+                self.calls.append((name, args))
+            return result
+        return function
+
+    def called(self, name):
+        return [args for call, args in self.calls if call == name]
+
+    def index(self, name):
+        return [call for call, _ in self.calls].index(name)
+
+    def test_new_entities(self):
+        """The entities are created in the order of their dependencies"""
+        result = factory.setup_org_for_a_custom_repo({'url': 'http://repo'})
+        self.assertEqual(result, {
+            u'activationkey-id': 6,
+            u'content-view-id': 5,
+            u'lifecycle-environment-id': 2,
+            u'organization-id': 1,
+            u'product-id': 3,
+            u'repository-id': 4,
+        })
+        self.assertLess(
+            self.index('Repository.synchronize'),
+            self.index('ContentView.publish')
+        )
+        self.assertLess(
+            self.index('ContentView.version_promote'),
+            self.index('ActivationKey.update')
+        )
+        self.assertEqual(
+            self.called('make_activation_key'), [({u'organization-id': 1},)])
+        self.assertEqual(self.called('ActivationKey.update'), [({
+            u'content-view-id': 5,
+            u'id': 6,
+            u'lifecycle-environment-id': 2,
+            u'organization-id': 1,
+        },)])
+        self.assertEqual(
+            self.called('activationkey_add_subscription_to_repo'), [({
+                u'activationkey-id': 6,
+                u'organization-id': 1,
+                u'subscription': 'product',
+            },)]
+        )
+
+    def test_given_entities(self):
+        """The given entities are used instead of creating new ones"""
+        result = factory.setup_org_for_a_custom_repo({
+            'url': 'http://repo',
+            'organization-id': 11,
+            'lifecycle-environment-id': 12,
+            'content-view-id': 15,
+            'activationkey-id': 16,
+        })
+        self.assertEqual(result[u'activationkey-id'], 16)
+        self.assertEqual(result[u'content-view-id'], 15)
+        for name in ('make_org', 'make_lifecycle_environment',
+                     'make_content_view', 'make_activation_key'):
+            self.assertEqual(self.called(name), [])
+        self.assertEqual(self.called('ActivationKey.update'), [({
+            u'content-view-id': 15,
+            u'id': 16,
+            u'organization-id': 11,
+        },)])
+
+    def test_failure(self):
+        """Failing hammer commands raise ``CLIFactoryError``"""
+        factory.Repository.synchronize.side_effect = CLIReturnCodeError(
+            1, u'', u'sync error')
+        with self.assertRaisesRegex(
+                factory.CLIFactoryError, 'Failed to synchronize repository'):
+            factory.setup_org_for_a_custom_repo({'url': 'http://repo'})
+        self.assertEqual(self.called('ContentView.publish'), [])
@@ -1,10 +1,20 @@
 """Tests for module ``robottelo.ssh``."""
 # (too-many-public-methods) pylint: disable=R0904
+import contextlib
+import hashlib
+import logging
 import os
 import paramiko
+import shutil
 import six
+import socket
+import subprocess
+import tempfile
+import threading
+import time
 
 from robottelo import ssh
+from robottelo.cli import hammer
 from unittest2 import TestCase
 
 if six.PY2:
@@ -12,6 +22,8 @@ if six.PY2:
 else:
     from unittest import mock
 
+logger = logging.getLogger(__name__)
+
 
 class MockChannel(object):
     def __init__(self, ret, status_ready=True):
@@ -34,6 +46,21 @@ class MockStdout(object):
         return self.cmd
 
 
+class MockTransport(object):
+    def __init__(self):
+        self.active = True
+        self.keepalive = None
+
+    def is_active(self):
+        return self.active
+
+    def is_authenticated(self):
+        return self.active
+
+    def set_keepalive(self, interval):
+        self.keepalive = interval
+
+
 class MockSSHClient(object):
     """A mock ``paramiko.SSHClient`` object."""
     def __init__(self):
@@ -53,6 +80,7 @@ class MockSSHClient(object):
         self.key_filename = None
         self.password = None
         self.ret_code = 0
+        self.transport = MockTransport()
 
     def set_missing_host_key_policy(self, policy):  # pylint:disable=W0613
         """A no-op stub method."""
@@ -79,8 +107,12 @@ class MockSSHClient(object):
         self.key_filename = key_filename
 
     def close(self):
-        """A no-op stub method."""
+        """A stub method which marks the transport as closed."""
         self.close_ += 1
+        self.transport.active = False
+
+    def get_transport(self):
+        return self.transport
 
     def exec_command(self, cmd, *args, **kwargs):
         return (
@@ -90,8 +122,146 @@ class MockSSHClient(object):
         )
 
 
+class StubSSHServerInterface(paramiko.ServerInterface):
+    """Accept any password and run the exec requests locally, refusing to
+    open more than ``max_sessions`` channels at the same time if set.
+    """
+
+    def __init__(self, max_sessions=None):
+        self.max_sessions = max_sessions
+        self.open_sessions = 0
+        self.lock = threading.Lock()
+
+    def check_channel_request(self, kind, chanid):
+        if kind == 'session':
+            with self.lock:
+                if (self.max_sessions is not None and
+                        self.open_sessions >= self.max_sessions):
+                    return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+                self.open_sessions += 1
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def get_allowed_auths(self, username):
+        return 'password'
+
+    def check_auth_password(self, username, password):
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_channel_exec_request(self, channel, command):
+        thread = threading.Thread(
+            target=self._run_session, args=(channel, command))
+        thread.daemon = True
+        thread.start()
+        return True
+
+    def _run_session(self, channel, command):
+        try:
+            self._run_command(channel, command)
+        finally:
+            with self.lock:
+                self.open_sessions -= 1
+
+    @staticmethod
+    def _run_command(channel, command):
+        process = subprocess.Popen(
+            command, shell=True, stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+
+        def forward_stdin():
+            try:
+                for chunk in iter(lambda: channel.recv(4096), b''):
+                    process.stdin.write(chunk)
+                    process.stdin.flush()
+                process.stdin.close()
+            except socket.error:
+                pass
+
+        def forward_stderr():
+            try:
+                for chunk in iter(lambda: process.stderr.read1(4096), b''):
+                    channel.sendall_stderr(chunk)
+            except socket.error:
+                pass
+
+        threads = [
+            threading.Thread(target=forward_stdin),
+            threading.Thread(target=forward_stderr),
+        ]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        try:
+            for chunk in iter(lambda: process.stdout.read1(4096), b''):
+                channel.sendall(chunk)
+            threads[1].join()
+            channel.send_exit_status(process.wait())
+        except socket.error:
+            # the client closed the channel before the command finished
+            process.kill()
+        channel.close()
+
+
+class StubSSHServer(object):
+    """A local stand-in sshd listening on a random port of the loopback
+    interface, executing the received commands with ``subprocess``.
+    """
+
+    def __init__(self, max_sessions=None):
+        self.max_sessions = max_sessions
+        self.host_key = paramiko.RSAKey.generate(1024)
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.bind(('127.0.0.1', 0))
+        self.socket.listen(5)
+        self.port = self.socket.getsockname()[1]
+        self.transports = []
+        thread = threading.Thread(target=self._accept)
+        thread.daemon = True
+        thread.start()
+
+    def _accept(self):
+        while True:
+            try:
+                sock, _ = self.socket.accept()
+            except OSError:
+                return
+            transport = paramiko.Transport(sock)
+            transport.add_server_key(self.host_key)
+            transport.start_server(
+                server=StubSSHServerInterface(self.max_sessions))
+            self.transports.append(transport)
+
+    def connect(self):
+        """Return a ``robottelo.ssh.SSHClient`` connected to the server."""
+        client = ssh.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        client.connect(
+            '127.0.0.1', port=self.port, username='nobody',
+            password='test_password', allow_agent=False, look_for_keys=False
+        )
+        client._id = hex(id(client))
+        return client
+
+    def close(self):
+        self.socket.close()
+        for transport in self.transports:
+            transport.close()
+
+
 class SSHTestCase(TestCase):
     """Tests for module ``robottelo.ssh``."""
+    def setUp(self):
+        """Use a connection pool which does not depend on the settings and
+        is not shared between the tests.
+        """
+        self.pool = ssh.SSHConnectionPool(
+            max_size=10, idle_timeout=300, keepalive_interval=30)
+        patcher = mock.patch.object(ssh, '_connection_pool', self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.pool.clear)
+
     @mock.patch('robottelo.ssh.settings')
     def test_get_connection_key(self, settings):
         """Test method ``get_connection`` using key file to connect to the
@@ -310,3 +480,786 @@ class SSHTestCase(TestCase):
             ssh._call_paramiko_sshclient(),
             (paramiko.SSHClient, MockSSHClient)
         )
+
+
+class SSHConnectionPoolTestCase(TestCase):
+    """Tests for class ``robottelo.ssh.SSHConnectionPool``."""
+    def setUp(self):
+        self.clients = []
+
+        def create_client():
+            client = MockSSHClient()
+            self.clients.append(client)
+            return client
+
+        patcher = mock.patch.object(
+            ssh, '_call_paramiko_sshclient', create_client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.pool = ssh.SSHConnectionPool(
+            max_size=2, idle_timeout=300, keepalive_interval=30)
+        patcher = mock.patch.object(ssh, '_connection_pool', self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.pool.clear)
+        patcher = mock.patch('robottelo.ssh.settings')
+        settings = patcher.start()
+        self.addCleanup(patcher.stop)
+        settings.server.hostname = 'example.com'
+        settings.server.ssh_username = 'nobody'
+        settings.server.ssh_key = None
+        settings.server.ssh_password = 'test_password'
+        settings.ssh_client.command_timeout = 300
+        settings.ssh_client.connection_timeout = 10
+
+    def test_command_reuses_connection(self):
+        """Consecutive commands to the same host share one connection"""
+        ssh.command('ls -la')
+        ssh.command('ls -la')
+        self.assertEqual(len(self.clients), 1)
+        self.assertEqual(self.clients[0].connect_, 1)
+        self.assertEqual(self.clients[0].close_, 0)
+        self.assertEqual(self.clients[0].transport.keepalive, 30)
+        self.assertEqual(self.pool.size, 1)
+
+    def test_connection_is_keyed_by_credentials(self):
+        """Different hosts or users do not share connections"""
+        ssh.command('ls -la')
+        ssh.command('ls -la', hostname='other.example.com')
+        ssh.command('ls -la', username='somebody')
+        self.assertEqual(
+            [client.hostname for client in self.clients],
+            ['example.com', 'other.example.com', 'example.com']
+        )
+        self.assertEqual(
+            [client.username for client in self.clients],
+            ['nobody', 'nobody', 'somebody']
+        )
+
+    def test_dead_connection_is_replaced(self):
+        """A connection whose transport is no more active is not reused"""
+        ssh.command('ls -la')
+        self.clients[0].transport.active = False
+        ssh.command('ls -la')
+        self.assertEqual(len(self.clients), 2)
+        self.assertEqual(self.clients[0].close_, 1)
+        self.assertEqual(self.pool.size, 1)
+
+    def test_idle_connection_is_evicted(self):
+        """A connection idle for longer than the idle timeout is closed"""
+        ssh.command('ls -la')
+        with mock.patch('robottelo.ssh.time.time', return_value=1e12):
+            ssh.command('ls -la')
+        self.assertEqual(len(self.clients), 2)
+        self.assertEqual(self.clients[0].close_, 1)
+
+    def test_max_size(self):
+        """No more than ``max_size`` idle connections are kept"""
+        clients = [self.pool.acquire() for _ in range(3)]
+        for client in clients:
+            self.pool.release(client)
+        self.assertEqual(self.pool.size, 2)
+        self.assertEqual([client.close_ for client in clients], [0, 0, 1])
+
+    def test_disabled_pool(self):
+        """A ``max_size`` of 0 closes the connection after each use"""
+        self.pool._max_size = 0
+        ssh.command('ls -la')
+        ssh.command('ls -la')
+        self.assertEqual(len(self.clients), 2)
+        self.assertEqual([client.close_ for client in self.clients], [1, 1])
+
+    def test_discard_on_error(self):
+        """A connection is closed when an error happens while in use"""
+        with self.assertRaises(ValueError):
+            with ssh.get_pooled_connection():
+                raise ValueError()
+        self.assertEqual(self.clients[0].close_, 1)
+        self.assertEqual(self.pool.size, 0)
+
+
+class ExecuteCommandStubServerTestCase(TestCase):
+    """Tests for ``robottelo.ssh.execute_command`` against a local stand-in
+    sshd.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.server = StubSSHServer()
+        cls.client = cls.server.connect()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.close()
+        cls.server.close()
+
+    def test_execute_command(self):
+        """Output and return code are returned from the remote command"""
+        result = ssh.execute_command(
+            'echo out; echo err >&2; exit 3', self.client,
+            timeout=10, connection_timeout=10
+        )
+        self.assertEqual(result.stdout, [u'out', u''])
+        self.assertEqual(result.stderr, u'err\n')
+        self.assertEqual(result.return_code, 3)
+
+    def test_execute_command_timeout(self):
+        """A command running longer than the timeout is interrupted"""
+        with self.assertRaises(ssh.SSHCommandTimeoutError):
+            ssh.execute_command(
+                'sleep 5', self.client, timeout=0.2, connection_timeout=10)
+
+    def test_per_command_overhead(self):
+        """Log the time spent waiting for short commands.
+
+        Waiting on the channel status event returns as soon as the remote
+        process exits, where polling the exit status every second added up to
+        one second to each command not finished at the first check. The
+        overhead depends on the load of the machine, so it is only logged.
+        """
+        runs = 10
+        for cmd, duration in (('true', 0), ('sleep 0.1', 0.1)):
+            start = time.time()
+            for _ in range(runs):
+                ssh.execute_command(
+                    cmd, self.client, timeout=10, connection_timeout=10)
+            overhead = (time.time() - start) / runs - duration
+            logger.info(
+                'execute_command overhead for %r: %.1f ms', cmd,
+                overhead * 1000
+            )
+
+    def test_stream(self):
+        """Streamed lines match the ones of the non streamed output"""
+        cmd = (
+            'printf "a,b\\n\\033[32m1\\033[0m,\\"\\"\\n[rails noise]\\n'
+            'caf\\303\\251,2"; echo err >&2; exit 2'
+        )
+        expected = ssh.execute_command(
+            cmd, self.client, timeout=10, connection_timeout=10)
+        stream = ssh.execute_command(
+            cmd, self.client, timeout=10, connection_timeout=10, stream=True)
+        self.assertIsInstance(stream, ssh.SSHCommandStream)
+        self.assertIsNone(stream.return_code)
+        self.assertEqual(list(stream), expected.stdout)
+        self.assertEqual(expected.stdout, [u'a,b', u'1,', u'café,2'])
+        self.assertEqual(stream.stderr, expected.stderr)
+        self.assertEqual(stream.return_code, 2)
+
+    def test_stream_yields_lines_while_running(self):
+        """Lines are yielded before the command finishes"""
+        stream = ssh.execute_command(
+            'echo first; sleep 2; echo second', self.client, timeout=10,
+            connection_timeout=10, stream=True
+        )
+        start = time.time()
+        self.assertEqual(next(stream), u'first')
+        self.assertLess(time.time() - start, 1.5)
+        self.assertEqual(list(stream), [u'second', u''])
+        self.assertEqual(stream.return_code, 0)
+
+    def test_stream_large_output(self):
+        """Large output is consumed incrementally"""
+        stream = ssh.execute_command(
+            'seq 1 200000', self.client, timeout=30, connection_timeout=10,
+            stream=True
+        )
+        count = 0
+        for count, line in enumerate(stream, 1):
+            if line:
+                self.assertEqual(line, str(count))
+        self.assertEqual(count, 200001)
+        self.assertEqual(stream.return_code, 0)
+
+    def test_stream_timeout(self):
+        """A streamed command running longer than the timeout is
+        interrupted
+        """
+        stream = ssh.execute_command(
+            'echo first; sleep 5', self.client, timeout=0.5,
+            connection_timeout=10, stream=True
+        )
+        self.assertEqual(next(stream), u'first')
+        with self.assertRaises(ssh.SSHCommandTimeoutError):
+            next(stream)
+        self.assertTrue(stream.channel.closed)
+
+    def test_stream_close(self):
+        """Closing a stream early closes the channel and notifies the
+        caller
+        """
+        on_close = mock.Mock()
+        with ssh.execute_command(
+                'seq 1 100000', self.client, timeout=10,
+                connection_timeout=10, stream=True) as stream:
+            stream._on_close = on_close
+            self.assertEqual(next(stream), u'1')
+        on_close.assert_called_once_with(True)
+        self.assertTrue(stream.channel.closed)
+        self.assertIsNone(stream.return_code)
+
+    def test_command_stream_releases_connection(self):
+        """The pooled connection is given back once the stream is over"""
+        pool = mock.Mock()
+        pool.acquire.return_value = self.client
+        with mock.patch.object(ssh, '_connection_pool', pool):
+            stream = ssh.command(
+                'echo a,b; echo 1,2', stream=True, output_format='csv',
+                timeout=10, connection_timeout=10
+            )
+            self.assertFalse(pool.release.called)
+            self.assertEqual(
+                hammer.parse_csv(stream), [{u'a': u'1', u'b': u'2'}])
+        pool.release.assert_called_once_with(self.client, False)
+
+    def test_run_batch(self):
+        """Each command of a batch gets its own output and return code"""
+        results = ssh.run_batch(
+            ['echo one', 'printf two; echo err >&2; false', 'echo a,b; echo 1,2'],
+            self.client, timeout=10, connection_timeout=10
+        )
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0].stdout, [u'one', u''])
+        self.assertEqual(results[0].stderr, u'')
+        self.assertEqual(results[0].return_code, 0)
+        self.assertEqual(results[1].stdout, [u'two'])
+        self.assertEqual(results[1].stderr, u'err\n')
+        self.assertEqual(results[1].return_code, 1)
+        self.assertEqual(results[2].stdout, [u'a,b', u'1,2', u''])
+
+    def test_run_batch_output_format(self):
+        """The output format is applied to each command output"""
+        results = ssh.run_batch(
+            ['echo a,b; echo 1,2', 'echo c; echo 3'], self.client,
+            output_format='csv', timeout=10, connection_timeout=10
+        )
+        self.assertEqual(
+            [result.stdout for result in results],
+            [[{u'a': u'1', u'b': u'2'}], [{u'c': u'3'}]]
+        )
+
+    def test_run_batch_stop_on_error(self):
+        """Commands after a failing one are not run with stop_on_error"""
+        results = ssh.run_batch(
+            ['true', 'exit 3', 'echo never'], self.client, stop_on_error=True,
+            timeout=10, connection_timeout=10
+        )
+        self.assertEqual(
+            [result.return_code for result in results], [0, 3])
+        results = ssh.run_batch(
+            ['(exit 3)', 'echo run'], self.client, stop_on_error=True,
+            timeout=10, connection_timeout=10
+        )
+        self.assertEqual(
+            [result.return_code for result in results], [3])
+        results = ssh.run_batch(
+            ['(exit 3)', 'echo run'], self.client, timeout=10,
+            connection_timeout=10
+        )
+        self.assertEqual(
+            [result.return_code for result in results], [3, 0])
+        self.assertEqual(results[1].stdout, [u'run', u''])
+
+    def test_run_batch_shares_shell(self):
+        """Commands of a batch share the same shell"""
+        results = ssh.run_batch(
+            ['value=42', 'echo $value'], self.client, timeout=10,
+            connection_timeout=10
+        )
+        self.assertEqual(results[1].stdout, [u'42', u''])
+
+    def test_run_batch_single_channel(self):
+        """A batch opens a single exec channel"""
+        with mock.patch.object(
+                self.client, 'exec_command',
+                wraps=self.client.exec_command) as exec_command:
+            ssh.run_batch(
+                ['true'] * 5, self.client, timeout=10, connection_timeout=10)
+        self.assertEqual(exec_command.call_count, 1)
+
+
+class LocalCommandTestCase(TestCase):
+    """Tests for the commands of local hosts run without ssh."""
+
+    hostname = u'local://satellite.example.com'
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = StubSSHServer()
+        cls.client = cls.server.connect()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.close()
+        cls.server.close()
+
+    def test_is_local_host(self):
+        self.assertTrue(ssh.is_local_host(self.hostname))
+        self.assertFalse(ssh.is_local_host(u'satellite.example.com'))
+        self.assertFalse(ssh.is_local_host(None))
+        with mock.patch('robottelo.ssh.settings') as settings:
+            settings.ssh_client.local_hosts = [u'satellite.example.com']
+            self.assertTrue(ssh.is_local_host(u'satellite.example.com'))
+            self.assertFalse(ssh.is_local_host(u'capsule.example.com'))
+
+    def test_command(self):
+        """Local results match the ones of the same command over ssh"""
+        for cmd, output_format in (
+                ('echo out; echo err >&2; exit 3', None),
+                ('printf "a,b\\n\\033[32m1\\033[0m,\\"\\"\\n[rails noise]\\n'
+                 'caf\\303\\251,2"', 'csv'),
+                ('echo \'{"ID": 1}\'', 'json'),
+                ('echo foo', 'plain')):
+            expected = ssh.execute_command(
+                cmd, self.client, output_format=output_format, timeout=10,
+                connection_timeout=10
+            )
+            with mock.patch('robottelo.ssh.get_pooled_connection') as pool:
+                result = ssh.command(
+                    cmd, hostname=self.hostname, output_format=output_format,
+                    timeout=10
+                )
+            self.assertFalse(pool.called)
+            self.assertIsInstance(result, ssh.SSHCommandResult)
+            self.assertEqual(result.stdout, expected.stdout)
+            self.assertEqual(result.stderr, expected.stderr)
+            self.assertEqual(result.return_code, expected.return_code)
+
+    def test_command_timeout(self):
+        """A command running longer than the timeout is killed with the
+        processes it started
+        """
+        start = time.time()
+        with self.assertRaises(ssh.SSHCommandTimeoutError):
+            ssh.command('sleep 5 | cat', hostname=self.hostname, timeout=0.5)
+        self.assertLess(time.time() - start, 3)
+
+    def test_stream(self):
+        """Streamed lines match the ones of the non streamed output"""
+        cmd = (
+            'printf "a,b\\n\\033[32m1\\033[0m,\\"\\"\\n[rails noise]\\n'
+            'caf\\303\\251,2"; echo err >&2; exit 2'
+        )
+        expected = ssh.command(cmd, hostname=self.hostname, timeout=10)
+        stream = ssh.command(
+            cmd, hostname=self.hostname, timeout=10, stream=True)
+        self.assertIsInstance(stream, ssh.SSHCommandStream)
+        self.assertEqual(list(stream), expected.stdout)
+        self.assertEqual(stream.stderr, expected.stderr)
+        self.assertEqual(stream.return_code, 2)
+        stream = ssh.command(
+            'echo a; echo b', hostname=self.hostname, timeout=10, stream=True)
+        self.assertEqual(list(stream), [u'a', u'b', u''])
+
+    def test_stream_timeout(self):
+        """A streamed command running longer than the timeout is killed"""
+        stream = ssh.command(
+            'echo first; sleep 5', hostname=self.hostname, timeout=0.5,
+            stream=True
+        )
+        self.assertEqual(next(stream), u'first')
+        with self.assertRaises(ssh.SSHCommandTimeoutError):
+            list(stream)
+        self.assertIsNotNone(stream.process.poll())
+
+    def test_stream_close(self):
+        """Closing a stream early kills the process"""
+        with ssh.command('seq 1 1000000', hostname=self.hostname, timeout=10,
+                         stream=True) as stream:
+            self.assertEqual(next(stream), u'1')
+        self.assertIsNotNone(stream.process.poll())
+        self.assertIsNone(stream.return_code)
+
+    def test_command_batch(self):
+        """Batches of local hosts are run without ssh"""
+        cmds = ['echo one', 'echo two >&2; (exit 2)', 'echo three']
+        with mock.patch('robottelo.ssh.get_pooled_connection') as pool:
+            results = ssh.command_batch(
+                cmds, hostname=self.hostname, timeout=10)
+            stopped = ssh.command_batch(
+                cmds, hostname=self.hostname, stop_on_error=True,
+                timeout=10)
+        self.assertFalse(pool.called)
+        self.assertEqual(
+            [(result.stdout, result.stderr, result.return_code)
+             for result in results],
+            [([u'one', u''], u'', 0), (u'', u'two\n', 2),
+             ([u'three', u''], u'', 0)]
+        )
+        self.assertEqual(
+            [result.return_code for result in stopped], [0, 2])
+
+    def test_per_command_overhead(self):
+        """Log the time taken by a short command run locally and over ssh"""
+        runs = 20
+        for name, run in (
+                ('local', lambda: ssh.command(
+                    'true', hostname=self.hostname, timeout=10)),
+                ('ssh', lambda: ssh.execute_command(
+                    'true', self.client, timeout=10, connection_timeout=10))):
+            start = time.time()
+            for _ in range(runs):
+                run()
+            logger.info('%s command overhead: %.1f ms',
+                        name, (time.time() - start) / runs * 1000)
+
+
+class CommandManyTestCase(TestCase):
+    """Tests for ``robottelo.ssh.command_many``."""
+    @staticmethod
+    def fake_command(cmd, hostname=None, **kwargs):
+        """Sleep the number of seconds given as command and echo it back,
+        fail if the command is ``fail``.
+        """
+        if cmd == 'fail':
+            raise ssh.SSHCommandTimeoutError(cmd)
+        time.sleep(float(cmd))
+        return ssh.SSHCommandResult(
+            stdout=[hostname, cmd], stderr=u'', return_code=0)
+
+    @mock.patch('robottelo.ssh.command')
+    def test_results_are_ordered(self, command):
+        """Results are returned in the commands order"""
+        command.side_effect = self.fake_command
+        results = ssh.command_many(
+            [('host1', '0.2'), ('host2', '0'), ('host3', '0.1')])
+        self.assertEqual(
+            [result.stdout for result in results],
+            [['host1', '0.2'], ['host2', '0'], ['host3', '0.1']]
+        )
+
+    @mock.patch('robottelo.ssh.command')
+    def test_commands_run_concurrently(self, command):
+        """Total time is bounded by the slowest command"""
+        command.side_effect = self.fake_command
+        start = time.time()
+        ssh.command_many(
+            [('host{}'.format(index), '0.3') for index in range(5)])
+        self.assertLess(time.time() - start, 1)
+
+    @mock.patch('robottelo.ssh.command')
+    def test_max_workers(self, command):
+        """No more than ``max_workers`` commands run at the same time"""
+        command.side_effect = self.fake_command
+        start = time.time()
+        ssh.command_many([('host1', '0.3'), ('host2', '0.3')], max_workers=1)
+        self.assertGreaterEqual(time.time() - start, 0.6)
+
+    @mock.patch('robottelo.ssh.command')
+    def test_arguments_are_passed(self, command):
+        """The common arguments are passed to each command"""
+        ssh.command_many(
+            [('host1', 'ls')], output_format='csv', username='nobody',
+            password='secret', key_filename='/key', timeout=30,
+            connection_timeout=5
+        )
+        command.assert_called_once_with(
+            'ls', hostname='host1', output_format='csv', username='nobody',
+            password='secret', key_filename='/key', timeout=30,
+            connection_timeout=5
+        )
+
+    @mock.patch('robottelo.ssh.command')
+    def test_errors_are_aggregated(self, command):
+        """All commands are run and the failures are raised together"""
+        command.side_effect = self.fake_command
+        with self.assertRaises(ssh.SSHCommandManyError) as context:
+            ssh.command_many(
+                [('host1', 'fail'), ('host2', '0'), ('host3', 'fail')])
+        errors = context.exception.errors
+        self.assertEqual(
+            [(index, hostname, cmd) for index, hostname, cmd, _ in errors],
+            [(0, 'host1', 'fail'), (2, 'host3', 'fail')]
+        )
+        self.assertIsInstance(errors[0][3], ssh.SSHCommandTimeoutError)
+        results = context.exception.results
+        self.assertIsNone(results[0])
+        self.assertEqual(results[1].stdout, ['host2', '0'])
+        self.assertIsNone(results[2])
+
+    def test_no_commands(self):
+        """An empty list of commands returns an empty list"""
+        self.assertEqual(ssh.command_many([]), [])
+
+
+class FakeSFTPClient(object):
+    """Fake SFTP client recording the uploaded files."""
+
+    def __init__(self, uploads, delay=0):
+        self.uploads = uploads
+        self.delay = delay
+
+    def put(self, local_file, remote_file):
+        time.sleep(self.delay)
+        self.uploads.append((local_file, remote_file))
+        return paramiko.SFTPAttributes.from_stat(os.stat(local_file))
+
+    def putfo(self, local_file, remote_file):
+        time.sleep(self.delay)
+        self.uploads.append((local_file, remote_file))
+        attributes = paramiko.SFTPAttributes()
+        attributes.st_size = len(local_file.read())
+        return attributes
+
+
+class UploadFilesBulkTestCase(TestCase):
+    """Tests for ``robottelo.ssh.upload_files_bulk``."""
+
+    def setUp(self):
+        self.local_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.local_dir)
+        self.files = []
+        for name, content in (('same', b'same'), ('changed', b'local'),
+                              ('new', b'new file')):
+            local_file = os.path.join(self.local_dir, name)
+            with open(local_file, 'wb') as file_:
+                file_.write(content)
+            self.files.append((local_file, '/remote/' + name))
+        patcher = mock.patch('robottelo.ssh.command')
+        self.command = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.command.return_value = ssh.SSHCommandResult(stdout=[
+            hashlib.md5(b'same').hexdigest() + u'  /remote/same',
+            hashlib.md5(b'other').hexdigest() + u'  /remote/changed',
+            u'',
+        ])
+        self.uploads = []
+        self.sessions = []
+        self.delay = 0
+        patcher = mock.patch(
+            'robottelo.ssh.get_sftp_session', self.get_sftp_session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @contextlib.contextmanager
+    def get_sftp_session(self, hostname=None, key_filename=None):
+        self.sessions.append(hostname)
+        yield FakeSFTPClient(self.uploads, self.delay)
+
+    def test_skip_identical(self):
+        """Only the files whose remote checksum differs are uploaded"""
+        report = ssh.upload_files_bulk(self.files, hostname='host1')
+        self.assertEqual(report.skipped, [self.files[0]])
+        self.assertEqual(sorted(report.uploaded), sorted(self.files[1:]))
+        self.assertEqual(sorted(self.uploads), sorted(self.files[1:]))
+        self.assertEqual(report.size, len(b'local') + len(b'new file'))
+        self.assertEqual(self.command.call_count, 1)
+        cmd = self.command.call_args[0][0]
+        self.assertTrue(cmd.startswith(u'mkdir -p -- /remote; '), cmd)
+        self.assertEqual(cmd.count(u'md5sum'), 3)
+        self.assertEqual(
+            self.command.call_args[1],
+            {'hostname': 'host1', 'key_filename': None}
+        )
+
+    def test_no_skip(self):
+        """All the files are uploaded without checking the checksums"""
+        report = ssh.upload_files_bulk(self.files, skip_identical=False)
+        self.assertEqual(sorted(report.uploaded), sorted(self.files))
+        self.assertEqual(report.skipped, [])
+        self.assertNotIn(u'md5sum', self.command.call_args[0][0])
+
+    def test_file_like_uploaded(self):
+        """File-like objects are always uploaded"""
+        local_file = six.BytesIO(b'same')
+        report = ssh.upload_files_bulk([(local_file, '/remote/same')])
+        self.assertEqual(report.uploaded, [(local_file, '/remote/same')])
+        self.assertEqual(report.size, 4)
+
+    def test_parallel_sessions(self):
+        """The files are uploaded over several SFTP sessions at once"""
+        self.delay = 0.3
+        self.command.return_value = ssh.SSHCommandResult(stdout=[])
+        files = [
+            (self.files[index % 3][0], '/remote/{0}'.format(index))
+            for index in range(6)
+        ]
+        start = time.time()
+        report = ssh.upload_files_bulk(files, max_workers=3)
+        self.assertLess(time.time() - start, 1.5)
+        self.assertEqual(len(self.sessions), 3)
+        self.assertEqual(sorted(report.uploaded), sorted(files))
+        self.assertGreater(report.throughput, 0)
+
+    def test_upload_files(self):
+        """upload_files uploads the matching files of a directory"""
+        ssh.upload_files(self.local_dir, '/remote', file_search='[cn]*')
+        self.assertEqual(sorted(self.uploads), sorted(self.files[1:]))
+
+    def test_remote_md5_command(self):
+        """Only the remote files with the same size are checksummed"""
+        remote_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, remote_dir)
+        for name, content in (('same', b'same'), ('changed', b'remote')):
+            with open(os.path.join(remote_dir, name), 'wb') as file_:
+                file_.write(content)
+        files = [
+            (local_file, os.path.join(remote_dir, os.path.basename(remote)))
+            for local_file, remote in self.files
+        ]
+        output = subprocess.check_output(
+            ['bash', '-c', ssh._remote_md5_command(files) + u'; true'])
+        self.assertEqual(
+            output.decode('utf-8').splitlines(),
+            [u'{0}  {1}'.format(
+                hashlib.md5(b'same').hexdigest(), files[0][1])]
+        )
+
+
+class MultiplexedConnectionTestCase(TestCase):
+    """Tests for ``robottelo.ssh.MultiplexedConnection`` against a local
+    stand-in sshd.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.server = StubSSHServer(max_sessions=3)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.close()
+
+    def setUp(self):
+        self.clients = []
+
+        def get_client(**kwargs):
+            client = self.server.connect()
+            self.clients.append(client)
+            return client
+
+        patcher = mock.patch('robottelo.ssh.get_client', get_client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch('robottelo.ssh.settings')
+        settings = patcher.start()
+        self.addCleanup(patcher.stop)
+        settings.server.hostname = 'example.com'
+        settings.server.ssh_username = 'nobody'
+        settings.server.ssh_key = None
+        settings.server.ssh_password = 'test_password'
+        settings.ssh_client.command_timeout = 10
+        settings.ssh_client.connection_timeout = 10
+        settings.ssh_client.max_sessions = 3
+
+    def connection(self, max_sessions=None):
+        connection = ssh.MultiplexedConnection(max_sessions=max_sessions)
+        self.addCleanup(connection.close)
+        return connection
+
+    def test_concurrent_commands(self):
+        """Commands run at the same time on a single transport"""
+        connection = self.connection()
+        start = time.time()
+        results = connection.run_many(
+            ['sleep 0.5; echo {0}'.format(index) for index in range(3)])
+        self.assertLess(time.time() - start, 1.2)
+        self.assertEqual(
+            [result.stdout for result in results],
+            [[u'0', u''], [u'1', u''], [u'2', u'']]
+        )
+        self.assertEqual(len(self.clients), 1)
+        self.assertEqual(connection.open_sessions, 0)
+
+    def test_max_sessions(self):
+        """No more than ``max_sessions`` commands run at the same time"""
+        connection = self.connection(max_sessions=1)
+        start = time.time()
+        connection.run_many(['sleep 0.3', 'sleep 0.3'])
+        self.assertGreaterEqual(time.time() - start, 0.6)
+
+    def test_server_max_sessions(self):
+        """The bound is lowered when the server refuses new sessions"""
+        connection = self.connection(max_sessions=6)
+        results = connection.run_many(
+            ['sleep 0.3; echo {0}'.format(index) for index in range(6)])
+        self.assertEqual(
+            [result.stdout[0] for result in results],
+            [u'{0}'.format(index) for index in range(6)]
+        )
+        self.assertLessEqual(connection.max_sessions, 3)
+        self.assertEqual(len(self.clients), 1)
+
+    def run_refused(self, connection, error, open_sessions):
+        """Run a command refused once with ``error`` when ``open_sessions``
+        sessions are open, which all end right after.
+        """
+        errors = [error]
+
+        def execute_command(*args, **kwargs):
+            if errors:
+                connection.open_sessions = open_sessions
+                raise errors.pop()
+            return ssh.SSHCommandResult()
+
+        def release_session():
+            with connection._condition:
+                connection.open_sessions = 0
+                connection._condition.notify_all()
+
+        with mock.patch('robottelo.ssh.execute_command', execute_command):
+            with mock.patch.object(
+                    connection, '_release_session', release_session):
+                connection.run('true')
+
+    def test_refused_sessions(self):
+        """Only the sessions refused by an active server lower the bound"""
+        connection = self.connection(max_sessions=6)
+        connection.run('true')
+        refused = paramiko.ChannelException(
+            paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED, 'refused')
+        self.run_refused(connection, refused, 5)
+        self.assertEqual(connection.max_sessions, 4)
+        # a refusal seen with more sessions open does not raise the bound
+        self.run_refused(connection, refused, 6)
+        self.assertEqual(connection.max_sessions, 4)
+        # the reason was picked up by another refused command
+        self.run_refused(
+            connection, paramiko.SSHException('Unable to open channel.'), 3)
+        self.assertEqual(connection.max_sessions, 4)
+        # the other failures and the ones of a dead transport are raised
+        self.clients[0].close()
+        for error in (
+                paramiko.ChannelException(
+                    paramiko.OPEN_FAILED_CONNECT_FAILED, 'failed'),
+                paramiko.SSHException('Unable to open channel.'),
+                refused):
+            with mock.patch('robottelo.ssh.get_client',
+                            return_value=self.clients[0]):
+                with self.assertRaises(type(error)):
+                    self.run_refused(connection, error, 3)
+        self.assertEqual(connection.max_sessions, 4)
+
+    def test_independent_timeouts(self):
+        """A command timing out does not affect the other ones"""
+        connection = self.connection()
+        with self.assertRaises(ssh.SSHCommandManyError) as context:
+            connection.run_many(['sleep 5', 'sleep 0.5; echo ok'], timeout=1)
+        errors = context.exception.errors
+        self.assertEqual([error[0] for error in errors], [0])
+        self.assertIsInstance(errors[0][3], ssh.SSHCommandTimeoutError)
+        self.assertEqual(context.exception.results[1].stdout, [u'ok', u''])
+        self.assertEqual(connection.run('echo again').stdout, [u'again', u''])
+        self.assertEqual(len(self.clients), 1)
+
+    def test_reconnect(self):
+        """A new transport is established when the previous one died"""
+        connection = self.connection()
+        connection.run('true')
+        self.clients[0].close()
+        self.assertEqual(connection.run('echo ok').stdout, [u'ok', u''])
+        self.assertEqual(len(self.clients), 2)
+
+    def test_shared_connection(self):
+        """The threads of a process share one connection per host"""
+        self.addCleanup(ssh.close_multiplexed_connections)
+        connection = ssh.get_multiplexed_connection()
+        self.assertIs(ssh.get_multiplexed_connection(), connection)
+        self.assertIsNot(
+            ssh.get_multiplexed_connection(hostname='other.example.com'),
+            connection
+        )
+        results = ssh.command_many(
+            [(None, 'echo {0}'.format(index)) for index in range(3)],
+            multiplex=True
+        )
+        self.assertEqual(
+            [result.stdout[0] for result in results], [u'0', u'1', u'2'])
+        self.assertEqual(len(self.clients), 1)
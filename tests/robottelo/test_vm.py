@@ -18,6 +18,11 @@ class VirtualMachineTestCase(unittest2.TestCase):
         self.settings = self.settings_patcher.start()
         self.settings.clients.provisioning_server = None
         self.settings.distro = DistroSettings()
+        # the server OS version is used to choose the default distro
+        patcher = patch(
+            'robottelo.vm.get_host_os_version', return_value='RHEL7.5')
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
     def tearDown(self):
         super(VirtualMachineTestCase, self).tearDown()